@@ -0,0 +1,87 @@
+"""Index build, insert and query cost of `IndexedList` at ideas_store scale.
+
+    python scripts/bench_indexed.py [--rows 1000000] [--repeat 200]
+
+Rows are spread over 4 assets and risk 1-5 like live ideas; most are long
+finished (SCHEDULED / CANCELLED), a few percent still open. The queries are the
+ones `GET /ideas` issues (newest first, limit 50).
+"""
+from __future__ import annotations
+
+import argparse
+import gc
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Callable, List
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from src.infra.indexed import IndexedList  # noqa: E402
+from src.models import IdeaStatus  # noqa: E402
+
+ASSETS = ["SOL", "JUP", "BONK", "RAY"]
+STATUS_WEIGHTS = {IdeaStatus.NEW: 1, IdeaStatus.NEEDS_REVIEW: 1, IdeaStatus.READY_FOR_QA: 1, IdeaStatus.APPROVED: 2,
+                  IdeaStatus.SCHEDULED: 25, IdeaStatus.CANCELLED: 70}
+
+
+def _ideas(n: int, rng: random.Random) -> List[dict]:
+    now = datetime.now(timezone.utc)
+    statuses = rng.choices(list(STATUS_WEIGHTS), weights=list(STATUS_WEIGHTS.values()), k=n)
+    return [{"id": f"idea-{k}", "source": "research", "asset": rng.choice(ASSETS), "type": "swing",
+             "risk": rng.randint(1, 5), "budget": round(rng.uniform(0.01, 5.0), 2), "status": statuses[k],
+             "created_at": now - timedelta(seconds=k), "ttl": 3600} for k in range(n)]
+
+
+def _ms(fn: Callable[[], object], repeat: int) -> float:
+    fn()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1e3
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--rows", type=int, default=1_000_000)
+    ap.add_argument("--repeat", type=int, default=200)
+    args = ap.parse_args()
+    rng = random.Random(1)
+    rows = _ideas(args.rows, rng)
+
+    start = time.perf_counter()
+    store = IndexedList(rows, hash_fields=("id", "asset", "source", "type", "status", "risk", "strategy_id"),
+                        sorted_fields=("created_at", "budget"))
+    store.query(order_by="created_at", limit=1)  # includes the first sort of the bulk-loaded order index
+    gc.collect()  # and the collector's pass over the new index objects, whenever it comes
+    print(f"build {args.rows} rows: {time.perf_counter() - start:.2f} s")
+
+    # insert(0, ...) also shifts the whole list; append is the index upkeep alone
+    for label, add in (("insert(0, ...)", lambda rec: store.insert(0, rec)), ("append", store.append)):
+        fresh = _ideas(args.repeat, random.Random(2))
+        start = time.perf_counter()
+        for rec in fresh:
+            add(rec)
+        print(f"{label}: {(time.perf_counter() - start) / len(fresh) * 1e3:.3f} ms")
+    batches = [_ideas(100, random.Random(3 + k)) for k in range(10)]
+    start = time.perf_counter()
+    for batch in batches:
+        store.extend(batch)
+        store.query(order_by="created_at", limit=1)
+    print(f"extend 100 + query: {(time.perf_counter() - start) / len(batches) * 1e3:.3f} ms")
+
+    queries = {
+        "status IN (NEW, READY_FOR_QA), asset=SOL": dict(where={"status": [IdeaStatus.NEW, IdeaStatus.READY_FOR_QA], "asset": "SOL"}),
+        "asset=SOL, risk=5": dict(where={"asset": "SOL"}, ranges={"risk": (5, 5)}),
+        "asset=SOL, status=APPROVED, risk>=4": dict(where={"asset": "SOL", "status": IdeaStatus.APPROVED}, ranges={"risk": (4, None)}),
+        "budget 4.9-5.0": dict(ranges={"budget": (4.9, 5.0)}),
+        "asset=SOL, budget 4.9-5.0": dict(where={"asset": "SOL"}, ranges={"budget": (4.9, 5.0)}),
+    }
+    for label, q in queries.items():
+        print(f"{label:<44}{_ms(lambda: store.query(order_by='created_at', limit=50, **q), args.repeat):>10.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
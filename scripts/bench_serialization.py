@@ -0,0 +1,104 @@
+"""Per-request CPU of rendering 200-row list responses, before and after the fast path.
+
+    python scripts/bench_serialization.py [--rows 200] [--repeat 2000]
+
+"fastapi response_model" reproduces what FastAPI does for
+`response_model=List[Model]`: validate every row, dump it to JSON-able Python
+and render with stdlib json. "TypeAdapter (validated)" is the FAST_JSON=0
+fallback, and "trusted rows + orjson" is the default. The end-to-end rows time
+whole GET requests through ASGI: the previous `response_model` endpoint
+(rebuilt on a scratch app) against `GET /api/v1/trades/recent`.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Callable, List
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from fastapi import FastAPI  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+from pydantic import TypeAdapter  # noqa: E402
+
+from src import serialization  # noqa: E402
+from src.models import Idea, IdeaStatus, Trade, TradeAction, TradeStatus  # noqa: E402
+from src.serialization import IDEAS, TRADES  # noqa: E402
+
+
+def _ideas(n: int) -> List[dict]:
+    now = datetime.now(timezone.utc)
+    return [{"id": f"idea-{k}", "source": "research", "asset": "SOL", "type": "swing", "risk": 1 + k % 5,
+             "budget": 0.1 + k / 1000, "status": IdeaStatus.NEW, "created_at": now - timedelta(seconds=k), "ttl": 3600,
+             "risk_metrics": {"var": 0.02, "cvar": 0.03}} for k in range(n)]
+
+
+def _trades(n: int) -> List[dict]:
+    now = datetime.now(timezone.utc)
+    return [{"id": f"trade-{k}", "strategy_id": "s-1", "action": TradeAction.BUY, "asset": "SOL", "quantity": 0.5,
+             "price": 150.0 + k / 100, "pnl": 0.001 * k, "status": TradeStatus.CLOSED,
+             "executed_at": now - timedelta(seconds=k)} for k in range(n)]
+
+
+def _fastapi_path(model) -> Callable[[List[dict]], bytes]:
+    adapter = TypeAdapter(List[model])
+
+    def render(rows: List[dict]) -> bytes:
+        value = adapter.dump_python(adapter.validate_python(rows), mode="json")
+        return json.dumps(value, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode()
+
+    return render
+
+
+def _cpu_us(fn: Callable[[], object], repeat: int) -> float:
+    fn()
+    start = time.process_time()
+    for _ in range(repeat):
+        fn()
+    return (time.process_time() - start) / repeat * 1e6
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--rows", type=int, default=200)
+    ap.add_argument("--repeat", type=int, default=2000)
+    args = ap.parse_args()
+    if serialization.orjson is None:
+        print("orjson is not installed: the trusted path falls back to the TypeAdapter")
+
+    print(f"{'model':<8}{'path':<28}{'cpu/request':>14}{'speedup':>10}")
+    for name, model, ser, rows in (("Idea", Idea, IDEAS, _ideas(args.rows)), ("Trade", Trade, TRADES, _trades(args.rows))):
+        before = _fastapi_path(model)
+        base = _cpu_us(lambda: before(rows), args.repeat)
+        for label, fn in (("fastapi response_model", lambda: before(rows)),
+                          ("TypeAdapter (validated)", lambda: ser.dump(rows, trusted=False)),
+                          ("trusted rows + orjson", lambda: ser.dump(rows))):
+            us = base if label.startswith("fastapi") else _cpu_us(fn, args.repeat)
+            print(f"{name:<8}{label:<28}{us:>11.1f} us{base / us:>9.1f}x")
+
+    from src.main import app
+    from src.store import trades_store
+
+    trades_store[:] = _trades(args.rows)
+    scratch = FastAPI()
+
+    @scratch.get("/trades/recent", response_model=List[Trade])
+    async def recent_before(limit: int = 20) -> List[Trade]:
+        return sorted(trades_store, key=lambda x: x.get("executed_at"), reverse=True)[:limit]
+
+    old, new = TestClient(scratch), TestClient(app)
+    n = max(1, args.repeat // 10)
+    base = _cpu_us(lambda: old.get(f"/trades/recent?limit={args.rows}"), n)
+    print(f"{'e2e':<8}{'GET, response_model':<28}{base:>11.1f} us{1.0:>9.1f}x")
+    for label, fast in (("GET, FAST_JSON=0", False), ("GET, FAST_JSON=1", True)):
+        serialization.FAST_JSON = fast
+        us = _cpu_us(lambda: new.get(f"/api/v1/trades/recent?limit={args.rows}"), n)
+        print(f"{'e2e':<8}{label:<28}{us:>11.1f} us{base / us:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
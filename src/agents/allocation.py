@@ -0,0 +1,149 @@
+"""Portfolio allocation of wallet capital across competing ideas.
+
+Ideas map onto the covariance of their assets' returns (two ideas on the same
+asset are perfectly correlated), estimated from the market store; assets
+without stored history fall back to their configured volatility and no
+correlation. Two long-only solvers, both plain NumPy:
+
+- `risk_parity`: every idea contributes the same share of portfolio variance
+  (multiplicative fixed-point iteration).
+- `mean_variance`: maximize mu'w - risk_aversion/2 * w'Sw by projected
+  gradient ascent on the capped simplex.
+
+Weights are capped at `max_weight`, and an idea's Monte Carlo tail-loss cap
+(`risk_metrics.cvar`, see `src.agents.montecarlo`) still bounds its budget;
+whatever cannot be placed stays in the wallet.
+"""
+from __future__ import annotations
+
+import os
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.agents.montecarlo import ASSET_VOL, DEFAULT_VOL, MC_MAX_LOSS_SOL, YEAR_SECONDS
+from src.market.timeseries import TimeSeriesStore, market_store
+
+
+ALLOC_LOOKBACK_SECONDS = int(os.getenv("ALLOC_LOOKBACK_SECONDS", str(7 * 24 * 3600)))
+ALLOC_BAR_SECONDS = int(os.getenv("ALLOC_BAR_SECONDS", "3600"))
+ALLOC_METHOD = os.getenv("ALLOC_METHOD", "risk_parity")
+METHODS = ("risk_parity", "mean_variance")
+
+
+def asset_moments(assets: Sequence[str], store: Optional[TimeSeriesStore] = None,
+                  seconds: int = ALLOC_BAR_SECONDS, lookback: int = ALLOC_LOOKBACK_SECONDS) -> Tuple[np.ndarray, np.ndarray]:
+    """(mean, covariance) of per-bar log returns for `assets`, aligned on common bar timestamps."""
+    store = store or market_store
+    k = len(assets)
+    var_default = np.array([ASSET_VOL.get(a, DEFAULT_VOL) ** 2 * seconds / YEAR_SECONDS for a in assets])
+    mu = np.zeros(k)
+    cov = np.diag(var_default)
+    known = set(store.assets())
+    series = {}
+    for idx, asset in enumerate(assets):
+        if asset not in known:
+            continue
+        last = store.last_ts(asset)
+        if last is None:
+            continue
+        bars = store.resample(asset, seconds, start=last - lookback)
+        if len(bars["ts"]) > 2:
+            series[idx] = (np.asarray(bars["ts"]), np.log(np.asarray(bars["close"], dtype=np.float64)))
+    if not series:
+        return mu, cov
+    common = None
+    for ts, _ in series.values():
+        common = ts if common is None else np.intersect1d(common, ts, assume_unique=True)
+    if len(common) < 3:
+        return mu, cov
+    idxs = sorted(series)
+    rets = np.stack([np.diff(logp[np.searchsorted(ts, common)]) for ts, logp in (series[i] for i in idxs)], axis=1)
+    sub = np.atleast_2d(np.cov(rets, rowvar=False))
+    ix = np.array(idxs)
+    cov[np.ix_(ix, ix)] = sub
+    mu[ix] = rets.mean(axis=0)
+    return mu, cov
+
+
+def project_capped_simplex(v: np.ndarray, cap: float = 1.0, total: float = 1.0) -> np.ndarray:
+    """Euclidean projection onto {w : 0 <= w <= cap, sum(w) = total} (bisection on the shift)."""
+    cap = max(cap, total / len(v))
+    lo, hi = v.min() - cap, v.max()
+    for _ in range(60):
+        tau = (lo + hi) / 2
+        if np.clip(v - tau, 0.0, cap).sum() > total:
+            lo = tau
+        else:
+            hi = tau
+    return np.clip(v - hi, 0.0, cap)
+
+
+def risk_parity(cov: np.ndarray, max_weight: float = 1.0, tol: float = 1e-10, max_iter: int = 1000) -> np.ndarray:
+    n = len(cov)
+    vol = np.sqrt(np.maximum(np.diag(cov), 1e-18))
+    w = (1 / vol) / (1 / vol).sum()  # inverse-vol start is exact for uncorrelated ideas
+    for _ in range(max_iter):
+        contrib = w * (cov @ w)
+        share = contrib / contrib.sum()
+        nxt = w * np.sqrt((1.0 / n) / np.maximum(share, 1e-18))
+        nxt /= nxt.sum()
+        if np.abs(nxt - w).max() < tol:
+            w = nxt
+            break
+        w = nxt
+    return project_capped_simplex(w, max_weight) if max_weight < 1.0 else w
+
+
+def mean_variance(mu: np.ndarray, cov: np.ndarray, risk_aversion: float = 10.0, max_weight: float = 1.0,
+                  tol: float = 1e-12, max_iter: int = 2000) -> np.ndarray:
+    n = len(mu)
+    # step 1/L with L = risk_aversion * largest eigenvalue (power iteration)
+    v = np.ones(n) / np.sqrt(n)
+    for _ in range(50):
+        v = cov @ v
+        v /= np.linalg.norm(v) or 1.0
+    step = 1.0 / max(risk_aversion * float(v @ cov @ v), 1e-18)
+    w = project_capped_simplex(np.full(n, 1.0 / n), max_weight)
+    for _ in range(max_iter):
+        nxt = project_capped_simplex(w + step * (mu - risk_aversion * (cov @ w)), max_weight)
+        if np.abs(nxt - w).max() < tol:
+            return nxt
+        w = nxt
+    return w
+
+
+def allocate(ideas: Sequence[Dict[str, Any]], capital: float, method: str = ALLOC_METHOD, max_weight: float = 1.0,
+             risk_aversion: float = 10.0, store: Optional[TimeSeriesStore] = None,
+             ridge: float = 1e-8) -> List[Dict[str, Any]]:
+    """Split `capital` (SOL) across `ideas` and rewrite each idea's `budget`.
+
+    Returns one `{"id", "asset", "weight", "budget"}` row per idea.
+    """
+    if method not in METHODS:
+        raise ValueError(f"Unknown allocation method {method!r}; expected one of {METHODS}")
+    if not ideas:
+        return []
+    if capital <= 0:
+        raise ValueError("capital must be positive")
+    assets = sorted({str(i.get("asset") or "").upper() for i in ideas})
+    slot = {a: k for k, a in enumerate(assets)}
+    idx = np.array([slot[str(i.get("asset") or "").upper()] for i in ideas])
+    mu_a, cov_a = asset_moments(assets, store)
+    cov = cov_a[np.ix_(idx, idx)]
+    cov += np.eye(len(idx)) * ridge * max(float(np.trace(cov)) / len(idx), 1e-18)  # same-asset ideas are singular
+    if method == "risk_parity":
+        weights = risk_parity(cov, max_weight)
+    else:
+        weights = mean_variance(mu_a[idx], cov, risk_aversion, max_weight)
+
+    out = []
+    for idea, w in zip(ideas, weights.tolist()):
+        budget = w * capital
+        cvar = (idea.get("risk_metrics") or {}).get("cvar")
+        if cvar and cvar > 0:
+            budget = min(budget, MC_MAX_LOSS_SOL / cvar)
+        idea["budget"] = round(budget, 6)
+        idea["allocation"] = {"method": method, "weight": round(w, 6), "capital": capital}
+        out.append({"id": idea.get("id"), "asset": idea.get("asset"), "weight": w, "budget": idea["budget"]})
+    return out
@@ -1,30 +1,169 @@
 from __future__ import annotations
 
+import asyncio
+import os
 from typing import List, Dict, Any, Optional
 from uuid import uuid4
 from datetime import datetime, timezone
 
+import numpy as np
+
 from src.store import ideas_store, strategies_store
 from src.models import Strategy, StrategyStatus
 from src.bus import bus
+from src.agents.pool import agent_pool
+from src.agents.sweep import load_latest_artifact
+from src.agents.montecarlo import apply_cap, cap_budgets, mc_enabled
+from src.agents.templates import template_cache, template_key
+from src.market.timeseries import market_store
+
+# batches at least this large have their parameters computed on the process pool
+POOL_MIN_BATCH = int(os.getenv("AGENT_POOL_MIN_BATCH", "512"))
+# minute-return history the Monte Carlo sizing bootstraps from, when the market store has it
+MC_LOOKBACK_SECONDS = 7 * 24 * 3600
+
+
+# Built-in mapping from risk 1..5 to stop_loss and take_profit multipliers / max_dd
+_DEFAULT_PARAMS = {
+    1: {"stop_loss": 0.01, "take_profit": 0.02, "max_dd": 0.04},
+    2: {"stop_loss": 0.02, "take_profit": 0.04, "max_dd": 0.06},
+    3: {"stop_loss": 0.03, "take_profit": 0.06, "max_dd": 0.08},
+    4: {"stop_loss": 0.04, "take_profit": 0.08, "max_dd": 0.1},
+    5: {"stop_loss": 0.05, "take_profit": 0.12, "max_dd": 0.12},
+}
+
+# Swept table {asset: {risk: params}} from the latest sweep artifact (see src/agents/sweep.py)
+_risk_table: Dict[str, Dict[int, Dict[str, float]]] = {}
+risk_table_version: Optional[int] = None
+
+
+def load_risk_table(directory: Optional[str] = None) -> Optional[int]:
+    """(Re)load the newest sweep artifact; returns its version or None when only defaults apply."""
+    global risk_table_version
+    doc = load_latest_artifact(directory)
+    table: Dict[str, Dict[int, Dict[str, float]]] = {}
+    for asset, rows in ((doc or {}).get("table") or {}).items():
+        table[asset.upper()] = {
+            int(r): {k: float(p[k]) for k in ("stop_loss", "take_profit", "max_dd")} for r, p in rows.items()
+        }
+    _risk_table.clear()
+    _risk_table.update(table)
+    risk_table_version = doc.get("version") if doc else None
+    return risk_table_version
+
+
+def _risk_to_params(risk: int, asset: Optional[str] = None) -> Dict[str, float]:
+    risk = max(1, min(5, risk))
+    for key in ((asset or "").upper(), "*"):
+        params = _risk_table.get(key, {}).get(risk)
+        if params:
+            return params
+    return _DEFAULT_PARAMS[risk]
 
 
-def _risk_to_params(risk: int) -> Dict[str, float]:
-    # Simple mapping from risk 1..5 to stop_loss and take_profit multipliers / max_dd
-    mapping = {
-        1: {"stop_loss": 0.01, "take_profit": 0.02, "max_dd": 0.04},
-        2: {"stop_loss": 0.02, "take_profit": 0.04, "max_dd": 0.06},
-        3: {"stop_loss": 0.03, "take_profit": 0.06, "max_dd": 0.08},
-        4: {"stop_loss": 0.04, "take_profit": 0.08, "max_dd": 0.1},
-        5: {"stop_loss": 0.05, "take_profit": 0.12, "max_dd": 0.12},
+def _params_chunk(ids: List[str], arrays: Dict[str, np.ndarray]) -> np.ndarray:
+    """Pool task: (n, 3) stop_loss/take_profit/max_dd rows looked up in the (asset, risk) table."""
+    return arrays["table"][arrays["asset"], np.clip(arrays["risk"], 1, 5) - 1]
+
+
+async def _batch_params(batch: List[Dict[str, Any]]) -> Dict[str, Dict[str, float]]:
+    ids = [str(i.get("id")) for i in batch]
+    assets = sorted({str(i.get("asset") or "").upper() for i in batch})
+    slot = {a: n for n, a in enumerate(assets)}
+    table = np.array([
+        [[p["stop_loss"], p["take_profit"], p["max_dd"]] for p in (_risk_to_params(r, a) for r in range(1, 6))]
+        for a in assets
+    ])
+    arrays = {
+        "risk": np.array([int(i.get("risk", 3)) for i in batch], dtype=np.int64),
+        "asset": np.array([slot[str(i.get("asset") or "").upper()] for i in batch], dtype=np.int64),
     }
-    return mapping.get(max(1, min(5, risk)), mapping[3])
+    out: Dict[str, Dict[str, float]] = {}
+    async for chunk_ids, rows in agent_pool.map_chunks(_params_chunk, ids, arrays, shared={"table": table}):
+        for idea_id, (sl, tp, dd) in zip(chunk_ids, rows.tolist()):
+            out[idea_id] = {"stop_loss": sl, "take_profit": tp, "max_dd": dd}
+    return out
+
+
+def _stored_returns(assets) -> Dict[str, np.ndarray]:
+    """1-minute log returns from the market store for assets with recorded history."""
+    out: Dict[str, np.ndarray] = {}
+    known = set(market_store.assets())
+    for asset in {str(a or "").upper() for a in assets} & known:
+        last = market_store.last_ts(asset)
+        if last is None:
+            continue
+        rets = market_store.log_returns(asset, 60, start=last - MC_LOOKBACK_SECONDS)
+        if len(rets):
+            out[asset] = rets
+    return out
+
+
+async def _cap_off_loop(ideas: List[Dict[str, Any]], params: Dict[str, Dict[str, float]]) -> None:
+    """`cap_budgets` (tens of ms of numpy per call) on the default executor, off the event loop."""
+    def _run() -> None:
+        cap_budgets(ideas, params, returns_by_asset=_stored_returns(i.get("asset") for i in ideas))
+
+    await asyncio.get_running_loop().run_in_executor(None, _run)
+
+
+def _market_stamps(assets) -> Dict[str, Optional[int]]:
+    """Latest stored bar per asset; a cached template is only reused while this is unchanged."""
+    known = set(market_store.assets())
+    return {a: (market_store.last_ts(a) if a in known else None) for a in {str(x or "").upper() for x in assets}}
+
+
+async def _templates_for(batch: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Strategy template (params + Monte Carlo metrics) per idea, computed once per distinct idea content."""
+    stamps = _market_stamps(i.get("asset") for i in batch)
+    keys = [template_key(i, risk_table_version) for i in batch]
+    found: Dict[str, Dict[str, Any]] = {}
+    reps: Dict[str, Dict[str, Any]] = {}  # one representative idea per missing key
+    for idea, key in zip(batch, keys):
+        if key in found or key in reps:
+            continue
+        tpl = template_cache.get(key, stamps[str(idea.get("asset") or "").upper()])
+        if tpl is not None:
+            found[key] = tpl
+        else:
+            reps[key] = idea
+    if reps:
+        rep_list = list(reps.values())
+        precomputed = await _batch_params(rep_list) if len(rep_list) >= POOL_MIN_BATCH else {}
+        params = {
+            key: precomputed.get(str(i.get("id"))) or _risk_to_params(int(i.get("risk", 3)), i.get("asset"))
+            for key, i in reps.items()
+        }
+        metrics: Dict[str, Optional[Dict[str, Any]]] = dict.fromkeys(reps)
+        if mc_enabled():
+            # one Monte Carlo pass per asset over the distinct contents; the budget is irrelevant to VaR/CVaR
+            probes = [dict(i, id=key, budget=1.0, risk_metrics=None) for key, i in reps.items()]
+            await _cap_off_loop(probes, params)
+            for probe in probes:
+                m = probe["risk_metrics"]
+                metrics[probe["id"]] = {"var": m["var"], "cvar": m["cvar"], "alpha": m["alpha"], "paths": m["paths"]}
+        for key, idea in reps.items():
+            found[key] = {"key": key, "params": params[key], "risk_metrics": metrics[key]}
+            template_cache.put(key, found[key], stamps[str(idea.get("asset") or "").upper()])
+    return [found[key] for key in keys]
+
+
+def _apply_template(idea: Dict[str, Any], tpl: Dict[str, Any]) -> None:
+    m = tpl.get("risk_metrics")
+    if m is not None:
+        apply_cap(idea, m["var"], m["cvar"], m["alpha"], m["paths"])
+
+
+load_risk_table()
 
 
 async def generate_strategies_from_ideas(limit: int = 10, only_status: Optional[List[str]] = None) -> List[Dict[str, Any]]:
     """Generate strategy drafts from recent ideas.
 
-    - Picks ideas from `ideas_store` matching `only_status` (if provided) or default NEW/NEEDS_REVIEW.
+    - Picks ideas from `ideas_store` matching `only_status` (if provided) or default NEW/NEEDS_REVIEW
+      that have no strategy yet.
+    - Caps their budgets with one batched Monte Carlo run (see `src.agents.montecarlo`); ideas with the
+      same content reuse a cached template (see `src.agents.templates`).
     - Creates Strategy drafts and inserts into `strategies_store`.
     - Publishes to `strategy_stream` on the bus.
     Returns list of created strategy dicts.
@@ -32,38 +171,69 @@ async def generate_strategies_from_ideas(limit: int = 10, only_status: Optional[
     if only_status is None:
         only_status = ["NEW", "NEEDS_REVIEW"]
 
-    created: List[Dict[str, Any]] = []
-    now = datetime.now(timezone.utc)
-
-    candidates = [i for i in ideas_store if i.get("status") in only_status]
-    # sort by created_at desc if available
-    try:
-        candidates = sorted(candidates, key=lambda x: x.get("created_at") or now, reverse=True)
-    except Exception:
-        pass
-
-    for idea in candidates[:limit]:
-        params = _risk_to_params(int(idea.get("risk", 3)))
-        strat = {
-            "id": str(uuid4()),
-            "idea_id": idea.get("id"),
-            "entry_conditions": f"enter when price breaks X on {idea.get('asset')}",
-            "exit_conditions": f"exit when target reached or stop loss hit",
-            "stop_loss": params["stop_loss"],
-            "take_profit": params["take_profit"],
-            "max_dd": params["max_dd"],
-            "status": StrategyStatus.DRAFT,
-        }
-        strategies_store.insert(0, strat)
-        # publish lightweight strategy to bus
-        await bus.publish("strategy_stream", {
-            "strategy_id": strat["id"],
-            "idea_id": strat["idea_id"],
-            "asset": idea.get("asset"),
-            "stop_loss": strat["stop_loss"],
-            "take_profit": strat["take_profit"],
-            "created_at": now.isoformat(),
-        })
-        created.append(strat)
+    # newest first, straight from the status / strategy_id / created_at indexes; (None,) selects ideas without one
+    batch = ideas_store.query(where={"status": only_status, "strategy_id": (None,)}, order_by="created_at", limit=limit)
+    return await generate_strategies_for(batch)
 
+
+async def generate_strategies_for(batch: List[Dict[str, Any]], now: Optional[datetime] = None) -> List[Dict[str, Any]]:
+    """One strategy draft per idea in `batch`, skipping ideas that already have one.
+
+    Both the `idea_stream` worker and `POST /strategies/generate` end up here, so an idea
+    picked up by both still gets a single strategy.
+    """
+    now = now or datetime.now(timezone.utc)
+    templates = await _templates_for(batch)
+    created: List[Dict[str, Any]] = []
+    for idea, tpl in zip(batch, templates):
+        # no await between this check and the insert in generate_strategy_for_idea
+        if strategies_store.find("idea_id", idea.get("id")) is not None:
+            continue
+        _apply_template(idea, tpl)  # re-indexed with the strategy_id below
+        created.append(await generate_strategy_for_idea(idea, now=now, params=tpl["params"], size=False, template_id=tpl["key"]))
     return created
+
+
+async def generate_strategy_for_idea(idea: Dict[str, Any], now: Optional[datetime] = None, params: Optional[Dict[str, float]] = None,
+                                    size: bool = True, template_id: Optional[str] = None) -> Dict[str, Any]:
+    """Create a single strategy draft for `idea`, store it and publish it to `strategy_stream`.
+
+    With `size=True` the idea's budget is first capped by the Monte Carlo risk check.
+    Without explicit `params` the cached template for the idea's content is used.
+    """
+    now = now or datetime.now(timezone.utc)
+    if params is None:
+        tpl = (await _templates_for([idea]))[0]
+        params, template_id = tpl["params"], tpl["key"]
+        if size:
+            _apply_template(idea, tpl)
+            ideas_store.touch(idea)
+    elif size and mc_enabled():
+        await _cap_off_loop([idea], {str(idea.get("id")): params})
+        ideas_store.touch(idea)
+    strat = {
+        "id": str(uuid4()),
+        "idea_id": idea.get("id"),
+        "entry_conditions": f"enter when price breaks X on {idea.get('asset')}",
+        "exit_conditions": f"exit when target reached or stop loss hit",
+        "stop_loss": params["stop_loss"],
+        "take_profit": params["take_profit"],
+        "max_dd": params["max_dd"],
+        "status": StrategyStatus.DRAFT,
+        "template_id": template_id,
+    }
+    strategies_store.insert(0, strat)
+    idea["strategy_id"] = strat["id"]
+    ideas_store.touch(idea)
+    # publish lightweight strategy to bus
+    await bus.publish("strategy_stream", {
+        "strategy_id": strat["id"],
+        "idea_id": strat["idea_id"],
+        "asset": idea.get("asset"),
+        "stop_loss": strat["stop_loss"],
+        "take_profit": strat["take_profit"],
+        "max_dd": strat["max_dd"],
+        "exit_conditions": strat["exit_conditions"],
+        "created_at": now.isoformat(),
+    })
+    return strat
@@ -0,0 +1,134 @@
+"""Vectorized backtester for strategy exit rules.
+
+Evaluates a whole batch of strategies (stop_loss / take_profit / max_dd) over
+one asset's OHLCV history at once. The history is cut into consecutive
+windows of `window` bars; each strategy opens a long position at the open of
+every window and leaves it at the first of:
+
+- stop loss:   low falls `stop_loss` below the entry price (filled at the stop level)
+- take profit: high rises `take_profit` above the entry price (filled at the target)
+- drawdown:    close falls `max_dd` below the running peak since entry (filled at that close)
+- window end:  closed at the window's last close
+
+If stop and target are touched in the same bar the stop wins (conservative).
+
+Every exit test is a "first bar where a non-decreasing series crosses a
+threshold" question, so all (window, strategy) pairs are answered with a
+single `searchsorted` over the flattened series instead of a bar-by-bar loop:
+O(T + S * W * log T) for T bars, S strategies and W windows.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Dict, List, Mapping, Sequence
+
+import numpy as np
+
+
+EXIT_NONE, EXIT_STOP, EXIT_TAKE_PROFIT, EXIT_DRAWDOWN = 0, 1, 2, 3
+
+
+@dataclass
+class BacktestResult:
+    """Per-strategy metrics; all arrays have one entry per strategy."""
+
+    pnl: np.ndarray  # sum of per-window returns (fraction of the position)
+    hit_rate: np.ndarray  # share of windows closed with a gain
+    max_drawdown: np.ndarray  # worst peak-to-trough of the compounded equity curve
+    trades: int  # windows traded by every strategy
+
+    def to_records(self, ids: Sequence[str]) -> List[Dict[str, Any]]:
+        return [
+            {"strategy_id": sid, "pnl": float(p), "hit_rate": float(h), "max_drawdown": float(d), "trades": self.trades}
+            for sid, p, h, d in zip(ids, self.pnl, self.hit_rate, self.max_drawdown)
+        ]
+
+
+def _first_cross(metric: np.ndarray, thresholds: np.ndarray) -> np.ndarray:
+    """First column index per (row, threshold) where a row-wise non-decreasing `metric` >= threshold.
+
+    `metric` is (W, H), `thresholds` is (S,). Returns (W, S) ints, H where never reached.
+    Rows are lifted onto disjoint ranges so one flat searchsorted answers every query.
+    """
+    rows, width = metric.shape
+    span = metric[:, -1] - metric[:, 0] + 1.0
+    base = np.concatenate(([0.0], np.cumsum(span)[:-1])) - metric[:, 0]
+    flat = (metric + base[:, None]).ravel()
+    pos = np.searchsorted(flat, base[:, None] + thresholds[None, :], side="left")
+    return np.clip(pos - (np.arange(rows) * width)[:, None], 0, width)
+
+
+def backtest(bars: Mapping[str, np.ndarray], stop_loss: np.ndarray, take_profit: np.ndarray, max_dd: np.ndarray,
+             window: int = 1440) -> BacktestResult:
+    """Backtest long-only exit rules for S strategies over `bars`.
+
+    `bars` maps "open", "high", "low", "close" to equally long 1-d arrays
+    (e.g. minute bars); trailing bars that do not fill a whole window are ignored.
+    `stop_loss`, `take_profit` and `max_dd` are (S,) fractions, e.g. 0.03 for 3 %.
+    """
+    sl = np.asarray(stop_loss, dtype=np.float64).ravel()
+    tp = np.asarray(take_profit, dtype=np.float64).ravel()
+    dd = np.asarray(max_dd, dtype=np.float64).ravel()
+    if not (sl.shape == tp.shape == dd.shape):
+        raise ValueError("stop_loss, take_profit and max_dd must have the same length")
+
+    n = len(bars["close"])
+    window = max(1, min(int(window), n))
+    w = n // window
+    if w == 0:
+        raise ValueError("not enough bars for a single window")
+    cut = w * window
+
+    def grid(key: str) -> np.ndarray:
+        return np.asarray(bars[key][:cut], dtype=np.float64).reshape(w, window)
+
+    opens, highs, lows, closes = grid("open"), grid("high"), grid("low"), grid("close")
+    entry = opens[:, :1]
+
+    # non-decreasing per window: how far price has dropped / risen / retraced so far
+    drop = 1.0 - np.minimum.accumulate(lows, axis=1) / entry
+    rise = np.maximum.accumulate(highs, axis=1) / entry - 1.0
+    peak = np.maximum.accumulate(np.maximum(highs, entry), axis=1)
+    retrace = np.maximum.accumulate(1.0 - closes / peak, axis=1)
+
+    t_stop = _first_cross(drop, sl)
+    t_tp = _first_cross(rise, tp)
+    t_dd = _first_cross(retrace, dd)
+
+    t_exit = np.minimum(np.minimum(t_stop, t_tp), t_dd)
+    reason = np.full(t_exit.shape, EXIT_NONE, dtype=np.int8)
+    reason[t_dd == t_exit] = EXIT_DRAWDOWN
+    reason[t_tp == t_exit] = EXIT_TAKE_PROFIT
+    reason[t_stop == t_exit] = EXIT_STOP  # stop wins ties
+    reason[t_exit >= window] = EXIT_NONE
+
+    rows = np.arange(w)[:, None]
+    dd_close = closes[rows, np.minimum(t_exit, window - 1)] / entry - 1.0
+    ret = np.select(
+        [reason == EXIT_STOP, reason == EXIT_TAKE_PROFIT, reason == EXIT_DRAWDOWN],
+        [-np.broadcast_to(sl, t_exit.shape), np.broadcast_to(tp, t_exit.shape), dd_close],
+        default=closes[:, -1:] / entry - 1.0,
+    )
+
+    equity = np.cumprod(1.0 + ret, axis=0)
+    peak_eq = np.maximum(np.maximum.accumulate(equity, axis=0), 1.0)
+    max_drawdown = (1.0 - equity / peak_eq).max(axis=0)
+
+    return BacktestResult(
+        pnl=ret.sum(axis=0),
+        hit_rate=(ret > 0).mean(axis=0),
+        max_drawdown=max_drawdown,
+        trades=w,
+    )
+
+
+def backtest_strategies(bars: Mapping[str, np.ndarray], strategies: Sequence[Dict[str, Any]], window: int = 1440) -> List[Dict[str, Any]]:
+    """Convenience wrapper for strategy dicts as stored in `strategies_store`."""
+    result = backtest(
+        bars,
+        np.array([s["stop_loss"] for s in strategies], dtype=np.float64),
+        np.array([s["take_profit"] for s in strategies], dtype=np.float64),
+        np.array([s["max_dd"] for s in strategies], dtype=np.float64),
+        window=window,
+    )
+    return result.to_records([s.get("id") for s in strategies])
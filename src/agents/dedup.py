@@ -0,0 +1,80 @@
+"""Near-duplicate suppression for research ideas.
+
+Two ideas are near-duplicates when they share (asset, type, risk bucket). An
+idea is dropped when such an idea was emitted within the last `window`
+seconds (a time-windowed set, expired oldest-first), or when `ideas_store`
+still holds one open (not cancelled), so a research cycle that yields the
+same seeds or market list again only lets genuinely new ideas through to
+analysis, QA and the bus.
+
+Tuning (env): RESEARCH_DEDUP_WINDOW_SECONDS (default 3600, `0` disables),
+RESEARCH_DEDUP_RISK_BUCKET (width of a risk bucket, default 1 = exact risk).
+"""
+from __future__ import annotations
+
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.infra.indexed import IndexedList
+from src.store import ideas_store
+
+
+OPEN_STATUSES = ("NEW", "NEEDS_REVIEW", "READY_FOR_QA", "APPROVED", "SCHEDULED")
+
+Key = Tuple[str, Any, int]
+
+
+class IdeaDeduper:
+    def __init__(self, window: float = float(os.getenv("RESEARCH_DEDUP_WINDOW_SECONDS", "3600")),
+                 risk_bucket: int = int(os.getenv("RESEARCH_DEDUP_RISK_BUCKET", "1")),
+                 store: Optional[IndexedList] = None) -> None:
+        self.window = window
+        self.risk_bucket = max(1, risk_bucket)
+        self.store = ideas_store if store is None else store
+        self._seen: "OrderedDict[Key, float]" = OrderedDict()  # key -> expiry, oldest first
+        self.stats = {"kept": 0, "dropped": 0}
+
+    @property
+    def enabled(self) -> bool:
+        return self.window > 0
+
+    def key(self, idea: Dict[str, Any]) -> Key:
+        return (str(idea.get("asset") or "").upper(), idea.get("type"), (int(idea.get("risk", 3)) - 1) // self.risk_bucket)
+
+    def _expire(self, now: float) -> None:
+        while self._seen:
+            key, expires = next(iter(self._seen.items()))
+            if expires > now:
+                break
+            del self._seen[key]
+
+    def _held_open(self, key: Key) -> bool:
+        asset, type_, bucket = key
+        lo = bucket * self.risk_bucket + 1
+        return bool(self.store.query(where={"asset": asset, "type": type_, "status": OPEN_STATUSES},
+                                     ranges={"risk": (lo, lo + self.risk_bucket - 1)}, limit=1))
+
+    def filter(self, ideas: List[Dict[str, Any]], now: Optional[float] = None) -> List[Dict[str, Any]]:
+        """The ideas that are not near-duplicates of a recent or open one (nor of each other)."""
+        if not self.enabled:
+            return list(ideas)
+        now = time.monotonic() if now is None else now
+        self._expire(now)
+        kept = []
+        for idea in ideas:
+            key = self.key(idea)
+            if key in self._seen or self._held_open(key):
+                self.stats["dropped"] += 1
+                continue
+            self._seen[key] = now + self.window
+            kept.append(idea)
+        self.stats["kept"] += len(kept)
+        return kept
+
+    def clear(self) -> None:
+        self._seen.clear()
+
+
+idea_deduper = IdeaDeduper()
@@ -0,0 +1,128 @@
+"""Monte Carlo loss simulation for sizing idea budgets.
+
+Simulates many price paths per asset (GBM, or bootstrap from stored
+returns), plays each idea's stop_loss / take_profit / ttl against every path
+and derives the loss distribution of one SOL of budget. The budget is then
+capped so that the expected tail loss (CVaR) stays within `MC_MAX_LOSS_SOL`.
+
+Paths are shared by all ideas on the same asset, identical exit rules are
+evaluated once, and the exit search reuses the backtester's flattened
+`searchsorted`, so a whole batch of pending ideas costs one simulation per
+asset.
+"""
+from __future__ import annotations
+
+import os
+from typing import Any, Dict, List, Mapping, Optional, Sequence
+
+import numpy as np
+
+from src.agents.backtest import _first_cross
+
+
+MC_PATHS = int(os.getenv("MC_PATHS", "10000"))
+MC_ALPHA = float(os.getenv("MC_ALPHA", "0.95"))
+MC_MAX_LOSS_SOL = float(os.getenv("MC_MAX_LOSS_SOL", "0.05"))
+MAX_STEPS = 240  # time resolution cap per path; long ttls use coarser steps
+YEAR_SECONDS = 365 * 24 * 3600
+
+# assumed annualised volatility when no return history is available
+ASSET_VOL = {"SOL": 0.8, "JUP": 1.1, "RAY": 1.1, "ORCA": 1.1, "BONK": 1.6, "PUMP": 1.8}
+DEFAULT_VOL = 1.2
+
+
+def mc_enabled() -> bool:
+    return os.getenv("MC_SIZING", "1").lower() not in ("0", "false", "no")
+
+
+def simulate_log_paths(n_paths: int, steps: int, dt: float, sigma: float, mu: float = 0.0,
+                       returns: Optional[np.ndarray] = None, rng: Optional[np.random.Generator] = None,
+                       block: int = 1) -> np.ndarray:
+    """Cumulative log-price paths, shape (n_paths, steps), starting from 0.
+
+    GBM with annualised `mu`/`sigma` and step `dt` (years), or - if `returns`
+    is given - an i.i.d. bootstrap that sums `block` resampled returns per step.
+    """
+    rng = rng or np.random.default_rng()
+    if returns is not None and len(returns):
+        draws = rng.choice(np.asarray(returns, dtype=np.float64), size=(n_paths, steps, max(1, block)), replace=True)
+        inc = draws.sum(axis=2)
+    else:
+        inc = rng.standard_normal((n_paths, steps)) * (sigma * np.sqrt(dt)) + (mu - 0.5 * sigma * sigma) * dt
+    return np.cumsum(inc, axis=1)
+
+
+def strategy_returns(paths: np.ndarray, stop_loss: np.ndarray, take_profit: np.ndarray, horizon: np.ndarray) -> np.ndarray:
+    """Return of a long position per (path, idea): stop, target or mark-to-market at `horizon` steps.
+
+    `paths` is (P, T) cumulative log prices; the other arguments are (I,). Result is (P, I).
+    """
+    prices = np.exp(paths)
+    drop = 1.0 - np.minimum.accumulate(np.minimum(prices, 1.0), axis=1)
+    rise = np.maximum.accumulate(np.maximum(prices, 1.0), axis=1) - 1.0
+    t_stop = _first_cross(drop, stop_loss)
+    t_tp = _first_cross(rise, take_profit)
+    h = np.clip(horizon, 1, paths.shape[1])
+    stopped = (t_stop < h) & (t_stop <= t_tp)
+    took = (t_tp < h) & ~stopped
+    at_horizon = prices[:, h - 1] - 1.0
+    return np.where(stopped, -stop_loss, np.where(took, take_profit, at_horizon))
+
+
+def var_cvar(returns: np.ndarray, alpha: float = MC_ALPHA) -> tuple:
+    """Per-column VaR and CVaR of the loss (-return) at confidence `alpha`, as positive fractions."""
+    losses = -returns
+    var = np.quantile(losses, alpha, axis=0)
+    tail = losses >= var
+    cvar = (losses * tail).sum(axis=0) / np.maximum(tail.sum(axis=0), 1)
+    return np.maximum(var, 0.0), np.maximum(cvar, 0.0)
+
+
+def cap_budgets(ideas: Sequence[Dict[str, Any]], params: Mapping[str, Mapping[str, float]],
+                returns_by_asset: Optional[Mapping[str, np.ndarray]] = None, n_paths: int = MC_PATHS,
+                alpha: float = MC_ALPHA, max_loss: float = MC_MAX_LOSS_SOL, seed: Optional[int] = None,
+                returns_seconds: float = 60.0) -> List[Dict[str, Any]]:
+    """Size `ideas` in place: budget <= max_loss / CVaR, with the metrics stored on each idea.
+
+    `params` maps idea id -> {"stop_loss", "take_profit", ...}. `returns_by_asset`
+    optionally supplies stored log returns (one per `returns_seconds`) to
+    bootstrap from instead of GBM. Budgets are only ever lowered. Returns the ideas.
+    """
+    rng = np.random.default_rng(seed)
+    by_asset: Dict[str, List[Dict[str, Any]]] = {}
+    for idea in ideas:
+        by_asset.setdefault(str(idea.get("asset") or "").upper(), []).append(idea)
+
+    for asset, group in by_asset.items():
+        ttl = np.array([float(i.get("ttl") or 5400) for i in group])
+        step = max(60.0, float(ttl.max()) / MAX_STEPS)
+        horizon = np.maximum(1, np.ceil(ttl / step)).astype(np.int64)
+        returns = (returns_by_asset or {}).get(asset)
+        sigma = ASSET_VOL.get(asset, DEFAULT_VOL)
+        paths = simulate_log_paths(n_paths, int(horizon.max()), step / YEAR_SECONDS, sigma, returns=returns, rng=rng,
+                                   block=int(round(step / returns_seconds)))
+        sl = np.array([params[str(i.get("id"))]["stop_loss"] for i in group])
+        tp = np.array([params[str(i.get("id"))]["take_profit"] for i in group])
+        # ideas mostly share a handful of (stop, target, horizon) combos: evaluate each once
+        combos, inverse = np.unique(np.stack([sl, tp, horizon]), axis=1, return_inverse=True)
+        var, cvar = var_cvar(strategy_returns(paths, combos[0], combos[1], combos[2].astype(np.int64)), alpha)
+        inverse = inverse.ravel()
+        for idea, v, cv in zip(group, var[inverse].tolist(), cvar[inverse].tolist()):
+            apply_cap(idea, v, cv, alpha, n_paths, max_loss)
+    return list(ideas)
+
+
+def apply_cap(idea: Dict[str, Any], var: float, cvar: float, alpha: float = MC_ALPHA, n_paths: int = MC_PATHS,
+              max_loss: float = MC_MAX_LOSS_SOL) -> Dict[str, Any]:
+    """Lower `idea`'s budget to max_loss / CVaR (per SOL of budget) and record the metrics on it.
+
+    Re-sizing an idea starts again from the budget it first requested, not the already capped one.
+    """
+    requested = float((idea.get("risk_metrics") or {}).get("budget_requested", idea.get("budget")) or 0.0)
+    capped = min(requested, max_loss / cvar) if cvar > 0 else requested
+    idea["budget"] = round(capped, 6)
+    idea["risk_metrics"] = {
+        "var": round(var, 6), "cvar": round(cvar, 6), "alpha": alpha, "paths": n_paths,
+        "budget_requested": requested, "expected_tail_loss_sol": round(capped * cvar, 6),
+    }
+    return idea
@@ -0,0 +1,169 @@
+"""Process-pool executor for CPU-heavy agent work.
+
+Keeps indicator math, scoring and backtests off the API event loop. Work is
+submitted in chunks; each task only carries a slice of ids plus the names of
+shared-memory blocks holding the input arrays, so payloads stay small no
+matter how big the batch is. Results come back as an async stream in
+completion order and can be published straight to the bus.
+
+`AGENT_POOL_WORKERS` sets the pool size (default: CPU count, `0` runs chunks
+inline, which is handy for debugging). Workers are started with
+`AGENT_POOL_START_METHOD` (default `forkserver`, `spawn` where that is not
+available), never by forking the threaded server process, so chunk functions
+and everything they use must be importable at module level.
+"""
+from __future__ import annotations
+
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Any, AsyncIterator, Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.bus import bus
+
+
+class ArrayHandle(NamedTuple):
+    """Picklable reference to an array living in shared memory."""
+
+    name: str
+    shape: Tuple[int, ...]
+    dtype: str
+
+
+ChunkFn = Callable[[List[str], Dict[str, np.ndarray]], Any]
+
+
+class SharedArrays:
+    """Copies a dict of arrays into shared memory once; use as a context manager."""
+
+    def __init__(self, arrays: Optional[Dict[str, np.ndarray]] = None) -> None:
+        self._blocks: List[shared_memory.SharedMemory] = []
+        self.handles: Dict[str, ArrayHandle] = {}
+        for key, arr in (arrays or {}).items():
+            arr = np.ascontiguousarray(arr)
+            shm = shared_memory.SharedMemory(create=True, size=max(1, arr.nbytes))
+            np.ndarray(arr.shape, dtype=arr.dtype, buffer=shm.buf)[...] = arr
+            self._blocks.append(shm)
+            self.handles[key] = ArrayHandle(shm.name, arr.shape, arr.dtype.str)
+
+    def close(self) -> None:
+        for shm in self._blocks:
+            shm.close()
+            try:
+                shm.unlink()
+            except FileNotFoundError:
+                pass
+        self._blocks.clear()
+
+    def __enter__(self) -> "SharedArrays":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def attach(handles: Dict[str, ArrayHandle]) -> Tuple[Dict[str, np.ndarray], List[shared_memory.SharedMemory]]:
+    """Map shared arrays into this process. Close the returned blocks when done."""
+    arrays: Dict[str, np.ndarray] = {}
+    blocks: List[shared_memory.SharedMemory] = []
+    for key, h in handles.items():
+        shm = shared_memory.SharedMemory(name=h.name)
+        blocks.append(shm)
+        arrays[key] = np.ndarray(h.shape, dtype=np.dtype(h.dtype), buffer=shm.buf)
+    return arrays, blocks
+
+
+def _run_chunk(fn: ChunkFn, ids: List[str], handles: Dict[str, ArrayHandle], start: int, stop: int, whole: Tuple[str, ...] = ()) -> Any:
+    """Pool entry point: attach inputs, run `fn` on rows [start, stop)."""
+    arrays, blocks = attach(handles)
+    try:
+        # row arrays are aligned with the full id list; hand fn views of its rows (no copies)
+        chunk = {k: (v if k in whole else v[start:stop]) for k, v in arrays.items()}
+        result = fn(ids, chunk)
+        if isinstance(result, np.ndarray):
+            result = result.copy()  # must not outlive the shared block
+        return result
+    finally:
+        del arrays
+        for shm in blocks:
+            shm.close()
+
+
+def _start_method() -> str:
+    default = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+    return os.getenv("AGENT_POOL_START_METHOD", default)
+
+
+class AgentPool:
+    def __init__(self, workers: Optional[int] = None, chunk_size: int = 256) -> None:
+        if workers is None:
+            workers = int(os.getenv("AGENT_POOL_WORKERS", os.cpu_count() or 1))
+        self.workers = max(0, workers)
+        self.chunk_size = max(1, chunk_size)
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def _ensure(self) -> Optional[ProcessPoolExecutor]:
+        if self.workers and self._executor is None:
+            # fork would copy the event loop, bus clients and held locks of other threads into each worker
+            self._executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context(_start_method()))
+        return self._executor
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+    async def map_chunks(self, fn: ChunkFn, ids: Sequence[str], arrays: Optional[Dict[str, np.ndarray]] = None,
+                         chunk_size: Optional[int] = None, shared: Optional[Dict[str, np.ndarray]] = None) -> AsyncIterator[Tuple[List[str], Any]]:
+        """Run `fn(ids_chunk, arrays_chunk)` over row chunks, yielding `(ids_chunk, result)` as chunks finish.
+
+        `fn` must be picklable (module-level function or a `functools.partial` of one).
+        Every array in `arrays` must have one row per id and is sliced per chunk;
+        arrays in `shared` (e.g. price history) are handed to every chunk whole.
+        """
+        ids = list(ids)
+        size = chunk_size or self.chunk_size
+        bounds = [(i, min(i + size, len(ids))) for i in range(0, len(ids), size)]
+        whole = tuple(shared or ())
+        executor = self._ensure()
+        if executor is None:
+            for start, stop in bounds:
+                chunk = {k: v[start:stop] for k, v in (arrays or {}).items()}
+                chunk.update(shared or {})
+                yield ids[start:stop], fn(ids[start:stop], chunk)
+            return
+
+        loop = asyncio.get_running_loop()
+        with SharedArrays({**(arrays or {}), **(shared or {})}) as blocks:
+
+            async def _submit(start: int, stop: int) -> Tuple[List[str], Any]:
+                chunk_ids = ids[start:stop]
+                result = await loop.run_in_executor(executor, _run_chunk, fn, chunk_ids, blocks.handles, start, stop, whole)
+                return chunk_ids, result
+
+            tasks = [asyncio.ensure_future(_submit(start, stop)) for start, stop in bounds]
+            try:
+                for fut in asyncio.as_completed(tasks):
+                    yield await fut
+            finally:
+                for t in tasks:
+                    t.cancel()
+                # blocks are unlinked only once no chunk can still be attaching
+                await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def stream_to_bus(self, stream: str, fn: ChunkFn, ids: Sequence[str], arrays: Optional[Dict[str, np.ndarray]] = None,
+                            chunk_size: Optional[int] = None, shared: Optional[Dict[str, np.ndarray]] = None) -> int:
+        """Like `map_chunks`, publishing each chunk result to `stream`. `fn` returns a list of dicts."""
+        published = 0
+        async for _ids, rows in self.map_chunks(fn, ids, arrays, chunk_size, shared):
+            for row in rows:
+                await bus.publish(stream, row)
+                published += 1
+        return published
+
+
+agent_pool = AgentPool()
@@ -0,0 +1,166 @@
+"""Quality agent: declarative policy rules evaluated over batches of ideas and strategies.
+
+Rules are plain dicts (the built-in `DEFAULT_POLICY`, or a JSON list at
+QA_POLICY_PATH), e.g.
+
+    {"name": "budget_cap", "target": "idea", "field": "budget", "op": "<=", "value": 5.0}
+
+Supported ops: `<`, `<=`, `>`, `>=`, `==`, `!=` against a constant `value` or
+another column (`"ref": "take_profit"`), `between` (inclusive `[lo, hi]`),
+`in` (allowed values) and `required` (present and non-empty). `compile_policy`
+turns each rule into a numpy predicate once; `evaluate` then builds one column
+array per field for a whole batch and runs every rule as a single vectorized
+comparison. Each record gets a `QAReport` published to `qa_stream`.
+"""
+from __future__ import annotations
+
+import json
+import operator
+import os
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional
+from uuid import uuid4
+
+import numpy as np
+
+from src.bus import bus
+from src.store import ideas_store, qa_reports_store
+
+
+QA_STREAM = "qa_stream"
+QA_POLICY_PATH = os.getenv("QA_POLICY_PATH", "")
+
+DEFAULT_POLICY: List[Dict[str, Any]] = [
+    {"name": "asset_required", "target": "idea", "field": "asset", "op": "required"},
+    {"name": "budget_positive", "target": "idea", "field": "budget", "op": ">", "value": 0},
+    {"name": "budget_cap", "target": "idea", "field": "budget", "op": "<=",
+     "value": float(os.getenv("QA_MAX_BUDGET", "5.0"))},
+    {"name": "risk_range", "target": "idea", "field": "risk", "op": "between", "value": [1, 5]},
+    {"name": "ttl_sane", "target": "idea", "field": "ttl", "op": "between", "value": [60, 86400]},
+    {"name": "exit_required", "target": "strategy", "field": "exit_conditions", "op": "required"},
+    {"name": "stop_loss_range", "target": "strategy", "field": "stop_loss", "op": "between", "value": [0.001, 0.5]},
+    {"name": "take_profit_above_stop", "target": "strategy", "field": "take_profit", "op": ">", "ref": "stop_loss"},
+    {"name": "max_dd_range", "target": "strategy", "field": "max_dd", "op": "between", "value": [0.001, 0.5]},
+]
+
+_CMP: Dict[str, Callable[[np.ndarray, Any], np.ndarray]] = {
+    "<": operator.lt, "<=": operator.le, ">": operator.gt, ">=": operator.ge, "==": operator.eq, "!=": operator.ne,
+}
+
+Columns = Dict[str, np.ndarray]
+
+
+@dataclass
+class CompiledRule:
+    name: str
+    message: str
+    fields: tuple
+    numeric: bool
+    passes: Callable[[Columns], np.ndarray]  # columns -> bool mask, True = rule satisfied
+
+
+def _compile(rule: Dict[str, Any]) -> CompiledRule:
+    name, field, op = rule["name"], rule["field"], rule.get("op", "required")
+    value, ref = rule.get("value"), rule.get("ref")
+    message = rule.get("message") or " ".join(str(x) for x in (field, op, ref or value) if x is not None)
+    if op in _CMP:
+        cmp = _CMP[op]
+        if ref:
+            # NaN (missing) compares False, so a missing field fails the rule
+            return CompiledRule(name, message, (field, ref), True, lambda c: cmp(c[field], c[ref]))
+        v = float(value)
+        return CompiledRule(name, message, (field,), True, lambda c: cmp(c[field], v))
+    if op == "between":
+        lo, hi = (float(x) for x in value)
+        return CompiledRule(name, message, (field,), True, lambda c: (c[field] >= lo) & (c[field] <= hi))
+    if op == "in":
+        allowed = np.array(list(value), dtype=object)
+        return CompiledRule(name, message, (field,), False, lambda c: np.isin(c[field], allowed))
+    if op == "required":
+        return CompiledRule(name, message, (field,), False,
+                            lambda c: np.frompyfunc(lambda x: x is not None and x != "", 1, 1)(c[field]).astype(bool))
+    raise ValueError(f"Unknown op {op!r} in rule {name}")
+
+
+def compile_policy(rules: Iterable[Dict[str, Any]]) -> Dict[str, List[CompiledRule]]:
+    """Group rules by target ("idea" / "strategy") and compile each to a vectorized predicate."""
+    compiled: Dict[str, List[CompiledRule]] = {}
+    for rule in rules:
+        compiled.setdefault(rule.get("target", "idea"), []).append(_compile(rule))
+    return compiled
+
+
+def load_policy(path: Optional[str] = None) -> Dict[str, List[CompiledRule]]:
+    path = path or QA_POLICY_PATH
+    if path:
+        with open(path) as f:
+            return compile_policy(json.load(f))
+    return compile_policy(DEFAULT_POLICY)
+
+
+def _float(x: Any) -> float:
+    try:
+        return float(x)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def _columns(records: List[Dict[str, Any]], rules: List[CompiledRule]) -> Columns:
+    numeric = {f for r in rules if r.numeric for f in r.fields}
+    cols: Columns = {}
+    for f in {f for r in rules for f in r.fields}:
+        if f in numeric:
+            cols[f] = np.fromiter((_float(rec.get(f)) for rec in records), dtype=np.float64, count=len(records))
+        else:
+            col = cols[f] = np.empty(len(records), dtype=object)
+            for i, rec in enumerate(records):
+                col[i] = rec.get(f)
+    return cols
+
+
+def evaluate(target: str, records: List[Dict[str, Any]], policy: Optional[Dict[str, List[CompiledRule]]] = None) -> List[Dict[str, Any]]:
+    """One QAReport dict per record (`target_id` taken from its `id`)."""
+    rules = (policy or _policy).get(target, [])
+    n = len(records)
+    issues: List[List[str]] = [[] for _ in range(n)]
+    if n and rules:
+        cols = _columns(records, rules)
+        for rule in rules:
+            for i in np.flatnonzero(~rule.passes(cols)):
+                issues[i].append(f"{rule.name}: {rule.message}")
+    return [
+        {
+            "id": str(uuid4()),
+            "target_id": str(rec.get("id")),
+            "target": target,
+            "checks_passed": not issues[i],
+            "issues": issues[i],
+            "approved": not issues[i],
+        }
+        for i, rec in enumerate(records)
+    ]
+
+
+async def review(target: str, records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Evaluate a batch, keep the reports and publish them to `qa_stream`."""
+    reports = evaluate(target, records)
+    qa_reports_store.extendleft(reports)  # newest first, like the other stores; bounded (QA_REPORTS_MAX)
+    await bus.publish_many(QA_STREAM, reports)
+    return reports
+
+
+# bus messages carry the id under the stream's own key
+async def review_idea_messages(msgs: List[Dict[str, Any]]) -> None:
+    """Review the stored ideas behind the messages; the message itself only for ideas not in the store."""
+    records = []
+    for m in msgs:
+        idea_id = m.get("idea_id", m.get("id"))
+        records.append(ideas_store.find("id", idea_id) or dict(m, id=idea_id))
+    await review("idea", records)
+
+
+async def review_strategy_messages(msgs: List[Dict[str, Any]]) -> None:
+    await review("strategy", [dict(m, id=m.get("strategy_id", m.get("id"))) for m in msgs])
+
+
+_policy = load_policy()
@@ -6,33 +6,43 @@ from typing import List, Dict, Any
 from uuid import uuid4
 from datetime import datetime, timezone
 
+from src.agents.dedup import idea_deduper
 from src.bus import bus
+from src.infra.http import http_client
+from src.store import ideas_store
+
+
+COINGECKO_MARKETS_URL = "https://api.coingecko.com/api/v3/coins/markets"
+RESEARCH_CACHE_TTL = float(os.getenv("RESEARCH_CACHE_TTL", "120"))
 
 
 async def fetch_coingecko_solana_tokens(limit: int = 10) -> List[Dict[str, Any]]:
     """Try to fetch Solana ecosystem tokens from CoinGecko if enabled.
 
     This is optional and only used when `ENABLE_INTERNET_RESEARCH` env var is truthy.
+    Goes through the shared async client, so repeated triggers within
+    `RESEARCH_CACHE_TTL` seconds are served from cache and never block the loop.
     """
     if not os.getenv("ENABLE_INTERNET_RESEARCH"):
         return []
     try:
-        import httpx
-
-        url = "https://api.coingecko.com/api/v3/coins/markets"
         params = {"vs_currency": "usd", "category": "solana-ecosystem", "order": "market_cap_desc", "per_page": limit, "page": 1}
-        r = httpx.get(url, params=params, timeout=10.0)
-        if r.status_code == 200:
-            return r.json()
+        data = await http_client.get_json(COINGECKO_MARKETS_URL, params=params, ttl=RESEARCH_CACHE_TTL)
+        if isinstance(data, list):
+            return data
     except Exception:
         return []
     return []
 
 
-async def generate_research_ideas(time_value: int = 30, time_unit: str = "minutes", risk_pref: int = 3, live: bool = False) -> List[Dict[str, Any]]:
+async def generate_research_ideas(time_value: int = 30, time_unit: str = "minutes", risk_pref: int = 3, live: bool = False, persist: bool = False) -> List[Dict[str, Any]]:
     """Generate ideas: Try live web research (CoinGecko) when allowed, otherwise fallback to heuristic list.
 
-    Each idea is published to `idea_stream` on the event bus and also returned.
+    Near-duplicates of ideas emitted recently or still open are dropped (see
+    `src.agents.dedup`); each remaining idea is published to `idea_stream` on
+    the event bus and also returned.
+    With `persist=True` the ideas are inserted into `ideas_store` before they are
+    published, so stream consumers can always look them up.
     """
     ideas: List[Dict[str, Any]] = []
     now = datetime.now(timezone.utc)
@@ -76,6 +86,12 @@ async def generate_research_ideas(time_value: int = 30, time_unit: str = "minute
             }
             ideas.append(idea)
 
+    ideas = idea_deduper.filter(ideas)
+
+    if persist:
+        for idea in ideas:
+            ideas_store.insert(0, idea)
+
     # publish ideas to bus
     for idea in ideas:
         # publish lightweight payload
@@ -86,6 +102,7 @@ async def generate_research_ideas(time_value: int = 30, time_unit: str = "minute
             "type": idea["type"],
             "risk": idea["risk"],
             "budget": idea["budget"],
+            "ttl": idea["ttl"],
             "created_at": idea["created_at"].isoformat(),
         })
 
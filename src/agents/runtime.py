@@ -0,0 +1,289 @@
+"""Supervised worker runtime for the agents.
+
+Every agent runs as a long-lived asyncio task that consumes its input stream
+from the event bus, so the HTTP API only has to enqueue work. The supervisor
+restarts crashed workers with exponential backoff and drains in-flight
+messages on shutdown.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+
+from src.bus import bus
+
+
+log = logging.getLogger(__name__)
+
+Handler = Callable[[Any], Awaitable[None]]  # one message dict, or a list of them for batched workers
+
+
+def workers_enabled() -> bool:
+    return os.getenv("AGENT_WORKERS", "1").lower() not in ("0", "false", "no")
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, default))
+    except ValueError:
+        return default
+
+
+@dataclass
+class WorkerSpec:
+    """Declares one agent worker.
+
+    - `stream`: input stream consumed from the bus (None for purely periodic workers).
+    - `concurrency`: max messages handled at the same time.
+    - `interval`: if set, the handler is also called with `{"trigger": "interval"}`
+      whenever no message arrived for that many seconds.
+    - `batched`: the handler gets the list of messages of each read (up to `batch`)
+      instead of one message at a time.
+    """
+
+    name: str
+    handler: Handler
+    stream: Optional[str] = None
+    concurrency: int = 1
+    interval: Optional[float] = None
+    batch: int = 50
+    batched: bool = False
+
+
+@dataclass
+class WorkerState:
+    status: str = "STOPPED"  # STOPPED | RUNNING | RESTARTING
+    restarts: int = 0
+    processed: int = 0
+    errors: int = 0
+    last_error: Optional[str] = None
+    cursor: Optional[str] = None  # last stream id handed to the handler; survives restarts
+    in_flight: Set[asyncio.Task] = field(default_factory=set)
+
+
+class Supervisor:
+    def __init__(self, specs: Optional[List[WorkerSpec]] = None, backoff: float = 0.5, max_backoff: float = 30.0, drain_timeout: float = 5.0) -> None:
+        self.specs: Dict[str, WorkerSpec] = {}
+        self.states: Dict[str, WorkerState] = {}
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.drain_timeout = drain_timeout
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._stop = asyncio.Event()
+        for spec in specs or []:
+            self.add(spec)
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks) and not self._stop.is_set()
+
+    def add(self, spec: WorkerSpec) -> None:
+        if spec.name in self.specs:
+            raise ValueError(f"Worker {spec.name} already registered")
+        self.specs[spec.name] = spec
+        self.states[spec.name] = WorkerState()
+
+    async def start(self) -> None:
+        self._stop = asyncio.Event()
+        for name, spec in self.specs.items():
+            if name not in self._tasks:
+                self._tasks[name] = asyncio.create_task(self._supervise(spec), name=f"agent-{name}")
+
+    async def stop(self) -> None:
+        """Stop reading new messages, wait for in-flight handlers, then cancel leftovers."""
+        self._stop.set()
+        tasks = list(self._tasks.values())
+        self._tasks.clear()
+        if not tasks:
+            return
+        _done, pending = await asyncio.wait(tasks, timeout=self.drain_timeout + 1.0)
+        for t in pending:
+            t.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+
+    def status(self) -> List[Dict[str, Any]]:
+        out = []
+        for name, spec in self.specs.items():
+            st = self.states[name]
+            out.append({
+                "name": name,
+                "stream": spec.stream,
+                "concurrency": spec.concurrency,
+                "status": st.status,
+                "restarts": st.restarts,
+                "processed": st.processed,
+                "errors": st.errors,
+                "in_flight": len(st.in_flight),
+                "last_error": st.last_error,
+            })
+        return out
+
+    async def _supervise(self, spec: WorkerSpec) -> None:
+        state = self.states[spec.name]
+        delay = self.backoff
+        while not self._stop.is_set():
+            state.status = "RUNNING"
+            started = time.monotonic()
+            try:
+                await self._run(spec, state)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:  # crash -> restart with backoff
+                state.restarts += 1
+                state.last_error = repr(e)
+                state.status = "RESTARTING"
+                log.exception("agent worker %s crashed, restarting in %.1fs", spec.name, delay)
+                if time.monotonic() - started > self.max_backoff:
+                    delay = self.backoff  # healthy for a while: reset backoff
+                try:
+                    await asyncio.wait_for(self._stop.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+                delay = min(delay * 2, self.max_backoff)
+        state.status = "STOPPED"
+
+    async def _run(self, spec: WorkerSpec, state: WorkerState) -> None:
+        sem = asyncio.Semaphore(max(1, spec.concurrency))
+        if spec.stream and state.cursor is None:
+            state.cursor = await bus.last_id(spec.stream)  # first start skips the backlog, restarts resume
+        last_activity = time.monotonic()
+        try:
+            while not self._stop.is_set():
+                wait = 1.0
+                if spec.interval:
+                    wait = max(0.0, min(wait, spec.interval - (time.monotonic() - last_activity)))
+                if spec.stream:  # block=0 would wait forever on Redis
+                    entries = await bus.read(spec.stream, state.cursor, count=spec.batch, block_ms=max(1, int(wait * 1000)))
+                else:
+                    entries = []
+                    try:
+                        await asyncio.wait_for(self._stop.wait(), timeout=wait)
+                    except asyncio.TimeoutError:
+                        pass
+                if spec.batched and entries:
+                    state.cursor = entries[-1][0]
+                    await self._dispatch(spec, state, sem, [msg for _sid, msg in entries])
+                else:
+                    for sid, msg in entries:
+                        state.cursor = sid
+                        await self._dispatch(spec, state, sem, msg)
+                if entries:
+                    last_activity = time.monotonic()
+                elif spec.interval and time.monotonic() - last_activity >= spec.interval and not self._stop.is_set():
+                    last_activity = time.monotonic()
+                    await self._dispatch(spec, state, sem, {"trigger": "interval"})
+        finally:
+            await self._drain(state)
+
+    async def _dispatch(self, spec: WorkerSpec, state: WorkerState, sem: asyncio.Semaphore, msg: Any) -> None:
+        await sem.acquire()
+
+        async def _handle() -> None:
+            try:
+                await spec.handler(msg)
+                state.processed += 1
+            except Exception as e:  # a bad message must not take the worker down
+                state.errors += 1
+                state.last_error = repr(e)
+                log.exception("agent worker %s failed to handle message", spec.name)
+            finally:
+                sem.release()
+
+        task = asyncio.create_task(_handle())
+        state.in_flight.add(task)
+        task.add_done_callback(state.in_flight.discard)
+
+    async def _drain(self, state: WorkerState) -> None:
+        if not state.in_flight:
+            return
+        _done, pending = await asyncio.wait(list(state.in_flight), timeout=self.drain_timeout)
+        for t in pending:
+            t.cancel()
+
+
+# ---- default agent workers ----
+
+RESEARCH_REQUESTS = "research_requests"
+ANALYSIS_REQUESTS = "analysis_requests"
+
+
+async def _research_handler(msg: Dict[str, Any]) -> None:
+    from src.agents.research import generate_research_ideas
+
+    await generate_research_ideas(
+        time_value=int(msg.get("time_value", 30)),
+        time_unit=msg.get("time_unit") or "minutes",
+        risk_pref=int(msg.get("risk_pref", 3)),
+        live=bool(msg.get("live", False)),
+        persist=True,
+    )
+
+
+async def _analysis_handler(msgs: List[Dict[str, Any]]) -> None:
+    from src.agents.analysis import generate_strategies_for
+    from src.store import ideas_store
+
+    ideas: Dict[Any, Dict[str, Any]] = {}
+    for msg in msgs:
+        idea_id = msg.get("idea_id")
+        idea = ideas_store.find("id", idea_id)
+        if idea is None:
+            log.warning("analysis: idea %s not in the store, message dropped", idea_id)
+            continue
+        ideas[idea_id] = idea
+    if ideas:
+        await generate_strategies_for(list(ideas.values()))
+
+
+async def _quality_ideas_handler(msgs: List[Dict[str, Any]]) -> None:
+    from src.agents.quality import review_idea_messages
+
+    await review_idea_messages(msgs)
+
+
+async def _quality_strategies_handler(msgs: List[Dict[str, Any]]) -> None:
+    from src.agents.quality import review_strategy_messages
+
+    await review_strategy_messages(msgs)
+
+
+async def _analysis_request_handler(msg: Dict[str, Any]) -> None:
+    from src.agents.analysis import generate_strategies_from_ideas
+
+    await generate_strategies_from_ideas(limit=int(msg.get("limit", 10)), only_status=msg.get("only_status"))
+
+
+def default_specs() -> List[WorkerSpec]:
+    """Scheduler, dashboard, research, analysis and quality workers (plus the dev price feed); execution agents register via `supervisor.add`."""
+    interval = float(os.getenv("RESEARCH_INTERVAL_SECONDS", "300")) or None
+    from src.dashboard import dashboard_snapshot
+    from src.execution.scheduler import scheduler
+
+    specs = [
+        WorkerSpec("scheduler", scheduler.tick, interval=scheduler.interval),
+        WorkerSpec("dashboard", dashboard_snapshot.tick, interval=dashboard_snapshot.interval),
+    ]
+    if os.getenv("PRICE_FEED", "sim").lower() == "sim":
+        from src.market.prices import SimulatedFeed, price_cache
+
+        feed = SimulatedFeed(price_cache, interval=float(os.getenv("PRICE_FEED_INTERVAL_SECONDS", "1")))
+        specs.append(WorkerSpec("price-feed", feed.tick, interval=feed.interval))
+    return specs + [
+        WorkerSpec("research", _research_handler, stream=RESEARCH_REQUESTS,
+                   concurrency=_env_int("RESEARCH_CONCURRENCY", 1), interval=interval),
+        WorkerSpec("analysis", _analysis_handler, stream="idea_stream",
+                   concurrency=_env_int("ANALYSIS_CONCURRENCY", 4), batch=_env_int("ANALYSIS_BATCH", 50), batched=True),
+        WorkerSpec("analysis-requests", _analysis_request_handler, stream=ANALYSIS_REQUESTS,
+                   concurrency=1),
+        WorkerSpec("quality-ideas", _quality_ideas_handler, stream="idea_stream",
+                   batch=_env_int("QA_BATCH", 500), batched=True),
+        WorkerSpec("quality-strategies", _quality_strategies_handler, stream="strategy_stream",
+                   batch=_env_int("QA_BATCH", 500), batched=True),
+    ]
+
+
+supervisor = Supervisor(default_specs())
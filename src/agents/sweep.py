@@ -0,0 +1,173 @@
+"""Parameter sweep for the analysis agent's risk -> exit-parameter table.
+
+For every asset and risk level a grid (or random sample) of
+stop_loss / take_profit / max_dd candidates is backtested on the process pool
+and the best candidate per risk level is written to a versioned JSON
+artifact, which `src.agents.analysis` loads at startup.
+
+Sweeps use successive halving to prune clearly bad regions early: all
+candidates are first scored on a short prefix of the history, only the best
+`keep` share survives into the next, longer round, and just the finalists see
+the full history.
+
+Scoring: mean return per traded window minus a drawdown penalty that is
+steeper for low risk levels; candidates whose drawdown exceeds the risk
+level's cap are heavily penalised.
+"""
+from __future__ import annotations
+
+import json
+import os
+import re
+from datetime import datetime, timezone
+from functools import partial
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Tuple
+
+import numpy as np
+
+from src.agents.backtest import backtest
+from src.agents.pool import AgentPool, agent_pool
+
+
+RISK_PARAMS_DIR = os.getenv("RISK_PARAMS_DIR", "artifacts/risk_params")
+ARTIFACT_RE = re.compile(r"^risk_params_v(\d+)\.json$")
+
+# max tolerated strategy drawdown per risk level (matches the built-in table's max_dd)
+RISK_DD_CAP = {1: 0.04, 2: 0.06, 3: 0.08, 4: 0.10, 5: 0.12}
+
+Progress = Callable[[Dict[str, Any]], None]
+
+
+def candidate_grid(risk: int, steps: int = 6) -> np.ndarray:
+    """(N, 3) grid of stop_loss/take_profit/max_dd candidates scaled to `risk`."""
+    r = max(1, min(5, int(risk)))
+    sl = np.linspace(0.005, 0.015 * r, steps)
+    tp = np.linspace(0.01, 0.03 * r, steps)
+    dd = np.linspace(0.01, RISK_DD_CAP[r], steps)
+    return np.stack(np.meshgrid(sl, tp, dd, indexing="ij"), axis=-1).reshape(-1, 3)
+
+
+def candidate_random(risk: int, samples: int = 200, seed: Optional[int] = None) -> np.ndarray:
+    """(samples, 3) uniform random candidates over the same box as `candidate_grid`."""
+    r = max(1, min(5, int(risk)))
+    rng = np.random.default_rng(seed)
+    lo = np.array([0.005, 0.01, 0.01])
+    hi = np.array([0.015 * r, 0.03 * r, RISK_DD_CAP[r]])
+    return lo + rng.random((samples, 3)) * (hi - lo)
+
+
+def _score_chunk(ids: List[str], arrays: Dict[str, np.ndarray], n_bars: int, window: int) -> np.ndarray:
+    """Pool task: backtest a chunk of candidates on the first `n_bars` bars and score them."""
+    bars = {k: arrays[k][:n_bars] for k in ("open", "high", "low", "close")}
+    res = backtest(bars, arrays["stop_loss"], arrays["take_profit"], arrays["max_dd"], window=window)
+    return score(res.pnl / res.trades, res.max_drawdown, arrays["risk"])
+
+
+def score(mean_return: np.ndarray, max_drawdown: np.ndarray, risk: np.ndarray) -> np.ndarray:
+    risk = np.clip(risk, 1, 5)
+    cap = np.array([RISK_DD_CAP[r] for r in range(1, 6)])[risk - 1]
+    penalty = max_drawdown / risk + 10.0 * np.maximum(0.0, max_drawdown - cap)
+    return mean_return - penalty
+
+
+async def sweep_asset(bars: Mapping[str, np.ndarray], risks: Iterable[int] = (1, 2, 3, 4, 5), mode: str = "grid",
+                      samples: int = 200, window: int = 1440, rounds: Tuple[float, ...] = (0.25, 0.5, 1.0),
+                      keep: float = 0.5, pool: Optional[AgentPool] = None, progress: Optional[Progress] = None,
+                      asset: str = "*", seed: Optional[int] = None) -> Dict[str, Dict[str, float]]:
+    """Sweep one asset; returns `{risk: {"stop_loss", "take_profit", "max_dd", "score"}}` (risk as str)."""
+    pool = pool or agent_pool
+    risks = list(risks)
+    cands = [candidate_grid(r) if mode == "grid" else candidate_random(r, samples, seed=None if seed is None else seed + r) for r in risks]
+    params = np.concatenate(cands)
+    risk_col = np.concatenate([np.full(len(c), r, dtype=np.int64) for r, c in zip(risks, cands)])
+    alive = np.arange(len(params))
+    shared = {k: np.asarray(bars[k], dtype=np.float64) for k in ("open", "high", "low", "close")}
+    n = len(shared["close"])
+    scores = np.full(len(params), -np.inf)
+
+    for i, frac in enumerate(rounds):
+        n_bars = max(window, int(n * frac))
+        fn = partial(_score_chunk, n_bars=n_bars, window=window)
+        arrays = {
+            "stop_loss": params[alive, 0], "take_profit": params[alive, 1], "max_dd": params[alive, 2],
+            "risk": risk_col[alive],
+        }
+        ids = [str(j) for j in alive]
+        round_scores: Dict[int, float] = {}
+        done = 0
+        async for chunk_ids, chunk_scores in pool.map_chunks(fn, ids, arrays, shared=shared):
+            round_scores.update(zip(map(int, chunk_ids), chunk_scores.tolist()))
+            done += len(chunk_ids)
+            if progress:
+                progress({"asset": asset, "round": i + 1, "rounds": len(rounds), "done": done, "total": len(ids)})
+        scores[:] = -np.inf
+        scores[alive] = [round_scores[j] for j in alive]
+        if i < len(rounds) - 1:
+            # keep the top share per risk level so no level is pruned away entirely
+            survivors = []
+            for r in risks:
+                idx = alive[risk_col[alive] == r]
+                k = max(1, int(np.ceil(len(idx) * keep)))
+                survivors.append(idx[np.argsort(-scores[idx])[:k]])
+            alive = np.sort(np.concatenate(survivors))
+
+    table: Dict[str, Dict[str, float]] = {}
+    for r in risks:
+        idx = alive[risk_col[alive] == r]
+        best = idx[np.argmax(scores[idx])]
+        sl, tp, dd = params[best].tolist()
+        table[str(r)] = {"stop_loss": round(sl, 5), "take_profit": round(tp, 5), "max_dd": round(dd, 5), "score": float(scores[best])}
+    return table
+
+
+async def run_sweep(bars_by_asset: Mapping[str, Mapping[str, np.ndarray]], directory: Optional[str] = None,
+                    **kwargs: Any) -> Path:
+    """Sweep every asset and write the resulting table as the next artifact version."""
+    table = {}
+    for asset, bars in bars_by_asset.items():
+        table[asset] = await sweep_asset(bars, asset=asset, **kwargs)
+    meta = {k: v for k, v in kwargs.items() if k in ("mode", "samples", "window", "rounds", "keep")}
+    return write_artifact(table, directory=directory, meta=meta)
+
+
+def _versions(directory: Path) -> List[Tuple[int, Path]]:
+    if not directory.is_dir():
+        return []
+    out = []
+    for p in directory.iterdir():
+        m = ARTIFACT_RE.match(p.name)
+        if m:
+            out.append((int(m.group(1)), p))
+    return sorted(out)
+
+
+def write_artifact(table: Dict[str, Dict[str, Dict[str, float]]], directory: Optional[str] = None,
+                   meta: Optional[Dict[str, Any]] = None) -> Path:
+    """Write `table` ({asset: {risk: params}}) as `risk_params_v<N>.json`, N = latest + 1."""
+    d = Path(directory or RISK_PARAMS_DIR)
+    d.mkdir(parents=True, exist_ok=True)
+    versions = _versions(d)
+    version = versions[-1][0] + 1 if versions else 1
+    path = d / f"risk_params_v{version}.json"
+    doc = {
+        "version": version,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "meta": meta or {},
+        "table": table,
+    }
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(doc, indent=2), encoding="utf-8")
+    tmp.replace(path)
+    return path
+
+
+def load_latest_artifact(directory: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """Return the newest artifact document, or None if there is none (or it is unreadable)."""
+    versions = _versions(Path(directory or RISK_PARAMS_DIR))
+    if not versions:
+        return None
+    try:
+        return json.loads(versions[-1][1].read_text(encoding="utf-8"))
+    except Exception:
+        return None
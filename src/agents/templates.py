@@ -0,0 +1,71 @@
+"""Content-addressed cache of strategy templates.
+
+A template is the expensive part of analysing an idea — its swept risk
+parameters and Monte Carlo tail-risk metrics — and depends only on the idea's
+content (asset, type, risk, ttl) and the risk table in use, so ideas with the
+same content share one. Entries are evicted LRU-first, expire after `ttl`
+seconds, and are dropped as soon as newer market data for the asset arrives
+(the stamp stored with the entry no longer matches).
+
+Tuning (env): STRATEGY_CACHE_SIZE (default 1024), STRATEGY_CACHE_TTL (seconds,
+default 300).
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+
+def template_key(idea: Dict[str, Any], table_version: Optional[int] = None) -> str:
+    content = [
+        str(idea.get("asset") or "").upper(),
+        idea.get("type"),
+        int(idea.get("risk", 3)),
+        int(idea.get("ttl") or 5400),
+        table_version,
+    ]
+    return hashlib.sha1(json.dumps(content, separators=(",", ":")).encode()).hexdigest()[:20]
+
+
+class TemplateCache:
+    def __init__(self, max_entries: int = int(os.getenv("STRATEGY_CACHE_SIZE", "1024")),
+                 ttl: float = float(os.getenv("STRATEGY_CACHE_TTL", "300"))) -> None:
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[float, Hashable, Dict[str, Any]]]" = OrderedDict()
+        self.stats = {"hits": 0, "misses": 0, "stale": 0}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str, stamp: Hashable = None) -> Optional[Dict[str, Any]]:
+        """The template for `key` if it is younger than `ttl` and was built on market data `stamp`."""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.stats["misses"] += 1
+            return None
+        expires, entry_stamp, template = entry
+        if expires <= time.monotonic() or entry_stamp != stamp:
+            del self._entries[key]
+            self.stats["stale"] += 1
+            self.stats["misses"] += 1
+            return None
+        self._entries.move_to_end(key)
+        self.stats["hits"] += 1
+        return template
+
+    def put(self, key: str, template: Dict[str, Any], stamp: Hashable = None) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl, stamp, template)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+template_cache = TemplateCache()
@@ -1,15 +1,150 @@
+"""API-key authentication with per-key token-bucket quotas.
+
+Keys are loaded once into a table of SHA-256 digests (plain keys are never
+kept) from
+
+- API_KEY: a single key, named "default" (the original setting),
+- API_KEYS: `name:key` pairs separated by commas,
+- API_KEYS_FILE: a JSON list of `{"name", "sha256" (or "key"), "rate", "burst"}`.
+
+With no keys configured auth is disabled (convenience for local dev/tests).
+A presented key is hashed and its SHA-256 digest looked up in the table, so
+no secret is ever compared byte by byte. Each key has one
+token bucket per route group ("trades", "agents"), refilled at `rate`
+requests/second up to `burst` (defaults API_KEY_RATE_PER_SEC=5,
+API_KEY_BURST=20; rate `0` means unlimited); an empty bucket answers 429 with
+Retry-After. Call `load_keys()` after changing the settings at runtime.
+"""
+import hashlib
+import json
+import math
 import os
-from fastapi import Header, HTTPException
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from fastapi import Depends, Header, HTTPException
+
+
+def hash_key(key: str) -> str:
+    return hashlib.sha256(key.encode()).hexdigest()
+
+
+@dataclass
+class TokenBucket:
+    rate: float
+    burst: float
+    tokens: float = 0.0
+    updated: float = 0.0
+    allowed: int = 0
+    rejected: int = 0
+
+    def take(self, now: Optional[float] = None) -> float:
+        """Spend one token; returns 0 when allowed, else the seconds until one is available."""
+        if self.rate <= 0:
+            self.allowed += 1
+            return 0.0
+        now = time.monotonic() if now is None else now
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1.0:
+            self.tokens -= 1.0
+            self.allowed += 1
+            return 0.0
+        self.rejected += 1
+        return (1.0 - self.tokens) / self.rate
+
+
+@dataclass
+class ApiKey:
+    name: str
+    digest: str
+    rate: float
+    burst: float
+    buckets: Dict[str, TokenBucket] = field(default_factory=dict)
+
+    def bucket(self, group: str) -> TokenBucket:
+        b = self.buckets.get(group)
+        if b is None:
+            b = self.buckets[group] = TokenBucket(self.rate, self.burst, tokens=self.burst, updated=time.monotonic())
+        return b
+
+    def usage(self) -> Dict[str, object]:
+        return {
+            "name": self.name, "rate": self.rate, "burst": self.burst,
+            "groups": {g: {"allowed": b.allowed, "rejected": b.rejected, "tokens": round(min(b.burst, b.tokens), 3)}
+                       for g, b in self.buckets.items()},
+        }
+
+
+# digest -> key; filled by load_keys()
+_keys: Dict[str, ApiKey] = {}
 
 
-def require_api_key(x_api_key: str | None = Header(default=None)) -> bool:
-    """Require API key only if `API_KEY` env var is set.
+def load_keys() -> int:
+    """(Re)load the key table from the environment; returns the number of keys."""
+    rate = float(os.getenv("API_KEY_RATE_PER_SEC", "5"))
+    burst = float(os.getenv("API_KEY_BURST", "20"))
+    table: Dict[str, ApiKey] = {}
 
-    If `API_KEY` is unset or empty, no check is enforced (convenience for local dev/tests).
-    """
-    expected = os.getenv("API_KEY", "")
-    if not expected:
-        return True
-    if x_api_key is None or x_api_key != expected:
+    def add(name: str, digest: str, r: float = rate, b: float = burst) -> None:
+        table[digest] = ApiKey(name, digest, float(r), max(1.0, float(b)))
+
+    if os.getenv("API_KEY"):
+        add("default", hash_key(os.environ["API_KEY"]))
+    for item in os.getenv("API_KEYS", "").split(","):
+        name, sep, key = item.strip().partition(":")
+        if sep and key:
+            add(name, hash_key(key))
+    path = os.getenv("API_KEYS_FILE")
+    if path:
+        with open(path) as f:
+            for row in json.load(f):
+                digest = row.get("sha256") or hash_key(row["key"])
+                add(row["name"], digest.lower(), row.get("rate", rate), row.get("burst", burst))
+    _keys.clear()
+    _keys.update(table)
+    return len(_keys)
+
+
+def lookup(presented: Optional[str]) -> Optional[ApiKey]:
+    """The key whose digest is the presented key's SHA-256, if any."""
+    if not presented:
+        return None
+    return _keys.get(hash_key(presented))
+
+
+async def require_api_key(x_api_key: Optional[str] = Header(default=None)) -> Optional[ApiKey]:
+    """The caller's key; 401 for a missing or unknown key. None when auth is disabled."""
+    if not _keys:
+        return None
+    key = lookup(x_api_key)
+    if key is None:
         raise HTTPException(status_code=401, detail="Invalid or missing API Key")
-    return True
+    return key
+
+
+def spend(key: Optional[ApiKey], group: str) -> None:
+    """Take one token of the key's `group` bucket; 429 with Retry-After when it is empty."""
+    if key is None:
+        return
+    wait = key.bucket(group).take()
+    if wait:
+        raise HTTPException(status_code=429, detail=f"Rate limit exceeded for {group}",
+                            headers={"Retry-After": str(max(1, math.ceil(wait)))})
+
+
+def rate_limited(group: str):
+    """Dependency: authenticate, then spend one token of the key's `group` bucket (429 when empty)."""
+    async def _check(key: Optional[ApiKey] = Depends(require_api_key)) -> Optional[ApiKey]:
+        spend(key, group)
+        return key
+
+    return _check
+
+
+def usage() -> List[Dict[str, object]]:
+    return [k.usage() for k in _keys.values()]
+
+
+load_keys()
@@ -0,0 +1,116 @@
+"""Precomputed dashboard snapshot: every panel of the frontend in one response.
+
+Each panel (wallets, ideas, trades, agents, strategies, releases) is rendered
+from its store into JSON bytes once, and re-rendered only when the store's
+version (`src.infra.versioned`) moves; the wallet dict has no counter, so its
+panel is keyed by a fingerprint of the balances. `refresh()` runs as a
+periodic worker, so requests only concatenate pre-rendered bytes.
+
+Panel versions come from one sequence: a panel's version is the snapshot
+version at which it last changed. A client that passes the snapshot version
+it already holds (`since`) receives only the panels that changed after it.
+Versions restart with the process, so every snapshot carries the process'
+`boot` id; a `since` from another boot (or ahead of the current version) gets
+the full snapshot.
+
+Tuning (env): DASHBOARD_REFRESH_MS (default 500), DASHBOARD_IDEAS_LIMIT
+(default 50), DASHBOARD_TRADES_LIMIT (default 20).
+"""
+from __future__ import annotations
+
+import os
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Tuple
+from uuid import uuid4
+
+from src.serialization import IDEAS, STRATEGIES, TRADES, dumps
+from src.store import agents_store, ideas_store, releases_store, strategies_store, trades_store, wallet_store
+
+
+DASHBOARD_REFRESH = float(os.getenv("DASHBOARD_REFRESH_MS", "500")) / 1000
+IDEAS_LIMIT = int(os.getenv("DASHBOARD_IDEAS_LIMIT", "50"))
+TRADES_LIMIT = int(os.getenv("DASHBOARD_TRADES_LIMIT", "20"))
+
+
+def _recent_trades() -> List[Dict[str, Any]]:
+    try:
+        return sorted(trades_store, key=lambda t: t.get("executed_at"), reverse=True)[:TRADES_LIMIT]
+    except TypeError:  # mixed / missing timestamps: keep store order
+        return trades_store[:TRADES_LIMIT]
+
+
+def _wallets() -> List[Dict[str, Any]]:
+    return [{"address": w.get("address", a), "balance_sol": w.get("balance_sol", 0.0), "timestamp": w.get("timestamp")}
+            for a, w in wallet_store.items()]
+
+
+# name -> (change key, render)
+PANELS: Dict[str, Tuple[Callable[[], Hashable], Callable[[], bytes]]] = {
+    "wallets": (lambda: tuple((a, w.get("balance_sol"), w.get("timestamp")) for a, w in wallet_store.items()),
+                lambda: dumps(_wallets())),
+    "ideas": (lambda: ideas_store.version, lambda: IDEAS.dump(ideas_store[:IDEAS_LIMIT])),
+    "trades": (lambda: trades_store.version, lambda: TRADES.dump(_recent_trades())),
+    "agents": (lambda: agents_store.version, lambda: dumps(agents_store)),
+    "strategies": (lambda: strategies_store.version, lambda: STRATEGIES.dump(strategies_store)),
+    "releases": (lambda: releases_store.version, lambda: dumps(releases_store)),
+}
+
+
+class DashboardSnapshot:
+    def __init__(self, panels: Optional[Dict[str, Tuple[Callable[[], Hashable], Callable[[], bytes]]]] = None,
+                 interval: float = DASHBOARD_REFRESH) -> None:
+        self.panels = dict(PANELS if panels is None else panels)
+        self.interval = interval
+        self.version = 0
+        self.boot = uuid4().hex[:8]
+        self.generated_at: Optional[datetime] = None
+        self._keys: Dict[str, Hashable] = {}
+        self._bodies: Dict[str, bytes] = {}
+        self._versions: Dict[str, int] = {}
+        self.stats = {"refreshes": 0, "rendered": 0}
+
+    def refresh(self) -> List[str]:
+        """Re-render the panels whose store changed; returns their names."""
+        changed = []
+        for name, (key_fn, render) in self.panels.items():
+            key = key_fn()
+            if name in self._bodies and self._keys.get(name) == key:
+                continue
+            self._bodies[name] = render()
+            self._keys[name] = key
+            changed.append(name)
+        if changed:
+            self.version += 1
+            for name in changed:
+                self._versions[name] = self.version
+            self.generated_at = datetime.now(timezone.utc)
+            self.stats["rendered"] += len(changed)
+        self.stats["refreshes"] += 1
+        return changed
+
+    async def tick(self, msg: Optional[Dict[str, Any]] = None) -> int:
+        """Periodic worker handler."""
+        return len(self.refresh())
+
+    def render(self, since: Optional[int] = None, only: Optional[Iterable[str]] = None, boot: Optional[str] = None) -> bytes:
+        """The snapshot as JSON; with `since`, panels unchanged after that version are listed in `unchanged` instead.
+
+        `since` is ignored (full snapshot) when it comes from another `boot` or is ahead of `version`.
+        """
+        if self.generated_at is None:
+            self.refresh()
+        if since is not None and (since > self.version or (boot is not None and boot != self.boot)):
+            since = None
+        wanted = [n for n in self.panels if only is None or n in set(only)]
+        parts, unchanged = [], []
+        for name in wanted:
+            v = self._versions[name]
+            if since is not None and v <= since:
+                unchanged.append(name)
+                continue
+            parts.append(b'"%s":{"version":%d,"data":%s}' % (name.encode(), v, self._bodies[name]))
+        head = dumps({"version": self.version, "boot": self.boot, "generated_at": self.generated_at, "unchanged": unchanged})
+        return head[:-1] + b',"panels":{' + b",".join(parts) + b"}}"
+
+
+dashboard_snapshot = DashboardSnapshot()
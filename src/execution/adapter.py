@@ -5,17 +5,31 @@ from uuid import uuid4
 from src.store import trades_store, wallet_store
 from src.models import TradeAction, Trade, TradeStatus
 from src.execution.solana_client import SolanaClient
+from src.market.prices import price_cache
+from src.execution.matching import MatchingEngine, matching_engine, BUY, SELL
+from src.execution.positions import position_book
+from src.execution.risk import risk_engine
+import asyncio
 import os
 
 
+# "dev" fills at the given/mark price, "sim" matches against the simulated order book
+EXECUTION_MODE = os.getenv("EXECUTION_MODE", "dev")
+
+
 class ExecutionAdapter:
     """Simple Execution Adapter that can simulate actions.
 
     For dev: supports AIRDROP (credit wallet) and simple BUY/SELL simulation.
+    BUY/SELL without a price fill at the cached mark price (see `src.market.prices`).
+    In "sim" mode they are matched against `src.execution.matching` instead, where
+    a given price acts as the limit.
     """
 
-    def __init__(self, mode: str = "dev"):
+    def __init__(self, mode: str = "dev", engine: Optional[MatchingEngine] = None):
         self.mode = mode
+        # "sim" routes BUY/SELL through the simulated order book (slippage, partial fills)
+        self.engine = engine or (matching_engine if mode == "sim" else None)
         self.rpc_url = os.getenv("SOLANA_RPC_URL", "")
         self.allow_mainnet = os.getenv("ALLOW_MAINNET_TRANSACTIONS", "").lower() in ("1", "true", "yes")
         self._sol = None
@@ -53,25 +67,86 @@ class ExecutionAdapter:
         trades_store.insert(0, trade)
         return trade
 
-    async def execute_buy(self, address: str, asset: str, quantity: float, price: float) -> dict:
+    def _fill_price(self, asset: str, price: Optional[float]) -> tuple:
+        if price is not None:
+            return price, "client"
+        return price_cache.mark(asset), "mark"
+
+    def _mark(self, asset: str) -> Optional[float]:
+        tick = price_cache.get(asset)
+        return tick["price"] if tick else None
+
+    async def _match(self, side: str, address: str, asset: str, quantity: float, limit: Optional[float],
+                     strategy_id: Optional[str] = None) -> dict:
+        w = wallet_store.get(address)
+        if not w:
+            raise ValueError("Wallet not found")
+        mid = price_cache.mark(asset) if limit is None else (price_cache.get(asset) or {}).get("price", limit)
+        if self.engine.config.latency_ms > 0:
+            await asyncio.sleep(self.engine.config.latency_ms / 1000)
+        self.engine.ensure_liquidity(asset, mid)
+        book = self.engine.book(asset)
+        fillable, cost = book.quote(side, quantity, limit)
+        if fillable > 0:
+            risk_engine.check(address, asset, side, fillable, cost / fillable, mid)
+        if side == BUY and w.get("balance_sol", 0.0) < cost:
+            raise ValueError("Insufficient funds")
+        report = book.submit(side, quantity, limit=limit)
+        if report.filled <= 0:
+            raise ValueError(f"No liquidity for {asset} within limit")
+        notional = report.filled * report.avg_price
+        w["balance_sol"] = w.get("balance_sol", 0.0) + (-notional if side == BUY else notional)
+        w["timestamp"] = datetime.now(timezone.utc)
+        pnl = position_book.apply(address, asset, side, report.filled, report.avg_price)
+        risk_engine.record(address, asset, side, report.filled, report.avg_price, pnl)
+
+        trade = {
+            "id": str(uuid4()),
+            "strategy_id": strategy_id or side.lower(),
+            "action": TradeAction(side),
+            "asset": asset,
+            "quantity": report.filled,
+            "requested_quantity": quantity,
+            "price": report.avg_price,
+            "price_source": "book",
+            "slippage": report.slippage,
+            "fills": len(report.fills),
+            "fill_status": report.status,
+            "pnl": pnl,
+            "status": TradeStatus.CLOSED,
+            "executed_at": datetime.now(timezone.utc),
+            "duration": "00:00:02",
+        }
+        trades_store.insert(0, trade)
+        return trade
+
+    async def execute_buy(self, address: str, asset: str, quantity: float, price: Optional[float] = None,
+                          strategy_id: Optional[str] = None) -> dict:
+        if self.engine is not None:
+            return await self._match(BUY, address, asset, quantity, price, strategy_id)
         # simple simulation: deduct cost from wallet (price * quantity)
         w = wallet_store.get(address)
         if not w:
             raise ValueError("Wallet not found")
+        price, price_source = self._fill_price(asset, price)
+        risk_engine.check(address, asset, BUY, quantity, price, self._mark(asset))
         cost = price * quantity
         if w.get("balance_sol", 0.0) < cost:
             raise ValueError("Insufficient funds")
         w["balance_sol"] = w.get("balance_sol", 0.0) - cost
         w["timestamp"] = datetime.now(timezone.utc)
+        pnl = position_book.apply(address, asset, BUY, quantity, price)
+        risk_engine.record(address, asset, BUY, quantity, price, pnl)
 
         trade = {
             "id": str(uuid4()),
-            "strategy_id": "buy",
+            "strategy_id": strategy_id or "buy",
             "action": TradeAction.BUY,
             "asset": asset,
             "quantity": quantity,
             "price": price,
-            "pnl": 0.0,
+            "price_source": price_source,
+            "pnl": pnl,
             "status": TradeStatus.CLOSED,
             "executed_at": datetime.now(timezone.utc),
             "duration": "00:00:02",
@@ -79,23 +154,31 @@ class ExecutionAdapter:
         trades_store.insert(0, trade)
         return trade
 
-    async def execute_sell(self, address: str, asset: str, quantity: float, price: float) -> dict:
+    async def execute_sell(self, address: str, asset: str, quantity: float, price: Optional[float] = None,
+                           strategy_id: Optional[str] = None) -> dict:
+        if self.engine is not None:
+            return await self._match(SELL, address, asset, quantity, price, strategy_id)
         # simple simulation: credit proceeds to wallet
         w = wallet_store.get(address)
         if not w:
             raise ValueError("Wallet not found")
+        price, price_source = self._fill_price(asset, price)
+        risk_engine.check(address, asset, SELL, quantity, price, self._mark(asset))
         proceeds = price * quantity
         w["balance_sol"] = w.get("balance_sol", 0.0) + proceeds
         w["timestamp"] = datetime.now(timezone.utc)
+        pnl = position_book.apply(address, asset, SELL, quantity, price)
+        risk_engine.record(address, asset, SELL, quantity, price, pnl)
 
         trade = {
             "id": str(uuid4()),
-            "strategy_id": "sell",
+            "strategy_id": strategy_id or "sell",
             "action": TradeAction.SELL,
             "asset": asset,
             "quantity": quantity,
             "price": price,
-            "pnl": 0.0,
+            "price_source": price_source,
+            "pnl": pnl,
             "status": TradeStatus.CLOSED,
             "executed_at": datetime.now(timezone.utc),
             "duration": "00:00:02",
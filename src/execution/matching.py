@@ -0,0 +1,208 @@
+"""Simulated in-memory matching engine for dev-mode execution.
+
+One limit order book per asset with price-time priority: price levels are
+FIFO queues, best prices are kept in heaps (stale levels are dropped lazily),
+so a taker order costs O(levels touched + log levels). A synthetic market
+maker lays a ladder of resting orders around the mark price, which gives
+incoming orders realistic spread, depth, slippage and partial fills.
+
+Tuning (env): SIM_DEPTH_LEVELS (ladder levels per side, default 20),
+SIM_LEVEL_SPACING (relative distance between levels, default 0.001),
+SIM_LEVEL_NOTIONAL (SOL resting per level, default 50), SIM_LATENCY_MS
+(simulated venue latency applied by the adapter, default 0).
+"""
+from __future__ import annotations
+
+import heapq
+import itertools
+import os
+from collections import deque
+from dataclasses import dataclass
+from typing import Deque, Dict, List, Optional, Tuple
+
+
+BUY, SELL = "BUY", "SELL"
+MM_PREFIX = "mm-"
+
+
+@dataclass
+class LiquidityConfig:
+    levels: int = int(os.getenv("SIM_DEPTH_LEVELS", "20"))
+    spacing: float = float(os.getenv("SIM_LEVEL_SPACING", "0.001"))
+    level_notional: float = float(os.getenv("SIM_LEVEL_NOTIONAL", "50"))
+    latency_ms: float = float(os.getenv("SIM_LATENCY_MS", "0"))
+
+
+@dataclass
+class FillReport:
+    side: str
+    requested: float
+    filled: float
+    avg_price: Optional[float]
+    reference_price: Optional[float]  # best opposite price before the order
+    fills: List[Tuple[str, float, float]]  # (maker order id, price, quantity)
+
+    @property
+    def remaining(self) -> float:
+        return self.requested - self.filled
+
+    @property
+    def status(self) -> str:
+        if self.filled <= 0:
+            return "UNFILLED"
+        return "FILLED" if self.remaining <= 1e-12 * max(1.0, self.requested) else "PARTIAL"
+
+    @property
+    def slippage(self) -> float:
+        """Adverse move of the average fill vs. the pre-trade best price (fraction, >= 0 is worse)."""
+        if not self.avg_price or not self.reference_price:
+            return 0.0
+        diff = self.avg_price - self.reference_price
+        return (diff if self.side == BUY else -diff) / self.reference_price
+
+
+class OrderBook:
+    def __init__(self, asset: str) -> None:
+        self.asset = asset
+        # price -> FIFO of [order_id, remaining qty]; one map and heap per side
+        self._levels: Dict[str, Dict[float, Deque[list]]] = {BUY: {}, SELL: {}}
+        self._heaps: Dict[str, List[float]] = {BUY: [], SELL: []}  # bids stored negated
+        self._orders: Dict[str, Tuple[str, float, list]] = {}  # id -> (side, price, entry)
+        self._ids = itertools.count(1)
+
+    def _key(self, side: str, price: float) -> float:
+        return -price if side == BUY else price
+
+    def best(self, side: str) -> Optional[float]:
+        """Best resting price on `side` (BUY = best bid, SELL = best ask)."""
+        heap, levels = self._heaps[side], self._levels[side]
+        while heap:
+            price = self._key(side, heap[0])
+            if levels.get(price):
+                return price
+            heapq.heappop(heap)
+            levels.pop(price, None)
+        return None
+
+    def depth(self, side: str) -> int:
+        return sum(1 for q in self._levels[side].values() if q)
+
+    def add(self, order_id: str, side: str, price: float, quantity: float) -> None:
+        """Rest a limit order (no matching; use `submit` for aggressive orders)."""
+        level = self._levels[side].get(price)
+        if level is None:
+            level = self._levels[side][price] = deque()
+            heapq.heappush(self._heaps[side], self._key(side, price))
+        entry = [order_id, quantity]
+        level.append(entry)
+        self._orders[order_id] = (side, price, entry)
+
+    def cancel(self, order_id: str) -> bool:
+        found = self._orders.pop(order_id, None)
+        if found is None:
+            return False
+        side, price, entry = found
+        level = self._levels[side].get(price)
+        if level is not None:
+            try:
+                level.remove(entry)
+            except ValueError:
+                pass
+        return True
+
+    def quote(self, side: str, quantity: float, limit: Optional[float] = None) -> Tuple[float, float]:
+        """(fillable quantity, notional) for a taker order, without touching the book."""
+        book_side = SELL if side == BUY else BUY
+        prices = sorted(p for p, q in self._levels[book_side].items() if q)
+        if book_side == BUY:
+            prices.reverse()
+        left, notional = quantity, 0.0
+        for price in prices:
+            if left <= 0 or (limit is not None and (price > limit if side == BUY else price < limit)):
+                break
+            take = min(left, sum(e[1] for e in self._levels[book_side][price]))
+            notional += take * price
+            left -= take
+        return quantity - left, notional
+
+    def submit(self, side: str, quantity: float, limit: Optional[float] = None,
+               order_id: Optional[str] = None, rest: bool = False) -> FillReport:
+        """Match a taker order against the opposite side, best price first, oldest order first.
+
+        Without `limit` it is a market order. A limit order's remainder rests in
+        the book when `rest=True`, otherwise it is dropped (IOC).
+        """
+        book_side = SELL if side == BUY else BUY
+        levels = self._levels[book_side]
+        ref = self.best(book_side)
+        left = quantity
+        notional = 0.0
+        fills: List[Tuple[str, float, float]] = []
+        while left > 0:
+            price = self.best(book_side)
+            if price is None or (limit is not None and (price > limit if side == BUY else price < limit)):
+                break
+            level = levels[price]
+            while level and left > 0:
+                entry = level[0]
+                take = entry[1] if entry[1] <= left else left
+                entry[1] -= take
+                left -= take
+                notional += take * price
+                fills.append((entry[0], price, take))
+                if entry[1] <= 0:
+                    level.popleft()
+                    self._orders.pop(entry[0], None)
+        filled = quantity - left
+        if rest and left > 0 and limit is not None:
+            self.add(order_id or f"o-{next(self._ids)}", side, limit, left)
+        return FillReport(side, quantity, filled, notional / filled if filled else None, ref, fills)
+
+    def clear_synthetic(self, side: str) -> None:
+        levels = self._levels[side]
+        for price, level in list(levels.items()):
+            keep = deque(e for e in level if not e[0].startswith(MM_PREFIX))
+            if len(keep) == len(level) and keep:
+                continue
+            for e in level:
+                if e[0].startswith(MM_PREFIX):
+                    self._orders.pop(e[0], None)
+            if keep:
+                levels[price] = keep
+            else:
+                del levels[price]  # its heap entry is dropped lazily by `best`
+
+
+class MatchingEngine:
+    def __init__(self, config: Optional[LiquidityConfig] = None) -> None:
+        self.config = config or LiquidityConfig()
+        self.books: Dict[str, OrderBook] = {}
+        self._ids = itertools.count(1)
+
+    def book(self, asset: str) -> OrderBook:
+        asset = asset.upper()
+        book = self.books.get(asset)
+        if book is None:
+            book = self.books[asset] = OrderBook(asset)
+        return book
+
+    def ensure_liquidity(self, asset: str, mid: float) -> None:
+        """Re-lay the synthetic ladder around `mid` on any side that has thinned out."""
+        book = self.book(asset)
+        cfg = self.config
+        for side, sign in ((BUY, -1), (SELL, 1)):
+            best = book.best(side)
+            drifted = best is None or abs(best / mid - 1) > cfg.spacing * cfg.levels / 2
+            if not drifted and book.depth(side) >= max(1, cfg.levels // 2):
+                continue
+            book.clear_synthetic(side)
+            for k in range(1, cfg.levels + 1):
+                price = round(mid * (1 + sign * k * cfg.spacing), 12)
+                book.add(f"{MM_PREFIX}{next(self._ids)}", side, price, cfg.level_notional / price)
+
+    def execute(self, asset: str, side: str, quantity: float, mid: float, limit: Optional[float] = None) -> FillReport:
+        self.ensure_liquidity(asset, mid)
+        return self.book(asset).submit(side, quantity, limit=limit)
+
+
+matching_engine = MatchingEngine()
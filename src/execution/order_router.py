@@ -0,0 +1,165 @@
+"""Order router that nets strategy orders before they reach the ExecutionAdapter.
+
+Orders are collected per (wallet, asset) for a short coalescing window. At the
+end of the window BUY and SELL quantities are netted among orders with the
+same limit price (market orders with market orders): the crossed part never
+leaves the process (it is the same wallet on both sides), and only the
+residual is executed as a single adapter call / trade record. The fill is then
+allocated back to every originating strategy pro rata to its quantity. When
+a price group nets out completely, its per-strategy fills are recorded in
+`trades_store` directly (`price_source: "crossed"`).
+
+Tuning (env): ORDER_COALESCE_MS (window length; 0 disables coalescing on the
+HTTP path, default 0).
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+from uuid import uuid4
+
+from src.execution.adapter import ExecutionAdapter, EXECUTION_MODE
+from src.execution.matching import BUY, SELL
+from src.market.prices import price_cache
+from src.models import TradeAction, TradeStatus
+from src.store import trades_store
+
+
+ORDER_COALESCE_MS = float(os.getenv("ORDER_COALESCE_MS", "0"))
+
+
+@dataclass
+class _Intent:
+    strategy_id: Optional[str]
+    side: str
+    quantity: float
+    price: Optional[float]
+    future: asyncio.Future
+
+
+class OrderRouter:
+    def __init__(self, adapter: Optional[ExecutionAdapter] = None, window_ms: float = ORDER_COALESCE_MS) -> None:
+        self.window_ms = window_ms
+        self._adapter = adapter
+        self._pending: Dict[Tuple[str, str], List[_Intent]] = {}
+        self._tasks: set = set()
+        self.stats = {"orders": 0, "executions": 0, "netted_quantity": 0.0}
+
+    @property
+    def enabled(self) -> bool:
+        return self.window_ms > 0
+
+    @property
+    def adapter(self) -> ExecutionAdapter:
+        if self._adapter is None:
+            self._adapter = ExecutionAdapter(mode=EXECUTION_MODE)
+        return self._adapter
+
+    async def submit(self, wallet: str, asset: str, side: str, quantity: float,
+                     price: Optional[float] = None, strategy_id: Optional[str] = None) -> Dict[str, Any]:
+        """Queue an order and wait for its allocation (a Trade-shaped dict) after the window closes."""
+        side = side.upper()
+        if side not in (BUY, SELL):
+            raise ValueError(f"Unsupported side: {side}")
+        if quantity <= 0:
+            raise ValueError("quantity must be positive")
+        loop = asyncio.get_running_loop()
+        key = (wallet, asset.upper())
+        intent = _Intent(strategy_id, side, quantity, price, loop.create_future())
+        batch = self._pending.get(key)
+        if batch is None:
+            batch = self._pending[key] = []
+            loop.call_later(max(0.0, self.window_ms) / 1000, self._schedule_flush, key)
+        batch.append(intent)
+        self.stats["orders"] += 1
+        return await intent.future
+
+    def _schedule_flush(self, key: Tuple[str, str]) -> None:
+        task = asyncio.ensure_future(self.flush(key))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def flush(self, key: Tuple[str, str]) -> None:
+        batch = self._pending.pop(key, None)
+        if not batch:
+            return
+        # only orders with the same limit cross; each price group nets and executes on its own
+        groups: Dict[Optional[float], List[_Intent]] = {}
+        for intent in batch:
+            groups.setdefault(intent.price, []).append(intent)
+        for limit, group in groups.items():
+            try:
+                allocations = await self._execute(key, limit, group)
+            except Exception as e:
+                for intent in group:
+                    if not intent.future.done():
+                        intent.future.set_exception(e)
+                continue
+            for intent, alloc in zip(group, allocations):
+                if not intent.future.done():
+                    intent.future.set_result(alloc)
+
+    async def _execute(self, key: Tuple[str, str], limit: Optional[float], batch: List[_Intent]) -> List[Dict[str, Any]]:
+        wallet, asset = key
+        bought = sum(i.quantity for i in batch if i.side == BUY)
+        sold = sum(i.quantity for i in batch if i.side == SELL)
+        crossed = min(bought, sold)
+        net = bought - sold
+        residual_side = BUY if net > 0 else SELL if net < 0 else None
+
+        trade = None
+        if residual_side is not None:
+            execute = self.adapter.execute_buy if residual_side == BUY else self.adapter.execute_sell
+            strategies = {i.strategy_id for i in batch}
+            trade = await execute(wallet, asset, abs(net), limit,
+                                  strategy_id=strategies.pop() if len(strategies) == 1 else "netted")
+            self.stats["executions"] += 1
+        self.stats["netted_quantity"] += crossed
+
+        # both sides of a limit group accepted its price; market orders cross at the mark
+        cross_price = limit if limit is not None else trade["price"] if trade else price_cache.mark(asset)
+        fill_ratio = trade["quantity"] / abs(net) if trade else 0.0
+        now = datetime.now(timezone.utc)
+        out = []
+        for intent in batch:
+            side_total = bought if intent.side == BUY else sold
+            netted = intent.quantity * crossed / side_total
+            external = 0.0
+            if intent.side == residual_side:
+                external = intent.quantity * (side_total - crossed) / side_total * fill_ratio
+            filled = netted + external
+            price = (netted * cross_price + external * trade["price"]) / filled if trade and filled else cross_price
+            # realized PnL belongs to the residual execution; crossed quantity never touched the wallet
+            pnl = trade["pnl"] * external / trade["quantity"] if trade and trade["quantity"] else 0.0
+            out.append({
+                "id": str(uuid4()),
+                "strategy_id": intent.strategy_id or intent.side.lower(),
+                "action": TradeAction(intent.side),
+                "asset": asset,
+                "quantity": filled,
+                "requested_quantity": intent.quantity,
+                "netted_quantity": netted,
+                "price": price,
+                "pnl": pnl,
+                "status": TradeStatus.CLOSED,
+                "executed_at": now,
+                "duration": "00:00:02",
+                "parent_trade_id": trade["id"] if trade else None,
+            })
+        if trade is None:
+            for alloc in out:
+                alloc["price_source"] = "crossed"
+            trades_store[:0] = out
+        else:
+            trade["allocations"] = [
+                {"strategy_id": a["strategy_id"], "side": a["action"].value, "requested": a["requested_quantity"],
+                 "filled": a["quantity"], "netted": a["netted_quantity"], "price": a["price"]}
+                for a in out
+            ]
+        return out
+
+
+order_router = OrderRouter()
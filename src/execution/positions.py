@@ -0,0 +1,122 @@
+"""Per-wallet position book with FIFO lot matching.
+
+Every (wallet, asset) keeps its open lots in two growable numpy arrays
+(signed quantity, price) plus a head index: new lots are appended at the
+tail, opposing trades consume lots from the head. A trade therefore costs
+O(lots consumed), and realized PnL, net quantity and cost basis are kept as
+running totals so reading a position is O(1). Unrealized PnL is computed
+against the cached mark price (`src.market.prices`).
+
+All PnL is in SOL, like the prices.
+"""
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from src.market.prices import PriceCache, price_cache
+
+
+_EPS = 1e-12
+
+
+class LotQueue:
+    """FIFO of open lots for one (wallet, asset); all lots share the sign of the position."""
+
+    __slots__ = ("qty", "price", "head", "tail", "quantity", "cost", "realized")
+
+    def __init__(self, capacity: int = 8) -> None:
+        self.qty = np.zeros(capacity)
+        self.price = np.zeros(capacity)
+        self.head = 0
+        self.tail = 0
+        self.quantity = 0.0  # signed net quantity (> 0 long, < 0 short)
+        self.cost = 0.0  # signed cost basis of the open lots
+        self.realized = 0.0
+
+    def __len__(self) -> int:
+        return self.tail - self.head
+
+    def _push(self, qty: float, price: float) -> None:
+        if self.tail == len(self.qty):
+            n = len(self)
+            if self.head >= len(self.qty) // 2:  # enough consumed room: compact in place
+                self.qty[:n] = self.qty[self.head:self.tail]
+                self.price[:n] = self.price[self.head:self.tail]
+            else:
+                self.qty = np.concatenate((self.qty[self.head:self.tail], np.zeros(len(self.qty))))
+                self.price = np.concatenate((self.price[self.head:self.tail], np.zeros(len(self.price))))
+            self.head, self.tail = 0, n
+        self.qty[self.tail] = qty
+        self.price[self.tail] = price
+        self.tail += 1
+        self.quantity += qty
+        self.cost += qty * price
+
+    def fill(self, qty: float, price: float) -> float:
+        """Apply a signed fill (> 0 buy, < 0 sell); returns the PnL it realized."""
+        realized = 0.0
+        left = qty
+        # an opposing fill closes lots oldest first
+        while self.head < self.tail and abs(left) > _EPS and (left > 0) != (self.qty[self.head] > 0):
+            lot = float(self.qty[self.head])
+            take = min(abs(lot), abs(left))
+            signed = take if lot > 0 else -take
+            realized += signed * (price - float(self.price[self.head]))
+            self.quantity -= signed
+            self.cost -= signed * float(self.price[self.head])
+            left += signed
+            if take >= abs(lot) - _EPS:
+                self.head += 1
+            else:
+                self.qty[self.head] = lot - signed
+        if self.head == self.tail:
+            self.head = self.tail = 0
+            self.quantity = self.cost = 0.0  # flat: drop float residue
+        if abs(left) > _EPS:  # remainder opens a new lot (or flips the position)
+            self._push(left, price)
+        self.realized += realized
+        return realized
+
+    def lots(self) -> List[Tuple[float, float]]:
+        return list(zip(self.qty[self.head:self.tail].tolist(), self.price[self.head:self.tail].tolist()))
+
+
+class PositionBook:
+    def __init__(self, prices: Optional[PriceCache] = None) -> None:
+        self.prices = prices or price_cache
+        self._books: Dict[str, Dict[str, LotQueue]] = {}
+
+    def apply(self, wallet: str, asset: str, side: str, quantity: float, price: float) -> float:
+        """Record a BUY/SELL fill and return its realized PnL."""
+        lots = self._books.setdefault(wallet, {}).get(asset.upper())
+        if lots is None:
+            lots = self._books[wallet][asset.upper()] = LotQueue()
+        return lots.fill(quantity if side.upper() == "BUY" else -quantity, price)
+
+    def position(self, wallet: str, asset: str) -> Optional[Dict[str, Any]]:
+        lots = self._books.get(wallet, {}).get(asset.upper())
+        if lots is None:
+            return None
+        tick = self.prices.get(asset)
+        mark = tick["price"] if tick else None
+        return {
+            "asset": asset.upper(),
+            "quantity": lots.quantity,
+            "avg_price": lots.cost / lots.quantity if lots.quantity else None,
+            "cost_basis": lots.cost,
+            "lots": len(lots),
+            "mark_price": mark,
+            "realized_pnl": lots.realized,
+            "unrealized_pnl": lots.quantity * mark - lots.cost if mark is not None else None,
+        }
+
+    def positions(self, wallet: str) -> List[Dict[str, Any]]:
+        return [self.position(wallet, asset) for asset in sorted(self._books.get(wallet, {}))]
+
+    def clear(self) -> None:
+        self._books.clear()
+
+
+position_book = PositionBook()
@@ -0,0 +1,195 @@
+"""Pre-trade risk checks backed by incrementally maintained exposure aggregates.
+
+The engine keeps per-wallet running totals (net quantity and notional per
+asset, gross exposure, today's realized PnL, cumulative PnL and its peak) and
+updates them from every executed trade. `check` evaluates each limit rule
+against those totals in O(1), so a pre-trade check never rescans
+`trades_store`.
+
+Limits (env, in SOL unless noted; 0 disables a rule):
+RISK_MAX_ORDER_NOTIONAL (budget cap per order), RISK_MAX_ASSET_EXPOSURE,
+RISK_MAX_WALLET_EXPOSURE (gross), RISK_MAX_DAILY_LOSS, RISK_MAX_DRAWDOWN
+(from the realized PnL peak), RISK_MAX_SLIPPAGE (fraction of the mark price).
+"""
+from __future__ import annotations
+
+import os
+import time
+from dataclasses import dataclass, field, replace
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+def _env_float(name: str, default: float = 0.0) -> float:
+    try:
+        return float(os.getenv(name, default))
+    except ValueError:
+        return default
+
+
+class RiskLimitError(ValueError):
+    """An order would breach a risk limit."""
+
+    def __init__(self, rule: str, message: str) -> None:
+        super().__init__(f"Risk limit {rule}: {message}")
+        self.rule = rule
+
+
+@dataclass
+class RiskLimits:
+    max_order_notional: float = field(default_factory=lambda: _env_float("RISK_MAX_ORDER_NOTIONAL"))
+    max_asset_exposure: float = field(default_factory=lambda: _env_float("RISK_MAX_ASSET_EXPOSURE"))
+    max_wallet_exposure: float = field(default_factory=lambda: _env_float("RISK_MAX_WALLET_EXPOSURE"))
+    max_daily_loss: float = field(default_factory=lambda: _env_float("RISK_MAX_DAILY_LOSS"))
+    max_drawdown: float = field(default_factory=lambda: _env_float("RISK_MAX_DRAWDOWN"))
+    max_slippage: float = field(default_factory=lambda: _env_float("RISK_MAX_SLIPPAGE"))
+
+
+@dataclass
+class WalletRisk:
+    quantity: Dict[str, float] = field(default_factory=dict)  # asset -> signed net quantity
+    price: Dict[str, float] = field(default_factory=dict)  # asset -> last fill price
+    gross: float = 0.0  # sum of |quantity| * last price over assets
+    day: int = 0
+    daily_pnl: float = 0.0
+    pnl: float = 0.0
+    peak: float = 0.0
+
+    def exposure(self, asset: str) -> float:
+        return abs(self.quantity.get(asset, 0.0)) * self.price.get(asset, 0.0)
+
+
+@dataclass
+class Order:
+    wallet: str
+    asset: str
+    side: str
+    quantity: float
+    price: float  # expected fill price
+    mark: Optional[float]
+
+    @property
+    def signed(self) -> float:
+        return self.quantity if self.side == "BUY" else -self.quantity
+
+
+Rule = Callable[[Order, WalletRisk, RiskLimits], Optional[str]]
+
+
+def _order_notional(o: Order, w: WalletRisk, lim: RiskLimits) -> Optional[str]:
+    if lim.max_order_notional and o.quantity * o.price > lim.max_order_notional:
+        return f"order notional {o.quantity * o.price:.6g} > {lim.max_order_notional:g}"
+    return None
+
+
+def _post_trade_exposure(o: Order, w: WalletRisk) -> Tuple[float, float]:
+    before = w.exposure(o.asset)
+    after = abs(w.quantity.get(o.asset, 0.0) + o.signed) * o.price
+    return before, after
+
+
+def _asset_exposure(o: Order, w: WalletRisk, lim: RiskLimits) -> Optional[str]:
+    before, after = _post_trade_exposure(o, w)
+    if lim.max_asset_exposure and after > before and after > lim.max_asset_exposure:
+        return f"{o.asset} exposure {after:.6g} > {lim.max_asset_exposure:g}"
+    return None
+
+
+def _wallet_exposure(o: Order, w: WalletRisk, lim: RiskLimits) -> Optional[str]:
+    before, after = _post_trade_exposure(o, w)
+    gross = w.gross - before + after
+    if lim.max_wallet_exposure and after > before and gross > lim.max_wallet_exposure:
+        return f"gross exposure {gross:.6g} > {lim.max_wallet_exposure:g}"
+    return None
+
+
+def _daily_loss(o: Order, w: WalletRisk, lim: RiskLimits) -> Optional[str]:
+    if lim.max_daily_loss and w.day == _today() and -w.daily_pnl >= lim.max_daily_loss:
+        return f"daily loss {-w.daily_pnl:.6g} reached {lim.max_daily_loss:g}"
+    return None
+
+
+def _drawdown(o: Order, w: WalletRisk, lim: RiskLimits) -> Optional[str]:
+    if lim.max_drawdown and w.peak - w.pnl >= lim.max_drawdown:
+        return f"drawdown {w.peak - w.pnl:.6g} reached {lim.max_drawdown:g}"
+    return None
+
+
+def _slippage(o: Order, w: WalletRisk, lim: RiskLimits) -> Optional[str]:
+    if lim.max_slippage and o.mark:
+        slip = (o.price - o.mark) / o.mark * (1 if o.side == "BUY" else -1)
+        if slip > lim.max_slippage:
+            return f"expected slippage {slip:.4%} > {lim.max_slippage:.4%}"
+    return None
+
+
+DEFAULT_RULES: List[Tuple[str, Rule]] = [
+    ("order_notional", _order_notional),
+    ("asset_exposure", _asset_exposure),
+    ("wallet_exposure", _wallet_exposure),
+    ("daily_loss", _daily_loss),
+    ("drawdown", _drawdown),
+    ("slippage", _slippage),
+]
+
+
+def _today() -> int:
+    return int(time.time() // 86400)
+
+
+class RiskEngine:
+    def __init__(self, limits: Optional[RiskLimits] = None, rules: Optional[List[Tuple[str, Rule]]] = None) -> None:
+        self.limits = limits or RiskLimits()
+        self.rules = list(DEFAULT_RULES if rules is None else rules)
+        self._wallets: Dict[str, WalletRisk] = {}
+        self.stats = {"checked": 0, "rejected": 0}
+
+    def _state(self, wallet: str) -> WalletRisk:
+        w = self._wallets.get(wallet)
+        if w is None:
+            w = self._wallets[wallet] = WalletRisk(day=_today())
+        return w
+
+    def check(self, wallet: str, asset: str, side: str, quantity: float, price: float,
+              mark: Optional[float] = None) -> None:
+        """Raise RiskLimitError for the first rule the order would breach."""
+        self.stats["checked"] += 1
+        order = Order(wallet, asset.upper(), side.upper(), quantity, price, mark)
+        w = self._state(wallet)
+        for name, rule in self.rules:
+            reason = rule(order, w, self.limits)
+            if reason is not None:
+                self.stats["rejected"] += 1
+                raise RiskLimitError(name, reason)
+
+    def record(self, wallet: str, asset: str, side: str, quantity: float, price: float, pnl: float = 0.0) -> None:
+        """Fold an executed fill into the wallet's aggregates."""
+        asset = asset.upper()
+        w = self._state(wallet)
+        before = w.exposure(asset)
+        w.quantity[asset] = w.quantity.get(asset, 0.0) + (quantity if side.upper() == "BUY" else -quantity)
+        w.price[asset] = price
+        w.gross += w.exposure(asset) - before
+        today = _today()
+        if w.day != today:
+            w.day, w.daily_pnl = today, 0.0
+        w.daily_pnl += pnl
+        w.pnl += pnl
+        w.peak = max(w.peak, w.pnl)
+
+    def snapshot(self, wallet: str) -> Dict[str, Any]:
+        """Current aggregates of `wallet`, read from a copy: never registers a wallet or touches its state."""
+        w = self._wallets.get(wallet)
+        w = WalletRisk(day=_today()) if w is None else replace(w, quantity=dict(w.quantity), price=dict(w.price))
+        return {
+            "exposure": {a: w.exposure(a) for a in w.quantity if w.quantity[a]},
+            "gross_exposure": w.gross,
+            "daily_pnl": w.daily_pnl if w.day == _today() else 0.0,
+            "realized_pnl": w.pnl,
+            "drawdown": w.peak - w.pnl,
+        }
+
+    def clear(self) -> None:
+        self._wallets.clear()
+
+
+risk_engine = RiskEngine()
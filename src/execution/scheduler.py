@@ -0,0 +1,214 @@
+"""Scheduler that fires SCHEDULED ideas into `execution_stream` at their planned time.
+
+Pending schedules live in a hierarchical timing wheel: level L has `slots`
+buckets of `tick * slots**L` seconds each, so inserting or cancelling a
+schedule is a dict operation in one bucket (O(1)), and advancing the clock
+only touches the bucket of the current tick, plus a cascade of one
+higher-level bucket every `slots` ticks; idle stretches are skipped up to the
+next non-empty bucket boundary. Schedules beyond the top level wait there and
+are re-filed on each pass.
+
+Fired schedules are published with bounded concurrency. A schedule found more
+than `misfire_grace` seconds late (e.g. after a stall) is either still fired
+("fire") or dropped ("skip"), per schedule or by default. Optional `jitter`
+spreads schedules planned for the same instant over a small window.
+
+Tuning (env): SCHED_TICK_MS (default 50), SCHED_CONCURRENCY (default 32),
+SCHED_JITTER_MS (default 0), SCHED_MISFIRE (fire | skip, default fire),
+SCHED_MISFIRE_GRACE_SECONDS (default 5).
+"""
+from __future__ import annotations
+
+import asyncio
+import math
+import os
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+from uuid import uuid4
+
+from src.bus import bus
+
+
+EXECUTION_STREAM = "execution_stream"
+MISFIRE_POLICIES = ("fire", "skip")
+
+
+@dataclass
+class ScheduleEntry:
+    id: str
+    fire_at: float  # epoch seconds
+    payload: Dict[str, Any] = field(default_factory=dict)
+    misfire: Optional[str] = None
+    tick: int = 0
+    where: Optional[tuple] = None  # (level, slot) while filed in the wheel
+
+
+class TimingWheel:
+    def __init__(self, tick: float = 0.05, slots: int = 64, levels: int = 4, now: Optional[float] = None) -> None:
+        self.tick = tick
+        self.slots = slots
+        self.levels = levels
+        self.current = int((time.time() if now is None else now) // tick)
+        self._wheels: List[List[Dict[str, ScheduleEntry]]] = [[{} for _ in range(slots)] for _ in range(levels)]
+        self._entries: Dict[str, ScheduleEntry] = {}
+        self._spans = [slots ** (lvl + 1) for lvl in range(levels)]
+        self._counts = [0] * levels  # entries filed per level, to skip idle ticks
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, entry_id: str) -> bool:
+        return entry_id in self._entries
+
+    def add(self, entry: ScheduleEntry) -> bool:
+        """File `entry`; returns False (and files nothing) if it is already due."""
+        if entry.id in self._entries:
+            self.cancel(entry.id)
+        entry.tick = math.ceil(entry.fire_at / self.tick)
+        if not self._file(entry):
+            return False
+        self._entries[entry.id] = entry
+        return True
+
+    def _file(self, entry: ScheduleEntry) -> bool:
+        delta = entry.tick - self.current
+        if delta <= 0:
+            return False
+        level = next((lvl for lvl, span in enumerate(self._spans) if delta < span), self.levels - 1)
+        slot = (entry.tick // self.slots ** level) % self.slots
+        self._wheels[level][slot][entry.id] = entry
+        self._counts[level] += 1
+        entry.where = (level, slot)
+        return True
+
+    def cancel(self, entry_id: str) -> Optional[ScheduleEntry]:
+        entry = self._entries.pop(entry_id, None)
+        if entry is not None and entry.where is not None:
+            level, slot = entry.where
+            self._wheels[level][slot].pop(entry_id, None)
+            self._counts[level] -= 1
+            entry.where = None
+        return entry
+
+    def advance(self, now: Optional[float] = None) -> List[ScheduleEntry]:
+        """Move the clock to `now` and return every entry that became due, in fire order."""
+        target = int((time.time() if now is None else now) // self.tick)
+        due: List[ScheduleEntry] = []
+        while self.current < target:
+            # nothing can happen before the next bucket boundary of the lowest non-empty level
+            level = next((lvl for lvl, n in enumerate(self._counts) if n), None)
+            if level is None:
+                self.current = target
+                break
+            width = self.slots ** level
+            self.current = min(target, (self.current // width + 1) * width)
+            # re-file the higher-level buckets that start at this tick (top level first)
+            for level in range(self.levels - 1, 0, -1):
+                width = self.slots ** level
+                if self.current % width:
+                    continue
+                bucket = self._wheels[level][(self.current // width) % self.slots]
+                moved = list(bucket.values())
+                bucket.clear()
+                self._counts[level] -= len(moved)
+                for entry in moved:
+                    if not self._file(entry):
+                        due.append(self._entries.pop(entry.id))
+                        entry.where = None
+            bucket = self._wheels[0][self.current % self.slots]
+            if bucket:
+                self._counts[0] -= len(bucket)
+                for entry in bucket.values():
+                    self._entries.pop(entry.id, None)
+                    entry.where = None
+                due.extend(bucket.values())
+                bucket.clear()
+        due.sort(key=lambda e: e.fire_at)
+        return due
+
+
+class Scheduler:
+    def __init__(self, tick: float = float(os.getenv("SCHED_TICK_MS", "50")) / 1000,
+                 concurrency: int = int(os.getenv("SCHED_CONCURRENCY", "32")),
+                 jitter: float = float(os.getenv("SCHED_JITTER_MS", "0")) / 1000,
+                 misfire: str = os.getenv("SCHED_MISFIRE", "fire"),
+                 misfire_grace: float = float(os.getenv("SCHED_MISFIRE_GRACE_SECONDS", "5")),
+                 stream: str = EXECUTION_STREAM, seed: Optional[int] = None) -> None:
+        if misfire not in MISFIRE_POLICIES:
+            raise ValueError(f"misfire must be one of {MISFIRE_POLICIES}")
+        self.wheel = TimingWheel(tick)
+        self.interval = tick
+        self.jitter = jitter
+        self.misfire = misfire
+        self.misfire_grace = misfire_grace
+        self.stream = stream
+        self._sem = asyncio.Semaphore(max(1, concurrency))
+        self._rng = random.Random(seed)
+        self._by_idea: Dict[str, str] = {}
+        self._tasks: set = set()
+        self.stats = {"scheduled": 0, "fired": 0, "skipped": 0, "cancelled": 0, "max_lateness": 0.0}
+
+    def schedule(self, idea: Dict[str, Any], at: Optional[float] = None, misfire: Optional[str] = None) -> str:
+        """Plan the execution of `idea` at epoch `at` (now if omitted); replaces an earlier schedule of the idea."""
+        if misfire is not None and misfire not in MISFIRE_POLICIES:
+            raise ValueError(f"misfire must be one of {MISFIRE_POLICIES}")
+        idea_id = str(idea.get("id"))
+        self.cancel_idea(idea_id)
+        fire_at = time.time() if at is None else at
+        if self.jitter:
+            fire_at += self._rng.uniform(0.0, self.jitter)
+        entry = ScheduleEntry(str(uuid4()), fire_at, {
+            "idea_id": idea_id,
+            "asset": idea.get("asset"),
+            "budget": idea.get("budget"),
+            "risk": idea.get("risk"),
+        }, misfire)
+        self._by_idea[idea_id] = entry.id
+        self.stats["scheduled"] += 1
+        if not self.wheel.add(entry):
+            self._fire(entry)  # already due: no need to wait for the next tick
+        return entry.id
+
+    def cancel_idea(self, idea_id: str) -> bool:
+        entry_id = self._by_idea.pop(str(idea_id), None)
+        if entry_id is None or self.wheel.cancel(entry_id) is None:
+            return False
+        self.stats["cancelled"] += 1
+        return True
+
+    def pending(self) -> int:
+        return len(self.wheel)
+
+    async def tick(self, msg: Optional[Dict[str, Any]] = None) -> int:
+        """Advance the wheel to now and dispatch what became due (a periodic worker handler)."""
+        due = self.wheel.advance()
+        for entry in due:
+            self._fire(entry)
+        return len(due)
+
+    def _fire(self, entry: ScheduleEntry) -> None:
+        if self._by_idea.get(entry.payload.get("idea_id")) == entry.id:
+            del self._by_idea[entry.payload["idea_id"]]
+        lateness = max(0.0, time.time() - entry.fire_at)
+        if lateness > self.misfire_grace and (entry.misfire or self.misfire) == "skip":
+            self.stats["skipped"] += 1
+            return
+        self.stats["max_lateness"] = max(self.stats["max_lateness"], lateness)
+        task = asyncio.ensure_future(self._publish(entry, lateness))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _publish(self, entry: ScheduleEntry, lateness: float) -> None:
+        async with self._sem:
+            await bus.publish(self.stream, dict(entry.payload, schedule_id=entry.id, planned_at=entry.fire_at,
+                                                fired_at=time.time(), lateness=round(lateness, 4)))
+            self.stats["fired"] += 1
+
+    async def drain(self) -> None:
+        if self._tasks:
+            await asyncio.gather(*list(self._tasks), return_exceptions=True)
+
+
+scheduler = Scheduler()
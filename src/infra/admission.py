@@ -0,0 +1,133 @@
+"""Admission control for expensive API routes.
+
+Each route group gets an `AdmissionGate`: at most `concurrency` requests run at
+once, at most `queue` more wait for a slot, and a waiter that has not been
+admitted within `deadline` seconds gives up. Excess load is shed instead of
+piling up behind the running work:
+
+- queue full            -> 429 Too Many Requests
+- queue-time deadline   -> 503 Service Unavailable
+
+both with a `Retry-After` estimated from the current backlog and the recent
+service time. Endpoints take a slot through a dependency:
+
+    async def trigger_analysis(limit: int = 10, _slot=Depends(admission.admit("strategies"))):
+
+or hold `gate(name).slot()` around just the work, as `POST /trades/execute`
+does so that idempotent replays never take one.
+
+Tuning (env), per gate NAME (RESEARCH, STRATEGIES, TRADES):
+ADMISSION_<NAME>_CONCURRENCY (`0` disables the gate), ADMISSION_<NAME>_QUEUE,
+ADMISSION_<NAME>_DEADLINE_MS.
+"""
+from __future__ import annotations
+
+import asyncio
+import math
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Callable, Dict, List, Tuple
+
+from fastapi import HTTPException
+
+
+# name -> (concurrency, queue, deadline_ms)
+DEFAULT_LIMITS: Dict[str, Tuple[int, int, int]] = {
+    "research": (2, 8, 5000),
+    "strategies": (2, 8, 10000),
+    "trades": (32, 128, 2000),
+}
+
+
+class Overloaded(HTTPException):
+    def __init__(self, status_code: int, detail: str, retry_after: int) -> None:
+        super().__init__(status_code=status_code, detail=detail, headers={"Retry-After": str(retry_after)})
+        self.retry_after = retry_after
+
+
+class AdmissionGate:
+    def __init__(self, name: str, concurrency: int, queue: int, deadline: float) -> None:
+        self.name = name
+        self.concurrency = concurrency
+        self.queue = queue
+        self.deadline = deadline
+        self._sem = asyncio.Semaphore(max(1, concurrency))
+        self.active = 0
+        self.waiting = 0
+        self._service = 0.0  # EWMA of seconds per admitted request
+        self.stats = {"admitted": 0, "queue_full": 0, "deadline": 0}
+
+    @property
+    def enabled(self) -> bool:
+        return self.concurrency > 0
+
+    def retry_after(self) -> int:
+        """Seconds until the current backlog should have drained, at least 1."""
+        backlog = (self.waiting + self.active + 1) / max(1, self.concurrency)
+        return max(1, math.ceil(backlog * (self._service or self.deadline or 1.0)))
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        if not self.enabled:
+            yield
+            return
+        if not self._sem.locked():
+            await self._sem.acquire()  # free slot: returns immediately
+        elif self.waiting >= self.queue:
+            self.stats["queue_full"] += 1
+            raise Overloaded(429, f"{self.name} is at capacity, retry later", self.retry_after())
+        else:
+            self.waiting += 1
+            try:
+                await asyncio.wait_for(self._sem.acquire(), self.deadline or None)
+            except asyncio.TimeoutError:
+                self.stats["deadline"] += 1
+                raise Overloaded(503, f"{self.name} could not start within {self.deadline:g}s", self.retry_after()) from None
+            finally:
+                self.waiting -= 1
+        self.active += 1
+        self.stats["admitted"] += 1
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self.active -= 1
+            self._sem.release()
+            elapsed = time.monotonic() - start
+            self._service = elapsed if not self._service else 0.8 * self._service + 0.2 * elapsed
+
+    def status(self) -> Dict[str, object]:
+        return {"name": self.name, "concurrency": self.concurrency, "queue": self.queue, "deadline": self.deadline,
+                "active": self.active, "waiting": self.waiting, "service_seconds": round(self._service, 4), **self.stats}
+
+
+_gates: Dict[str, AdmissionGate] = {}
+
+
+def gate(name: str) -> AdmissionGate:
+    """The gate for route group `name`, created from env / `DEFAULT_LIMITS` on first use."""
+    g = _gates.get(name)
+    if g is None:
+        concurrency, queue, deadline_ms = DEFAULT_LIMITS.get(name, (0, 0, 0))
+        prefix = f"ADMISSION_{name.upper()}_"
+        g = _gates[name] = AdmissionGate(
+            name,
+            int(os.getenv(prefix + "CONCURRENCY", str(concurrency))),
+            int(os.getenv(prefix + "QUEUE", str(queue))),
+            float(os.getenv(prefix + "DEADLINE_MS", str(deadline_ms))) / 1000,
+        )
+    return g
+
+
+def admit(name: str) -> Callable[[], AsyncIterator[None]]:
+    """FastAPI dependency holding a slot of gate `name` for the duration of the request."""
+    async def _slot() -> AsyncIterator[None]:
+        async with gate(name).slot():
+            yield
+
+    return _slot
+
+
+def status() -> List[Dict[str, object]]:
+    return [g.status() for g in _gates.values()]
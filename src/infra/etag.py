@@ -0,0 +1,78 @@
+"""Conditional GET for read-mostly endpoints.
+
+A response is identified by a cache key (path + query) and the version of the
+store it reads (`src.infra.versioned`). The weak ETag is derived from that
+version, so a poll whose `If-None-Match` still matches is answered 304 before
+the store is read, serialized or validated. Otherwise the serialized body is
+cached per key and version, together with its gzip encoding (compressed once
+per version, served to clients that accept it).
+
+Tuning (env): ETAG_CACHE_SIZE (cached bodies, default 256), ETAG_GZIP_MIN_BYTES
+(smallest body worth compressing, default 1024; `0` disables gzip).
+"""
+from __future__ import annotations
+
+import gzip
+import os
+from collections import OrderedDict
+from typing import Callable, Hashable, Optional, Tuple
+from uuid import uuid4
+
+from fastapi import Request
+from fastapi.responses import Response
+
+
+# versions restart with the process; the boot id keeps old ETags from matching new data
+_BOOT = uuid4().hex[:8]
+
+
+def _matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # weak comparison: W/ prefixes are ignored
+    tags = {t.strip().removeprefix("W/") for t in if_none_match.split(",")}
+    return etag.removeprefix("W/") in tags
+
+
+class ResponseCache:
+    def __init__(self, max_entries: int = int(os.getenv("ETAG_CACHE_SIZE", "256")),
+                 gzip_min: int = int(os.getenv("ETAG_GZIP_MIN_BYTES", "1024"))) -> None:
+        self.max_entries = max_entries
+        self.gzip_min = gzip_min
+        # key -> (version, body, gzipped body or None)
+        self._bodies: "OrderedDict[Hashable, Tuple[int, bytes, Optional[bytes]]]" = OrderedDict()
+        self.stats = {"not_modified": 0, "hits": 0, "rendered": 0}
+
+    def respond(self, request: Request, key: Hashable, version: int, render: Callable[[], bytes],
+                media_type: str = "application/json") -> Response:
+        """304 if the client's ETag is current, else the (cached) body for `version`."""
+        etag = f'W/"{_BOOT}-{version}"'
+        headers = {"ETag": etag, "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+        if _matches(request.headers.get("if-none-match"), etag):
+            self.stats["not_modified"] += 1
+            return Response(status_code=304, headers=headers)
+        cached = self._bodies.get(key)
+        if cached is not None and cached[0] == version:
+            self._bodies.move_to_end(key)
+            self.stats["hits"] += 1
+            _, body, gz = cached
+        else:
+            body = render()
+            gz = gzip.compress(body, 6) if self.gzip_min and len(body) >= self.gzip_min else None
+            self._bodies[key] = (version, body, gz)
+            self._bodies.move_to_end(key)
+            while len(self._bodies) > self.max_entries:
+                self._bodies.popitem(last=False)
+            self.stats["rendered"] += 1
+        if gz is not None and "gzip" in request.headers.get("accept-encoding", ""):
+            headers["Content-Encoding"] = "gzip"
+            return Response(gz, media_type=media_type, headers=headers)
+        return Response(body, media_type=media_type, headers=headers)
+
+    def clear(self) -> None:
+        self._bodies.clear()
+
+
+response_cache = ResponseCache()
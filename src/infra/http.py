@@ -0,0 +1,136 @@
+"""Shared async HTTP client with a TTL response cache.
+
+One `httpx.AsyncClient` (connection pool) lives for the whole application.
+GET responses are cached per (url, params) for `ttl` seconds; once stale they
+are revalidated with `If-None-Match` / `If-Modified-Since`, so an unchanged
+upstream answers 304 without a body. If the upstream is unreachable, rate
+limits us (429) or fails (5xx), a stale entry is served instead of an error
+and the upstream is left alone for its `Retry-After`, or `stale_backoff`
+seconds (HTTP_STALE_BACKOFF_SECONDS, default 10). Concurrent requests for the
+same key share a single upstream call; if that call is cancelled the others
+get `FetchAborted`, an `httpx.HTTPError` like any other failed fetch.
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+import httpx
+
+
+class FetchAborted(httpx.RequestError):
+    """The shared upstream call this request waited on was cancelled; retrying fetches again."""
+
+
+@dataclass
+class _Entry:
+    data: Any
+    expires: float
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+
+class CachedHttpClient:
+    def __init__(self, timeout: float = 10.0, transport: Optional[httpx.AsyncBaseTransport] = None,
+                 max_entries: int = 256, stale_backoff: float = float(os.getenv("HTTP_STALE_BACKOFF_SECONDS", "10"))) -> None:
+        self.timeout = timeout
+        self.max_entries = max_entries
+        self.stale_backoff = stale_backoff
+        self._transport = transport
+        self._client: Optional[httpx.AsyncClient] = None
+        self._cache: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], _Entry] = {}
+        self._inflight: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], asyncio.Future] = {}
+        self.stats = {"hits": 0, "revalidated": 0, "fetched": 0, "coalesced": 0, "stale": 0}
+
+    def _ensure(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout,
+                transport=self._transport,
+                limits=httpx.Limits(max_connections=20, max_keepalive_connections=10),
+                headers={"Accept": "application/json"},
+            )
+        return self._client
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+    async def get_json(self, url: str, params: Optional[Mapping[str, Any]] = None, ttl: float = 60.0) -> Any:
+        """GET `url` and return the decoded JSON body, served from cache while fresh.
+
+        Raises `httpx.HTTPError` if the upstream fails (network error, 429, 5xx) and nothing is cached.
+        """
+        key = (url, tuple(sorted((str(k), str(v)) for k, v in (params or {}).items())))
+        entry = self._cache.get(key)
+        if entry is not None and entry.expires > time.monotonic():
+            self.stats["hits"] += 1
+            return entry.data
+
+        fut = self._inflight.get(key)
+        if fut is not None:
+            self.stats["coalesced"] += 1
+            return await asyncio.shield(fut)
+
+        fut = asyncio.get_running_loop().create_future()
+        self._inflight[key] = fut
+        try:
+            data = await self._fetch(key, url, params, ttl, entry)
+            fut.set_result(data)
+            return data
+        except BaseException as e:
+            if isinstance(e, asyncio.CancelledError):
+                # the waiters were not cancelled themselves: give them an ordinary fetch error
+                e = FetchAborted(f"GET {url} was cancelled; retry")
+            fut.set_exception(e)
+            fut.exception()  # mark retrieved when nobody else was waiting
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+    async def _fetch(self, key, url: str, params: Optional[Mapping[str, Any]], ttl: float, entry: Optional[_Entry]) -> Any:
+        headers = {}
+        if entry is not None:
+            if entry.etag:
+                headers["If-None-Match"] = entry.etag
+            if entry.last_modified:
+                headers["If-Modified-Since"] = entry.last_modified
+        try:
+            r = await self._ensure().get(url, params=params, headers=headers)
+        except httpx.HTTPError:
+            if entry is not None:
+                return self._stale(entry, None)  # serve stale rather than nothing
+            raise
+        if r.status_code == 304 and entry is not None:
+            self.stats["revalidated"] += 1
+            entry.expires = time.monotonic() + ttl
+            return entry.data
+        if entry is not None and (r.status_code == 429 or r.status_code >= 500):
+            return self._stale(entry, r.headers.get("retry-after"))  # rate limited / upstream down: stale beats an error
+        r.raise_for_status()
+        self.stats["fetched"] += 1
+        data = r.json()
+        if len(self._cache) >= self.max_entries and key not in self._cache:
+            self._cache.pop(next(iter(self._cache)))
+        self._cache[key] = _Entry(data, time.monotonic() + ttl, r.headers.get("etag"), r.headers.get("last-modified"))
+        return data
+
+    def _stale(self, entry: _Entry, retry_after: Optional[str]) -> Any:
+        """The stale body, kept fresh until the upstream is worth asking again."""
+        self.stats["stale"] += 1
+        try:
+            backoff = float(retry_after) if retry_after else self.stale_backoff
+        except ValueError:  # an HTTP date: not worth parsing for a backoff
+            backoff = self.stale_backoff
+        entry.expires = time.monotonic() + max(0.0, backoff)
+        return entry.data
+
+
+http_client = CachedHttpClient()
@@ -0,0 +1,99 @@
+"""Idempotency-Key support for non-repeatable POSTs.
+
+`IdempotencyCache.run(key, fingerprint, fn)` runs `fn` once per key: a
+duplicate that arrives while the first call is in flight awaits the same
+future, and one that arrives later gets the stored result, so a client
+retrying a timed-out request never executes it twice. A key reused with a
+different request body (`fingerprint`) is rejected. Failed calls are not
+remembered, so a retry after an error runs again. If the first call is
+cancelled (e.g. its client disconnected), the duplicates waiting on it get
+`IdempotencyAborted`, which callers should answer as retryable.
+
+Completed results are kept in an LRU bounded by `max_entries` and expire
+after `ttl` seconds. Tuning (env): IDEMPOTENCY_CACHE_SIZE (default 10000),
+IDEMPOTENCY_TTL_SECONDS (default 86400).
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Optional, Tuple
+
+
+class IdempotencyConflict(ValueError):
+    """The key was already used for a different request."""
+
+
+class IdempotencyAborted(RuntimeError):
+    """The in-flight call this duplicate joined was cancelled before finishing; retrying runs it again."""
+
+
+@dataclass
+class _Entry:
+    fingerprint: str
+    expires: float
+    future: Optional[asyncio.Future] = None  # set while the first call runs
+    result: Any = None
+
+
+class IdempotencyCache:
+    def __init__(self, max_entries: int = int(os.getenv("IDEMPOTENCY_CACHE_SIZE", "10000")),
+                 ttl: float = float(os.getenv("IDEMPOTENCY_TTL_SECONDS", "86400"))) -> None:
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self.stats = {"executed": 0, "replayed": 0, "joined": 0, "conflicts": 0}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def run(self, key: str, fingerprint: str, fn: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """(result, replayed): `fn()`'s result, computed at most once per live `key`."""
+        entry = self._entries.get(key)
+        if entry is not None and entry.future is None and entry.expires <= time.monotonic():
+            del self._entries[key]
+            entry = None
+        if entry is not None:
+            if entry.fingerprint != fingerprint:
+                self.stats["conflicts"] += 1
+                raise IdempotencyConflict("Idempotency-Key was already used with a different request")
+            self._entries.move_to_end(key)
+            if entry.future is not None:
+                self.stats["joined"] += 1
+                return await asyncio.shield(entry.future), True
+            self.stats["replayed"] += 1
+            return entry.result, True
+
+        entry = self._entries[key] = _Entry(fingerprint, float("inf"), asyncio.get_running_loop().create_future())
+        self.stats["executed"] += 1
+        try:
+            result = await fn()
+        except BaseException as e:
+            # not remembered: the next retry runs again; current waiters see the same error
+            self._entries.pop(key, None)
+            if isinstance(e, asyncio.CancelledError):
+                e = IdempotencyAborted("The original request with this Idempotency-Key was cancelled; retry")
+            entry.future.set_exception(e)
+            entry.future.exception()  # mark retrieved, even when nobody joined
+            raise
+        entry.future.set_result(result)
+        entry.future, entry.result, entry.expires = None, result, time.monotonic() + self.ttl
+        self._evict()
+        return result, False
+
+    def _evict(self) -> None:
+        excess = len(self._entries) - self.max_entries
+        victims = []
+        for key, entry in self._entries.items():  # least recently used first
+            if len(victims) >= excess:
+                break
+            if entry.future is None:  # never drop an in-flight call
+                victims.append(key)
+        for key in victims:
+            del self._entries[key]
+
+    def clear(self) -> None:
+        self._entries.clear()
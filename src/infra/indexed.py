@@ -0,0 +1,588 @@
+"""List of dict records with maintained secondary indexes.
+
+`IndexedList` behaves like the plain lists in `src.store` (insert(0, ...),
+append, extend, clear, del, slicing) and keeps, per configured field,
+
+- a hash index: value -> set of records, for equality / IN filters, and
+- a sorted index: (value, record key) pairs, for range filters and ordering.
+
+`query` estimates how many records each filter selects (set size, or two
+bisects for a range). It intersects the equality filters' id sets smallest
+first, or starts from the narrowest range, before touching any record. With an
+order and a `limit` it may instead walk an order index and stop early: the
+whole one, or the smallest filter's buckets kept in that order (built on first
+use, then maintained with the rest), narrowing each block of ids by set
+membership. Either way the survivors are re-checked on the live records.
+
+Records are indexed by identity. Code that changes an indexed field of a
+stored record in place must call `touch(record)` afterwards; candidates are
+always re-checked against the live record, so a missed `touch` can only hide
+a record, never return a wrong one. Every mutation and `touch` also bumps the
+store's `version` (see `src.infra.versioned`).
+"""
+from __future__ import annotations
+
+import heapq
+from bisect import bisect_left, bisect_right, insort
+from collections import defaultdict
+from enum import Enum
+from itertools import accumulate, chain, islice
+from operator import itemgetter
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+
+from src.infra.versioned import VersionedList
+
+
+class _Top:
+    """Sorts after every record key, to bisect past all pairs with the same value."""
+
+    def __lt__(self, other: Any) -> bool:
+        return False
+
+    def __gt__(self, other: Any) -> bool:
+        return True
+
+
+_TOP = _Top()
+_MISSING = object()
+# batches at least this large are appended unsorted and merged in with one sort on the next read
+_BULK = 64
+# sorted index block size: an insert or delete moves at most ~2 * _LOAD pairs
+_LOAD = 1000
+# bulk-appended pairs under 1/_RESORT_SHARE of the index are merged one by one, more with one sort
+_RESORT_SHARE = 16
+# a bucket's order index is built on its first ordered walk and kept current after, so that query is
+# charged only this share of the build
+_ORDER_BUILD_SHARE = 64
+# record keys per batch when walking several buckets merged in order
+_WALK_CHUNK = 256
+
+
+def _key(value: Any) -> Any:
+    return value.value if isinstance(value, Enum) else value  # str enums index under their value
+
+
+class _SortedIndex:
+    """(value, record key) pairs kept sorted in blocks of about `_LOAD`.
+
+    `add` and `discard` bisect the block maxima and then one block, so keeping
+    the index current costs O(log n + _LOAD) per record instead of shifting the
+    whole list. Positions (for counting a range) go through per-block offsets,
+    recomputed lazily after a change.
+    """
+
+    def __init__(self) -> None:
+        self._blocks: List[List[Tuple[Any, int]]] = []
+        self._maxes: List[Tuple[Any, int]] = []
+        self._offsets: Optional[List[int]] = None
+        self._pending: List[Tuple[Any, int]] = []
+        self._len = 0
+
+    def __len__(self) -> int:
+        return self._len
+
+    def extend(self, pairs: List[Tuple[Any, int]]) -> None:
+        """Bulk load: buffered, merged in with one sort on the next read."""
+        self._pending.extend(pairs)
+        self._len += len(pairs)
+
+    def add(self, pair: Tuple[Any, int]) -> None:
+        self._len += 1
+        if self._pending:
+            self._pending.append(pair)
+        else:
+            self._insert(pair)
+
+    def _insert(self, pair: Tuple[Any, int]) -> None:
+        self._offsets = None
+        blocks, maxes = self._blocks, self._maxes
+        if not blocks:
+            blocks.append([pair])
+            maxes.append(pair)
+            return
+        k = bisect_left(maxes, pair)
+        if k == len(blocks):
+            k -= 1
+            blocks[k].append(pair)
+            maxes[k] = pair
+        else:
+            insort(blocks[k], pair)
+        block = blocks[k]
+        if len(block) > 2 * _LOAD:
+            blocks[k:k + 1] = [block[:_LOAD], block[_LOAD:]]
+            maxes[k:k + 1] = [block[_LOAD - 1], block[-1]]
+
+    def discard(self, pair: Tuple[Any, int]) -> None:
+        self._settle()
+        k = bisect_left(self._maxes, pair)
+        if k == len(self._blocks):
+            return
+        block = self._blocks[k]
+        i = bisect_left(block, pair)
+        if i == len(block) or block[i][1] != pair[1]:
+            return
+        del block[i]
+        self._len -= 1
+        self._offsets = None
+        if not block:
+            del self._blocks[k], self._maxes[k]
+        elif i == len(block):
+            self._maxes[k] = block[-1]
+
+    def _settle(self) -> None:
+        """Merge bulk-appended pairs: one by one into a much larger index, else with one sort and re-split."""
+        if not self._pending:
+            return
+        if len(self._pending) * _RESORT_SHARE < self._len:
+            pending, self._pending = self._pending, []
+            for pair in pending:
+                self._insert(pair)
+            return
+        pairs = [p for block in self._blocks for p in block]
+        pairs.extend(self._pending)
+        pairs.sort()
+        self._blocks = [pairs[i:i + _LOAD] for i in range(0, len(pairs), _LOAD)]
+        self._maxes = [block[-1] for block in self._blocks]
+        self._pending = []
+        self._offsets = None
+
+    def _starts(self) -> List[int]:
+        if self._offsets is None:
+            self._offsets = list(accumulate((len(b) for b in self._blocks), initial=0))
+        return self._offsets
+
+    def bisect(self, key: Any, right: bool = False) -> int:
+        """Position of `key` among all pairs, like `bisect_left` / `bisect_right` on the flat list."""
+        self._settle()
+        k = (bisect_right if right else bisect_left)(self._maxes, key)
+        if k == len(self._blocks):
+            return self._len
+        return self._starts()[k] + (bisect_right if right else bisect_left)(self._blocks[k], key)
+
+    def between(self, lo: Any, hi: Any) -> Tuple[int, int]:
+        """Positions [i, j) of the pairs with lo <= value <= hi, either side None for open."""
+        return (0 if lo is None else self.bisect((lo,)),
+                self._len if hi is None else self.bisect((hi, _TOP), right=True))
+
+    def chunks(self, i: int, j: int, reverse: bool = False, pairs: bool = False) -> Iterator[List[Any]]:
+        """Record keys (or whole pairs) at positions [i, j), one list per block, in order or reversed."""
+        self._settle()
+        if i >= j:
+            return
+        starts = self._starts()
+        ks = range(bisect_right(starts, i) - 1, bisect_right(starts, j - 1))
+        for k in (reversed(ks) if reverse else ks):
+            block = self._blocks[k][max(i - starts[k], 0):j - starts[k]]
+            if reverse:
+                block.reverse()
+            yield block if pairs else list(map(itemgetter(1), block))
+
+    def span(self, i: int, j: int) -> List[int]:
+        """Record keys at positions [i, j) as a list, sliced block by block."""
+        self._settle()
+        if i >= j:
+            return []
+        starts = self._starts()
+        pairs: List[Tuple[Any, int]] = []
+        for k in range(bisect_right(starts, i) - 1, bisect_right(starts, j - 1)):
+            pairs.extend(self._blocks[k][max(i - starts[k], 0):j - starts[k]])
+        return list(map(itemgetter(1), pairs))
+
+
+class IndexedList(VersionedList):
+    def __init__(self, items: Iterable[Dict] = (), hash_fields: Sequence[str] = (), sorted_fields: Sequence[str] = ()) -> None:
+        super().__init__()
+        self.hash_fields = tuple(hash_fields)
+        self.sorted_fields = tuple(sorted_fields)
+        self._records: Dict[int, Dict] = {}
+        self._refs: Dict[int, int] = {}  # the same object may sit in the list twice
+        # indexed values as of the last (re)index: hash fields, then sorted fields
+        self._snap: Dict[int, Tuple[Any, ...]] = {}
+        self._hash: Dict[str, Dict[Any, Set[int]]] = {f: {} for f in self.hash_fields}
+        self._sorted: Dict[str, _SortedIndex] = {f: _SortedIndex() for f in self.sorted_fields}
+        # order field -> hash field -> value -> that bucket's pairs in order, built on first use (see `_bucket_order`)
+        self._ordered: Dict[str, Dict[str, Dict[Any, _SortedIndex]]] = {
+            o: {f: {} for f in self.hash_fields} for o in self.sorted_fields}
+        self.extend(items)
+
+    # ---- index maintenance ----
+
+    def _add(self, rec: Dict) -> None:
+        rid = id(rec)
+        self._refs[rid] = self._refs.get(rid, 0) + 1
+        if self._refs[rid] > 1:
+            return
+        self._records[rid] = rec
+        snap = []
+        for f in self.hash_fields:
+            v = _key(rec.get(f))
+            snap.append(v)
+            bucket = self._hash[f].get(v)
+            if bucket is None:
+                self._hash[f][v] = {rid}
+            else:
+                bucket.add(rid)
+        for f in self.sorted_fields:
+            v = rec.get(f, _MISSING)
+            snap.append(v)
+            if v is not None and v is not _MISSING:
+                self._sorted[f].add((v, rid))
+        self._snap[rid] = tuple(snap)
+        self._reorder(rid, self._snap[rid], add=True)
+
+    def _add_many(self, items: List[Dict]) -> None:
+        if len(items) < _BULK:
+            for rec in items:
+                self._add(rec)
+        else:
+            self._load(items)
+
+    def _load(self, items: List[Dict]) -> None:
+        """Index a large batch column by column: one pass per field over the new records."""
+        refs, fresh = self._refs, []
+        for rec in items:
+            n = refs.get(id(rec), 0)
+            refs[id(rec)] = n + 1
+            if not n:
+                fresh.append(rec)
+        rids = [id(rec) for rec in fresh]
+        self._records.update(zip(rids, fresh))
+        columns = []
+        for f in self.hash_fields:
+            raw = [rec.get(f) for rec in fresh]
+            keys = {v: _key(v) for v in set(raw)}  # enum -> value once per distinct value
+            index = self._hash[f]
+            if len(keys) * 2 > len(raw):  # mostly distinct values, e.g. ids
+                for rid, v in zip(rids, map(keys.__getitem__, raw)):
+                    bucket = index.get(v)
+                    if bucket is None:
+                        index[v] = {rid}
+                    else:
+                        bucket.add(rid)
+            else:
+                groups: Dict[Any, List[int]] = defaultdict(list)
+                for rid, v in zip(rids, raw):
+                    groups[v].append(rid)
+                for v, members in groups.items():
+                    bucket = index.get(keys[v])
+                    if bucket is None:
+                        index[keys[v]] = set(members)
+                    else:
+                        bucket.update(members)
+            columns.append(list(map(keys.__getitem__, raw)))
+        for f in self.sorted_fields:
+            values = [rec.get(f, _MISSING) for rec in fresh]
+            self._sorted[f].extend([(v, rid) for v, rid in zip(values, rids) if v is not None and v is not _MISSING])
+            columns.append(values)
+        self._snap.update(zip(rids, zip(*columns)) if columns else ((rid, ()) for rid in rids))
+        # per-bucket order indexes built so far take the new records too
+        for o, order in zip(self.sorted_fields, columns[len(self.hash_fields):]):
+            for f, values in zip(self.hash_fields, columns):
+                cached = self._ordered[o][f]
+                if not cached:
+                    continue
+                for rid, v, ov in zip(rids, values, order):
+                    index = cached.get(v)
+                    if index is not None and ov is not None and ov is not _MISSING:
+                        index.add((ov, rid))
+
+    def _drop(self, rec: Dict) -> None:
+        rid = id(rec)
+        n = self._refs.get(rid, 0)
+        if n > 1:
+            self._refs[rid] = n - 1
+            return
+        if not n:
+            return
+        del self._refs[rid], self._records[rid]
+        snap = self._snap.pop(rid)
+        self._reorder(rid, snap, add=False)
+        for f, v in zip(self.hash_fields, snap):
+            bucket = self._hash[f].get(v)
+            if bucket is not None:
+                bucket.discard(rid)
+                if not bucket:
+                    self._forget(f, v)
+        for f, v in zip(self.sorted_fields, snap[len(self.hash_fields):]):
+            if v is not None and v is not _MISSING:
+                self._sorted[f].discard((v, rid))
+
+    def touch(self, *records: Dict) -> None:
+        """Re-index records whose indexed fields were changed in place (only changed fields are touched)."""
+        self.bump()
+        for rec in records:
+            rid = id(rec)
+            if rid not in self._snap:
+                continue
+            before = self._snap[rid]
+            snap = list(before)
+            for n, f in enumerate(self.hash_fields):
+                v, old = _key(rec.get(f)), snap[n]
+                if v == old:
+                    continue
+                bucket = self._hash[f].get(old)
+                if bucket is not None:
+                    bucket.discard(rid)
+                    if not bucket:
+                        self._forget(f, old)
+                self._hash[f].setdefault(v, set()).add(rid)
+                snap[n] = v
+            for n, f in enumerate(self.sorted_fields, len(self.hash_fields)):
+                v, old = rec.get(f, _MISSING), snap[n]
+                if v is old or (v is not _MISSING and old is not _MISSING and v == old):
+                    continue
+                if old is not None and old is not _MISSING:
+                    self._sorted[f].discard((old, rid))
+                if v is not None and v is not _MISSING:
+                    self._sorted[f].add((v, rid))
+                snap[n] = v
+            after = self._snap[rid] = tuple(snap)
+            if after != before:
+                self._reorder(rid, before, add=False)
+                self._reorder(rid, after, add=True)
+
+    def _reorder(self, rid: int, snap: Tuple[Any, ...], add: bool) -> None:
+        """Add or remove the record in the per-bucket order indexes built so far."""
+        for o, ov in zip(self.sorted_fields, snap[len(self.hash_fields):]):
+            if ov is None or ov is _MISSING:
+                continue
+            for f, v in zip(self.hash_fields, snap):
+                index = self._ordered[o][f].get(v)
+                if index is not None:
+                    if add:
+                        index.add((ov, rid))
+                    else:
+                        index.discard((ov, rid))
+
+    def _forget(self, f: str, v: Any) -> None:
+        """Drop the emptied bucket `v` of hash field `f`, with its order indexes."""
+        del self._hash[f][v]
+        for o in self.sorted_fields:
+            self._ordered[o][f].pop(v, None)
+
+    def _bucket_order(self, o: str, f: str, v: Any) -> _SortedIndex:
+        """The records of bucket `f == v` in order of sorted field `o`; built once, then kept current."""
+        index = self._ordered[o][f].get(v)
+        if index is None:
+            pos, snap = len(self.hash_fields) + self.sorted_fields.index(o), self._snap
+            index = self._ordered[o][f][v] = _SortedIndex()
+            index.extend([(ov, rid) for rid in self._hash[f][v] for ov in (snap[rid][pos],)
+                          if ov is not None and ov is not _MISSING])
+        return index
+
+    # ---- list API ----
+
+    def append(self, rec: Dict) -> None:
+        super().append(rec)
+        self._add(rec)
+
+    def insert(self, index: int, rec: Dict) -> None:
+        super().insert(index, rec)
+        self._add(rec)
+
+    def extend(self, items: Iterable[Dict]) -> None:
+        items = list(items)
+        super().extend(items)
+        self._add_many(items)
+
+    def __iadd__(self, items: Iterable[Dict]) -> "IndexedList":
+        self.extend(items)
+        return self
+
+    def __setitem__(self, index, value) -> None:
+        old = self[index] if isinstance(index, slice) else [self[index]]
+        new = list(value) if isinstance(index, slice) else [value]
+        super().__setitem__(index, new if isinstance(index, slice) else value)
+        for rec in old:
+            self._drop(rec)
+        self._add_many(new)
+
+    def __delitem__(self, index) -> None:
+        old = self[index] if isinstance(index, slice) else [self[index]]
+        super().__delitem__(index)
+        for rec in old:
+            self._drop(rec)
+
+    def pop(self, index: int = -1) -> Dict:
+        rec = super().pop(index)
+        self._drop(rec)
+        return rec
+
+    def remove(self, rec: Dict) -> None:
+        super().remove(rec)
+        self._drop(rec)
+
+    def clear(self) -> None:
+        super().clear()
+        self._records.clear()
+        self._refs.clear()
+        self._snap.clear()
+        self._hash = {f: {} for f in self.hash_fields}
+        self._sorted = {f: _SortedIndex() for f in self.sorted_fields}
+        self._ordered = {o: {f: {} for f in self.hash_fields} for o in self.sorted_fields}
+
+    # ---- lookups ----
+
+    def find(self, field: str, value: Any) -> Optional[Dict]:
+        """First record with `field == value` via the hash index (e.g. lookup by id)."""
+        for rid in self._hash[field].get(_key(value), ()):
+            rec = self._records[rid]
+            if _key(rec.get(field)) == _key(value):
+                return rec
+        return None
+
+    def _hash_range(self, f: str, lo: Any, hi: Any) -> List[Any]:
+        """Hash keys of `f` within [lo, hi] (for small domains such as risk 1-5)."""
+        return [v for v in self._hash[f] if v is not None and (lo is None or v >= lo) and (hi is None or v <= hi)]
+
+    def _range(self, f: str, lo: Any, hi: Any) -> Tuple[_SortedIndex, int, int]:
+        index = self._sorted[f]
+        return (index, *index.between(lo, hi))
+
+    def _bucket_chunks(self, o: str, f: str, values: List[Any], lo: Any, hi: Any, reverse: bool) -> Iterator[List[int]]:
+        """Record keys of the buckets `f in values` within lo <= o <= hi, in order of `o`, in lists."""
+        spans = [(index, *index.between(lo, hi)) for index in (self._bucket_order(o, f, v) for v in values)]
+        if len(spans) == 1:
+            yield from spans[0][0].chunks(spans[0][1], spans[0][2], reverse=reverse)
+            return
+        merged = heapq.merge(*(chain.from_iterable(index.chunks(i, j, reverse=reverse, pairs=True)) for index, i, j in spans),
+                             reverse=reverse)
+        rids = map(itemgetter(1), merged)
+        while True:
+            chunk = list(islice(rids, _WALK_CHUNK))
+            if not chunk:
+                return
+            yield chunk
+
+    def _walk(self, chunks: Iterator[List[int]], checks: List[Tuple], matches: Callable[[Dict], bool], limit: int,
+              total: int) -> List[Dict]:
+        """First `limit` matching records from ordered chunks of record keys.
+
+        Each chunk is narrowed by id-set membership (C-level filters) before any record is touched; the
+        cheapest filter per rejected id goes first: one over k buckets costs k lookups and drops 1 - n / total.
+        """
+        checks = sorted(checks, key=lambda p: len(p[3]) / max(1e-9, 1 - p[0] / total))
+        out: List[Dict] = []
+        for chunk in chunks:
+            for *_f, buckets in checks:
+                if len(buckets) == 1:
+                    chunk = list(filter(buckets[0].__contains__, chunk))
+                else:
+                    hit = set().union(*(b.intersection(chunk) for b in buckets))
+                    chunk = list(filter(hit.__contains__, chunk))
+                if not chunk:
+                    break
+            for rec in map(self._records.__getitem__, chunk):
+                if matches(rec):
+                    out.append(rec)
+                    if len(out) >= limit:
+                        return out
+        return out
+
+    def query(self, where: Optional[Dict[str, Any]] = None, ranges: Optional[Dict[str, Tuple[Any, Any]]] = None,
+              order_by: Optional[str] = None, descending: bool = True, limit: Optional[int] = None) -> List[Dict]:
+        """Records matching every filter.
+
+        `where`: field -> value, or a set/list/tuple of accepted values (hash fields).
+        `ranges`: field -> (lo, hi), inclusive, either side None for open (sorted fields,
+        or hash fields with a small set of distinct values).
+        `order_by` must be a sorted field; records without it sort last.
+        """
+        eq = {f: {_key(x) for x in v} if isinstance(v, (set, frozenset, list, tuple)) else {_key(v)}
+              for f, v in (where or {}).items() if v is not None}
+        rng = {f: b for f, b in (ranges or {}).items() if b is not None and b != (None, None)}
+        for f in eq:
+            if f not in self._hash:
+                raise ValueError(f"{f} has no hash index")
+        for f in rng:
+            if f not in self._sorted and f not in self._hash:
+                raise ValueError(f"{f} has no index")
+        # a range over a hash field is an IN over the keys it covers
+        for f in [f for f in rng if f not in self._sorted]:
+            accepted = set(self._hash_range(f, *rng.pop(f)))
+            eq[f] = eq[f] & accepted if f in eq else accepted
+        if order_by is not None and order_by not in self._sorted:
+            raise ValueError(f"{order_by} has no sorted index")
+
+        def matches(rec: Dict) -> bool:
+            for f, accepted in eq.items():
+                if _key(rec.get(f)) not in accepted:
+                    return False
+            for f, (lo, hi) in rng.items():
+                v = rec.get(f)
+                if v is None or (lo is not None and v < lo) or (hi is not None and v > hi):
+                    return False
+            return True
+
+        # per equality filter, its field, accepted values and their buckets; smallest filter first
+        parts = []
+        for f, accepted in eq.items():
+            found = [(v, b) for v, b in zip(accepted, map(self._hash[f].get, accepted)) if b]
+            if not found:
+                return []
+            parts.append((sum(len(b) for _v, b in found), f, [v for v, _b in found], [b for _v, b in found]))
+        parts.sort(key=itemgetter(0))
+        spans = {f: self._range(f, lo, hi) for f, (lo, hi) in rng.items()}
+
+        # selectivity of each filter; their product (assuming independence) estimates the match rate
+        total = max(1, len(self._records))
+        rate = 1.0
+        for part in parts:
+            rate *= part[0] / total
+        for _index, i, j in spans.values():
+            rate *= (j - i) / total
+        drive = min([p[0] for p in parts[:1]] + [j - i for _index, i, j in spans.values()], default=None)
+
+        # with a limit, walking an order index visits about limit / rate records (within its own range): the
+        # whole order index, or the smallest filter's buckets in order, which only the other filters thin out
+        if limit is not None and order_by is not None and (rate > 0 or drive is None):
+            index, i, j = spans.get(order_by) or self._range(order_by, None, None)
+            cost, checks, source = min(j - i, limit * (j - i) / total / rate) if rate > 0 else j - i, parts, None
+            if parts:
+                n, f, vals, _buckets = parts[0]
+                built = all(v in self._ordered[order_by][f] for v in vals)
+                bcost = min(n, limit * n / total / rate) + (0 if built else n / _ORDER_BUILD_SHARE)
+                if bcost < cost:
+                    cost, checks, source = bcost, parts[1:], parts[0]
+            if drive is None or cost < drive:
+                if source is None:
+                    chunks = index.chunks(i, j, reverse=descending)
+                else:
+                    chunks = self._bucket_chunks(order_by, source[1], source[2], *rng.get(order_by, (None, None)),
+                                                 reverse=descending)
+                out = self._walk(chunks, checks, matches, limit, total)
+                if len(out) >= limit or len(index) == len(self._records) or order_by in rng:
+                    return out
+                # records without the order field come last
+                seen = {id(r) for r in out}
+                out.extend(r for rid, r in self._records.items() if rid not in seen and r.get(order_by) is None and matches(r))
+                return out[:limit]
+
+        if drive is None:
+            rids: Iterable[int] = self._records.keys()
+            rest = []
+        elif parts and parts[0][0] == drive:
+            first, rest = parts[0][3], parts[1:]
+            rids = first[0] if len(first) == 1 else set().union(*first)  # a lone bucket is used as is, not copied
+        else:
+            index, i, j = min(spans.values(), key=lambda s: s[2] - s[1])
+            rids, rest = index.span(i, j), parts
+        # intersect smallest first, as C-level set operations
+        for *_f, buckets in rest:
+            if len(buckets) == 1:
+                rids = buckets[0].intersection(rids)
+            else:
+                rids = rids if isinstance(rids, (set, frozenset)) else set(rids)
+                rids = set().union(*(b.intersection(rids) for b in buckets))
+            if not rids:
+                return []
+        recs = list(map(self._records.__getitem__, rids))
+        if order_by is None:
+            return list(islice(filter(matches, recs), limit))
+        # order first, so the live re-check stops once `limit` records passed it
+        present = [r for r in recs if r.get(order_by) is not None]
+        present.sort(key=itemgetter(order_by), reverse=descending)
+        out = list(islice(filter(matches, present), limit))
+        if limit is None or len(out) < limit:
+            out.extend(r for r in recs if r.get(order_by) is None and matches(r))
+        return out if limit is None else out[:limit]
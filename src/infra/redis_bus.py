@@ -3,16 +3,21 @@ from __future__ import annotations
 import asyncio
 import json
 import os
+from bisect import bisect_right
 from typing import Any, Dict, List, Tuple
 
 
 class EventBus:
-    def __init__(self, url: str | None = None) -> None:
+    def __init__(self, url: str | None = None, maxlen: int | None = None) -> None:
         self._url = url or os.getenv("REDIS_URL")
         self._redis = None
+        # entries kept per stream (approximate on Redis); 0 keeps everything
+        self._maxlen = int(os.getenv("BUS_STREAM_MAXLEN", "100000")) if maxlen is None else maxlen
         # in-memory fallback: stream -> list[(id, data)]
         self._mem: Dict[str, List[Tuple[str, Dict[str, Any]]]] = {}
         self._seq = 0
+        # in-memory consumers blocked in `read`: stream -> list[future]
+        self._waiters: Dict[str, List[asyncio.Future]] = {}
 
     async def _ensure(self) -> None:
         if self._redis is not None or not self._url:
@@ -32,13 +37,106 @@ class EventBus:
         if self._redis is not None:
             # Store as JSON payload
             payload = {"json": json.dumps(data, separators=(",", ":"))}
-            return await self._redis.xadd(stream, payload)
+            return await self._redis.xadd(stream, payload, **self._trim_args())
         # memory fallback
         self._seq += 1
         sid = f"mem-{self._seq}"
-        self._mem.setdefault(stream, []).append((sid, data))
+        entries = self._mem.setdefault(stream, [])
+        entries.append((sid, data))
+        self._trim(entries)
+        self._wake(stream)
         return sid
 
+    async def publish_many(self, stream: str, items: List[Dict[str, Any]]) -> List[str]:
+        """Publish several entries in one round trip (a pipeline on Redis)."""
+        if not items:
+            return []
+        await self._ensure()
+        if self._redis is not None:
+            pipe = self._redis.pipeline(transaction=False)
+            for data in items:
+                pipe.xadd(stream, {"json": json.dumps(data, separators=(",", ":"))}, **self._trim_args())
+            return list(await pipe.execute())
+        entries = self._mem.setdefault(stream, [])
+        ids = []
+        for data in items:
+            self._seq += 1
+            ids.append(f"mem-{self._seq}")
+            entries.append((ids[-1], data))
+        self._trim(entries)
+        self._wake(stream)
+        return ids
+
+    def _trim_args(self) -> Dict[str, Any]:
+        return {"maxlen": self._maxlen, "approximate": True} if self._maxlen > 0 else {}
+
+    def _trim(self, entries: List[Tuple[str, Dict[str, Any]]]) -> None:
+        """Drop the oldest in-memory entries once a stream is 10% over `maxlen`, like Redis' `~` trimming."""
+        if self._maxlen > 0 and len(entries) > self._maxlen + self._maxlen // 10:
+            del entries[: len(entries) - self._maxlen]
+
+    def _wake(self, stream: str) -> None:
+        for fut in self._waiters.pop(stream, []):
+            if not fut.done():
+                fut.get_loop().call_soon_threadsafe(_resolve, fut)
+
+    @staticmethod
+    def _mem_seq(sid: str) -> int:
+        try:
+            return int(sid.rsplit("-", 1)[-1])
+        except ValueError:
+            return 0
+
+    async def last_id(self, stream: str) -> str:
+        """Id of the newest entry in `stream` (a cursor for `read` that skips the backlog)."""
+        await self._ensure()
+        if self._redis is not None:
+            entries = await self._redis.xrevrange(stream, count=1)
+            return entries[0][0] if entries else "0-0"
+        entries = self._mem.get(stream)
+        return entries[-1][0] if entries else "mem-0"
+
+    async def read(self, stream: str, last_id: str, count: int = 100, block_ms: int = 1000) -> List[Tuple[str, Dict[str, Any]]]:
+        """Read entries newer than `last_id`, waiting up to `block_ms` for new ones.
+
+        Returns `(id, data)` tuples in publish order; pass the last id back in as the next cursor.
+        """
+        await self._ensure()
+        if self._redis is not None:
+            resp = await self._redis.xread({stream: last_id}, count=count, block=block_ms)
+            out: List[Tuple[str, Dict[str, Any]]] = []
+            for _stream, entries in resp or []:
+                for _id, fields in entries:
+                    try:
+                        if isinstance(fields, dict) and "json" in fields:
+                            out.append((_id, json.loads(fields["json"])))
+                        else:
+                            out.append((_id, fields))
+                    except Exception:
+                        continue
+            return out
+        # memory fallback
+        after = self._mem_seq(last_id)
+        pending = self._mem_tail(stream, after, count)
+        if pending or block_ms <= 0:
+            return pending
+        fut = asyncio.get_running_loop().create_future()
+        self._waiters.setdefault(stream, []).append(fut)
+        try:
+            await asyncio.wait_for(fut, timeout=block_ms / 1000)
+        except asyncio.TimeoutError:
+            return []
+        finally:
+            waiters = self._waiters.get(stream)
+            if waiters and fut in waiters:
+                waiters.remove(fut)
+        return self._mem_tail(stream, after, count)
+
+    def _mem_tail(self, stream: str, after: int, count: int) -> List[Tuple[str, Dict[str, Any]]]:
+        entries = self._mem.get(stream, [])
+        start = bisect_right(entries, after, key=lambda e: self._mem_seq(e[0]))
+        return entries[start:start + count]
+
     async def read_recent(self, stream: str, count: int = 20) -> List[Dict[str, Any]]:
         await self._ensure()
         if self._redis is not None:
@@ -57,3 +155,8 @@ class EventBus:
         # memory fallback
         return [e[1] for e in reversed(self._mem.get(stream, []))][:count]
 
+
+
+def _resolve(fut: asyncio.Future) -> None:
+    if not fut.done():
+        fut.set_result(None)
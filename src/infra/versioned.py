@@ -0,0 +1,63 @@
+"""List store with a version counter.
+
+`VersionedList` is a plain list whose `version` is bumped by every mutating
+list method, so readers can tell whether anything changed since they last
+looked (see `src.infra.etag`) without comparing contents. Code that changes a
+stored record in place calls `bump()` (`IndexedList.touch` does it).
+"""
+from __future__ import annotations
+
+from typing import Any, Iterable
+
+
+class VersionedList(list):
+    version: int = 0
+
+    def bump(self) -> int:
+        self.version += 1
+        return self.version
+
+    def append(self, item: Any) -> None:
+        super().append(item)
+        self.bump()
+
+    def insert(self, index: int, item: Any) -> None:
+        super().insert(index, item)
+        self.bump()
+
+    def extend(self, items: Iterable[Any]) -> None:
+        super().extend(items)
+        self.bump()
+
+    def __iadd__(self, items: Iterable[Any]) -> "VersionedList":
+        self.extend(items)
+        return self
+
+    def __setitem__(self, index, value) -> None:
+        super().__setitem__(index, value)
+        self.bump()
+
+    def __delitem__(self, index) -> None:
+        super().__delitem__(index)
+        self.bump()
+
+    def pop(self, index: int = -1) -> Any:
+        item = super().pop(index)
+        self.bump()
+        return item
+
+    def remove(self, item: Any) -> None:
+        super().remove(item)
+        self.bump()
+
+    def clear(self) -> None:
+        super().clear()
+        self.bump()
+
+    def sort(self, *args, **kwargs) -> None:
+        super().sort(*args, **kwargs)
+        self.bump()
+
+    def reverse(self) -> None:
+        super().reverse()
+        self.bump()
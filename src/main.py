@@ -1,9 +1,29 @@
 import os
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from src.routers import wallet, ideas, strategies, trades, agents, releases
+from src.routers import wallet, ideas, strategies, trades, agents, releases, dashboard
+from src.agents.runtime import supervisor, workers_enabled
+from src.agents.pool import agent_pool
+from src.infra.http import http_client
+from src.execution.scheduler import scheduler
 
-app = FastAPI(title="Solana Trading Organisation API", version="0.1")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Agent workers run for the lifetime of the API process (disable with AGENT_WORKERS=0)
+    if workers_enabled():
+        await supervisor.start()
+    try:
+        yield
+    finally:
+        await supervisor.stop()
+        await scheduler.drain()
+        agent_pool.shutdown()
+        await http_client.aclose()
+
+
+app = FastAPI(title="Solana Trading Organisation API", version="0.1", lifespan=lifespan)
 
 # CORS for frontend
 origins_env = os.getenv("ALLOW_ORIGINS", "*")
@@ -23,6 +43,7 @@ app.include_router(strategies.router, prefix="/api/v1")
 app.include_router(trades.router, prefix="/api/v1")
 app.include_router(agents.router, prefix="/api/v1")
 app.include_router(releases.router, prefix="/api/v1")
+app.include_router(dashboard.router, prefix="/api/v1")
 
 @app.get("/")
 async def root():
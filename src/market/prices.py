@@ -0,0 +1,101 @@
+"""In-process cache of the latest price tick per asset.
+
+A pluggable feed pushes ticks into the cache; every change is published to
+`price_stream` on the bus. `mark(asset)` returns the cached mark price and
+refuses ticks older than `max_age`, so execution never fills at a stale
+price. In dev a `SimulatedFeed` random-walks a few seed prices.
+"""
+from __future__ import annotations
+
+import os
+import random
+import time
+from typing import Any, Dict, Optional, Protocol
+
+from src.bus import bus
+
+
+PRICE_MAX_AGE = float(os.getenv("PRICE_MAX_AGE_SECONDS", "30"))
+PRICE_STREAM = "price_stream"
+
+
+class StalePriceError(ValueError):
+    """No tick for the asset, or the latest one is older than the staleness bound."""
+
+
+class PriceCache:
+    def __init__(self, max_age: float = PRICE_MAX_AGE, min_change: float = 0.0) -> None:
+        self.max_age = max_age
+        self.min_change = min_change  # relative move below which a tick is not republished
+        self._ticks: Dict[str, Dict[str, Any]] = {}
+
+    def update(self, asset: str, price: float, ts: Optional[float] = None) -> bool:
+        """Record a tick; returns True if the price moved by more than `min_change`."""
+        if price <= 0:
+            raise ValueError("price must be positive")
+        asset = asset.upper()
+        ts = time.time() if ts is None else ts
+        prev = self._ticks.get(asset)
+        if prev is not None and ts < prev["ts"]:
+            return False  # out-of-order tick
+        changed = prev is None or abs(price - prev["price"]) > self.min_change * prev["price"]
+        self._ticks[asset] = {"asset": asset, "price": float(price), "ts": ts}
+        return changed
+
+    async def publish(self, asset: str, price: float, ts: Optional[float] = None) -> bool:
+        """`update` and publish the tick to `price_stream` when it changed the price."""
+        changed = self.update(asset, price, ts)
+        if changed:
+            await bus.publish(PRICE_STREAM, dict(self._ticks[asset.upper()]))
+        return changed
+
+    def get(self, asset: str) -> Optional[Dict[str, Any]]:
+        tick = self._ticks.get(asset.upper())
+        return dict(tick) if tick else None
+
+    def mark(self, asset: str, max_age: Optional[float] = None) -> float:
+        """Latest price for `asset`; raises StalePriceError if missing or older than `max_age`."""
+        tick = self._ticks.get(asset.upper())
+        if tick is None:
+            raise StalePriceError(f"No mark price for {asset.upper()}")
+        age = time.time() - tick["ts"]
+        if age > (self.max_age if max_age is None else max_age):
+            raise StalePriceError(f"Mark price for {asset.upper()} is stale ({age:.0f}s old)")
+        return tick["price"]
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        return {a: dict(t) for a, t in self._ticks.items()}
+
+    def clear(self) -> None:
+        self._ticks.clear()
+
+
+class PriceFeed(Protocol):
+    interval: float
+
+    async def tick(self, msg: Dict[str, Any]) -> None:
+        """Pull/receive the latest prices and push them into the cache."""
+
+
+class SimulatedFeed:
+    """Dev feed: geometric random walk around seed prices (quoted in SOL)."""
+
+    SEEDS = {"SOL": 1.0, "BONK": 0.0000002, "JUP": 0.006, "ORCA": 0.02, "RAY": 0.015, "PUMP": 0.00003}
+
+    def __init__(self, cache: PriceCache, interval: float = 1.0, vol: float = 0.002, seed: Optional[int] = None) -> None:
+        self.cache = cache
+        self.interval = interval
+        self.vol = vol
+        self._rng = random.Random(seed)
+        self._prices = dict(self.SEEDS)
+
+    async def tick(self, msg: Optional[Dict[str, Any]] = None) -> None:
+        now = time.time()
+        for asset, price in self._prices.items():
+            if asset != "SOL":  # prices are in SOL, so SOL itself stays at 1
+                price *= 1.0 + self._rng.gauss(0.0, self.vol)
+                self._prices[asset] = price
+            await self.cache.publish(asset, price, now)
+
+
+price_cache = PriceCache()
@@ -0,0 +1,158 @@
+"""Memory-mapped OHLCV store for market data.
+
+Each asset is a directory holding one fixed-width binary file per column
+(`ts.i8` with epoch seconds, `open.f8`, `high.f8`, `low.f8`, `close.f8`,
+`volume.f8`). Rows are only ever appended, and reads go through
+`numpy.memmap`, so slices are views into the page cache: any number of
+processes can share the same history without copying it into their heaps.
+
+A torn append (a crash between column writes) is tolerated: readers only see
+as many rows as every column has.
+"""
+from __future__ import annotations
+
+import os
+import re
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+MARKET_DATA_DIR = os.getenv("MARKET_DATA_DIR", "data/ohlcv")
+COLUMNS: Tuple[Tuple[str, str], ...] = (
+    ("ts", "<i8"), ("open", "<f8"), ("high", "<f8"), ("low", "<f8"), ("close", "<f8"), ("volume", "<f8"),
+)
+_ASSET_RE = re.compile(r"^[A-Za-z0-9_.-]+$")
+
+Bars = Dict[str, np.ndarray]
+
+
+class TimeSeriesStore:
+    def __init__(self, root: Optional[str] = None) -> None:
+        self.root = Path(root or MARKET_DATA_DIR)
+        # asset -> (rows, {column: memmap}); remapped when the files grow
+        self._maps: Dict[str, Tuple[int, Bars]] = {}
+
+    def _dir(self, asset: str) -> Path:
+        asset = asset.upper()
+        if not _ASSET_RE.match(asset):
+            raise ValueError(f"Invalid asset name: {asset!r}")
+        return self.root / asset
+
+    def assets(self) -> List[str]:
+        """Assets with at least one complete bar (an empty or torn first append does not count)."""
+        if not self.root.is_dir():
+            return []
+        return sorted(p.name for p in self.root.iterdir()
+                      if (p / "ts.i8").exists() and _ASSET_RE.match(p.name) and self.rows(p.name) > 0)
+
+    def rows(self, asset: str) -> int:
+        d = self._dir(asset)
+        sizes = []
+        for name, dtype in COLUMNS:
+            p = d / f"{name}.{dtype[1:]}"
+            sizes.append(p.stat().st_size // np.dtype(dtype).itemsize if p.exists() else 0)
+        return min(sizes)
+
+    def append(self, asset: str, ts: np.ndarray, open: np.ndarray, high: np.ndarray, low: np.ndarray,
+               close: np.ndarray, volume: Optional[np.ndarray] = None) -> int:
+        """Append bars; `ts` (epoch seconds) must be strictly increasing and after the last stored bar."""
+        ts = np.asarray(ts, dtype="<i8").ravel()
+        n = len(ts)
+        if n == 0:
+            return 0
+        cols = {
+            "ts": ts, "open": open, "high": high, "low": low, "close": close,
+            "volume": np.zeros(n) if volume is None else volume,
+        }
+        for name, dtype in COLUMNS:
+            cols[name] = np.asarray(cols[name], dtype=dtype).ravel()
+            if len(cols[name]) != n:
+                raise ValueError(f"column {name} has {len(cols[name])} rows, expected {n}")
+        if n > 1 and np.any(np.diff(ts) <= 0):
+            raise ValueError("timestamps must be strictly increasing")
+        last = self.last_ts(asset)
+        if last is not None and ts[0] <= last:
+            raise ValueError(f"timestamp {int(ts[0])} is not after the last stored bar {last}")
+
+        d = self._dir(asset)
+        d.mkdir(parents=True, exist_ok=True)
+        stored = self.rows(asset)
+        self._maps.pop(asset.upper(), None)
+        # ts goes last so a torn write never exposes a timestamp without its values
+        for name, dtype in COLUMNS[1:] + COLUMNS[:1]:
+            path = d / f"{name}.{dtype[1:]}"
+            with open_column(path) as f:
+                size = stored * np.dtype(dtype).itemsize
+                if f.seek(0, os.SEEK_END) != size:
+                    f.truncate(size)  # drop leftovers of a torn append
+                    f.seek(size)
+                f.write(cols[name].tobytes())
+        return n
+
+    def columns(self, asset: str) -> Bars:
+        """All rows of `asset` as read-only memmaps (empty arrays if nothing is stored)."""
+        key = asset.upper()
+        n = self.rows(asset)
+        cached = self._maps.get(key)
+        if cached is not None and cached[0] == n:
+            return cached[1]
+        d = self._dir(asset)
+        cols: Bars = {}
+        for name, dtype in COLUMNS:
+            if n == 0:
+                cols[name] = np.empty(0, dtype=dtype)
+            else:
+                cols[name] = np.memmap(d / f"{name}.{dtype[1:]}", dtype=dtype, mode="r", shape=(n,))
+        self._maps[key] = (n, cols)
+        return cols
+
+    def last_ts(self, asset: str) -> Optional[int]:
+        ts = self.columns(asset)["ts"]
+        return int(ts[-1]) if len(ts) else None
+
+    def range(self, asset: str, start: Optional[int] = None, end: Optional[int] = None) -> Bars:
+        """Bars with start <= ts < end, as zero-copy views into the memmaps."""
+        cols = self.columns(asset)
+        ts = cols["ts"]
+        i = 0 if start is None else int(np.searchsorted(ts, start, side="left"))
+        j = len(ts) if end is None else int(np.searchsorted(ts, end, side="left"))
+        return {name: arr[i:j] for name, arr in cols.items()}
+
+    def resample(self, asset: str, seconds: int, start: Optional[int] = None, end: Optional[int] = None) -> Bars:
+        """Aggregate bars into `seconds`-wide buckets (e.g. 300 for 1m -> 5m, 3600 for 1m -> 1h)."""
+        return resample(self.range(asset, start, end), seconds)
+
+    def log_returns(self, asset: str, seconds: Optional[int] = None, start: Optional[int] = None,
+                    end: Optional[int] = None) -> np.ndarray:
+        bars = self.range(asset, start, end) if not seconds else self.resample(asset, seconds, start, end)
+        close = np.asarray(bars["close"], dtype=np.float64)
+        return np.diff(np.log(close)) if len(close) > 1 else np.empty(0)
+
+
+def resample(bars: Bars, seconds: int) -> Bars:
+    if seconds <= 0:
+        raise ValueError("seconds must be positive")
+    ts = np.asarray(bars["ts"])
+    if len(ts) == 0:
+        return {k: np.empty(0, dtype=np.asarray(v).dtype) for k, v in bars.items()}
+    bucket = ts - ts % seconds
+    starts = np.concatenate(([0], np.flatnonzero(np.diff(bucket)) + 1))
+    ends = np.concatenate((starts[1:], [len(ts)])) - 1
+    return {
+        "ts": bucket[starts],
+        "open": np.asarray(bars["open"])[starts],
+        "high": np.maximum.reduceat(bars["high"], starts),
+        "low": np.minimum.reduceat(bars["low"], starts),
+        "close": np.asarray(bars["close"])[ends],
+        "volume": np.add.reduceat(bars["volume"], starts),
+    }
+
+
+def open_column(path: Path):
+    # "r+b" keeps existing bytes; create the file on first append
+    return open(path, "r+b" if path.exists() else "w+b")
+
+
+market_store = TimeSeriesStore()
@@ -43,6 +43,7 @@ class Strategy(BaseModel):
     take_profit: float
     max_dd: float
     status: StrategyStatus
+    template_id: Optional[str] = None
 
 # Trade Model
 class TradeAction(str, Enum):
@@ -87,3 +88,21 @@ class WalletBalance(BaseModel):
     address: str
     balance_sol: float
     timestamp: datetime
+
+
+class Position(BaseModel):
+    asset: str
+    quantity: float  # > 0 long, < 0 short
+    avg_price: Optional[float]
+    cost_basis: float
+    lots: int
+    mark_price: Optional[float]
+    realized_pnl: float
+    unrealized_pnl: Optional[float]  # None without a mark price
+
+
+class WalletPositions(BaseModel):
+    address: str
+    positions: List[Position]
+    realized_pnl: float
+    unrealized_pnl: float
@@ -1,25 +1,59 @@
+from itertools import islice
 from typing import List, Optional
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import JSONResponse, Response
 
-from src.store import agents_store, ideas_store
+from src.store import agents_store, qa_reports_store
+from src.models import QAReport
+from src.bus import bus
 from src.agents.research import generate_research_ideas
+from src.agents.runtime import supervisor, RESEARCH_REQUESTS
+from src.infra import admission
+from src.infra.etag import response_cache
+from src.serialization import QA_REPORTS, dumps
+from src.auth import rate_limited, require_api_key, usage
 
 
 router = APIRouter(prefix="/agents", tags=["agents"])
 
 
 @router.get("/status", summary="Agent status and versions")
-async def agents_status() -> List[dict]:
-    return agents_store
+async def agents_status(request: Request) -> List[dict]:
+    return response_cache.respond(request, "agents", agents_store.version, lambda: dumps(agents_store))
+
+
+@router.get("/workers", summary="Agent worker runtime status")
+async def agents_workers() -> List[dict]:
+    return supervisor.status()
+
+
+@router.get("/admission", summary="Admission control gates: limits, load and shed counts")
+async def admission_status() -> List[dict]:
+    return admission.status()
+
+
+@router.get("/quotas", summary="API key quota usage and rejections per route group")
+async def quota_usage(_=Depends(require_api_key)) -> List[dict]:
+    return usage()
+
+
+@router.get("/quality/reports", summary="Latest Quality agent reports", response_model=List[QAReport])
+async def quality_reports(limit: int = 50, approved: Optional[bool] = None) -> List[QAReport]:
+    data = iter(qa_reports_store)
+    if approved is not None:
+        data = (r for r in data if r.get("approved") == approved)
+    return Response(QA_REPORTS.dump(list(islice(data, max(1, min(limit, 200))))), media_type="application/json")
 
 
 @router.post("/research/generate", summary="Trigger research agent to generate ideas")
-async def trigger_research(time_value: int = 30, time_unit: Optional[str] = "minutes", risk_pref: int = 3, live: bool = False):
+async def trigger_research(time_value: int = 30, time_unit: Optional[str] = "minutes", risk_pref: int = 3, live: bool = False,
+                           _=Depends(rate_limited("agents")), _slot=Depends(admission.admit("research"))):
     try:
-        ideas = await generate_research_ideas(time_value=time_value, time_unit=time_unit, risk_pref=risk_pref, live=live)
-        # insert into ideas_store for visibility
-        for i in ideas:
-            ideas_store.insert(0, i)
+        if supervisor.running:
+            # hand the run to the research worker instead of doing it on the request
+            sid = await bus.publish(RESEARCH_REQUESTS, {"time_value": time_value, "time_unit": time_unit, "risk_pref": risk_pref, "live": live})
+            return JSONResponse(status_code=202, content={"count": 0, "ideas": [], "queued": True, "request_id": sid})
+        ideas = await generate_research_ideas(time_value=time_value, time_unit=time_unit, risk_pref=risk_pref, live=live, persist=True)
         return {"count": len(ideas), "ideas": ideas}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,33 @@
+from typing import Optional
+
+from fastapi import APIRouter, Header, HTTPException, Query, Request, Response
+
+from src.agents.runtime import supervisor
+from src.auth import require_api_key
+from src.dashboard import dashboard_snapshot
+from src.infra.etag import response_cache
+
+
+router = APIRouter(prefix="/dashboard", tags=["dashboard"])
+
+
+@router.get("/snapshot", summary="All dashboard panels in one response, with per-panel versions")
+async def snapshot(request: Request,
+                   since: Optional[int] = Query(default=None, ge=0, description="Snapshot version the client already holds; unchanged panels are omitted"),
+                   panels: Optional[str] = Query(default=None, description="Comma-separated subset of panels"),
+                   boot: Optional[str] = Query(default=None, description="`boot` of the snapshot `since` was taken from"),
+                   x_api_key: Optional[str] = Header(default=None)):
+    """Wallet addresses and balances need an API key: without one, request the other panels explicitly."""
+    if not supervisor.running or dashboard_snapshot.generated_at is None:
+        dashboard_snapshot.refresh()  # no background worker (yet): bring it up to date here
+    only = None
+    if panels:
+        only = [p.strip() for p in panels.split(",") if p.strip()]
+        unknown = set(only) - set(dashboard_snapshot.panels)
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown panels: {sorted(unknown)}")
+    if only is None or "wallets" in only:
+        await require_api_key(x_api_key)
+    if since is None and only is None:
+        return response_cache.respond(request, "dashboard", dashboard_snapshot.version, dashboard_snapshot.render)
+    return Response(dashboard_snapshot.render(since, only, boot), media_type="application/json")
@@ -1,16 +1,24 @@
-from datetime import datetime, timezone
+import logging
+import os
+import time
+from datetime import datetime, timedelta, timezone
 from typing import List, Optional
 from uuid import uuid4
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query, Request, Response
 from pydantic import BaseModel, Field
 
-from src.store import ideas_store
+from src.store import ideas_store, wallet_store
 from src.bus import bus
 from src.models import IdeaStatus, Idea
+from src.agents.allocation import allocate, ALLOC_METHOD
+from src.execution.scheduler import scheduler, MISFIRE_POLICIES
+from src.infra.etag import response_cache
+from src.serialization import IDEAS
 
 
 router = APIRouter(prefix="/ideas", tags=["ideas"])
+log = logging.getLogger(__name__)
 
 
 class IdeaCreate(BaseModel):
@@ -22,12 +30,31 @@ class IdeaCreate(BaseModel):
     ttl: Optional[int] = Field(default=5400, description="seconds")
 
 
-@router.get("", summary="List all ideas", response_model=List[Idea])
-async def list_ideas(status: Optional[IdeaStatus] = None, limit: int = 50) -> List[Idea]:
-    data = ideas_store
-    if status is not None:
-        data = [i for i in data if i.get("status") == status]
-    return data[: max(1, min(limit, 200))]
+@router.get("", summary="List / query ideas", response_model=List[Idea])
+async def list_ideas(request: Request, status: Optional[IdeaStatus] = None, asset: Optional[str] = None, source: Optional[str] = None,
+                     type: Optional[str] = None, risk_min: Optional[int] = None, risk_max: Optional[int] = None,
+                     budget_min: Optional[float] = None, budget_max: Optional[float] = None,
+                     created_after: Optional[datetime] = None, created_before: Optional[datetime] = None,
+                     since_minutes: Optional[float] = Query(default=None, gt=0, description="Shortcut for created_after = now - N minutes"),
+                     limit: int = 50) -> List[Idea]:
+    limit = max(1, min(limit, 200))
+    if since_minutes is not None:
+        created_after = datetime.now(timezone.utc) - timedelta(minutes=since_minutes)
+    created_after, created_before = (d.replace(tzinfo=timezone.utc) if d is not None and d.tzinfo is None else d
+                                     for d in (created_after, created_before))
+    where = {"status": status, "asset": asset, "source": source, "type": type}
+    ranges = {"risk": (risk_min, risk_max), "budget": (budget_min, budget_max), "created_at": (created_after, created_before)}
+
+    def select() -> List[dict]:
+        if not any(v is not None for v in where.values()) and all(r == (None, None) for r in ranges.values()):
+            return ideas_store[:limit]
+        return ideas_store.query(where=where, ranges=ranges, order_by="created_at", limit=limit)
+
+    if since_minutes is not None:
+        # relative to now: not a function of the store version alone
+        return Response(IDEAS.dump(select()), media_type="application/json")
+    return response_cache.respond(request, ("ideas", request.url.query), ideas_store.version,
+                                  lambda: IDEAS.dump(select()))
 
 
 @router.post("", summary="Create a new idea", response_model=Idea)
@@ -58,11 +85,50 @@ async def create_idea(payload: IdeaCreate) -> Idea:
     return idea
 
 
+def _wallet_capital(address: Optional[str]) -> Optional[float]:
+    w = wallet_store.get(address or "")
+    return w.get("balance_sol", 0.0) if w else None
+
+
+@router.post("/allocate", summary="Split capital across approved ideas and rewrite their budgets")
+async def allocate_ideas(capital: Optional[float] = None, address: Optional[str] = None, method: str = ALLOC_METHOD,
+                         max_weight: float = Query(default=1.0, gt=0, le=1)) -> dict:
+    if capital is None:
+        capital = _wallet_capital(address)
+        if capital is None:
+            raise HTTPException(status_code=400, detail="Provide capital or the address of an existing wallet")
+    approved = ideas_store.query(where={"status": IdeaStatus.APPROVED})
+    try:
+        rows = allocate(approved, capital, method=method, max_weight=max_weight)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    ideas_store.touch(*approved)
+    return {"method": method, "capital": capital, "allocated": sum(r["budget"] for r in rows), "ideas": rows}
+
+
+def _auto_allocate(changes: List[dict]) -> None:
+    """Re-split capital across APPROVED ideas when the set changed, if ALLOC_CAPITAL or ALLOC_WALLET is set.
+
+    Without a configured capital source there is nothing to split, so budgets are left as proposed.
+    """
+    if not any(IdeaStatus.APPROVED in (c["from"], c["to"]) for c in changes):
+        return
+    capital = _wallet_capital(os.getenv("ALLOC_WALLET")) if os.getenv("ALLOC_WALLET") else None
+    if capital is None and os.getenv("ALLOC_CAPITAL"):
+        capital = float(os.getenv("ALLOC_CAPITAL"))
+    if capital is None:
+        return
+    approved = ideas_store.query(where={"status": IdeaStatus.APPROVED})
+    try:
+        allocate(approved, capital)
+    except ValueError as e:
+        log.warning("automatic allocation skipped: %s", e)
+        return
+    ideas_store.touch(*approved)
+
+
 def _get_idea(idea_id: str) -> Optional[dict]:
-    for it in ideas_store:
-        if it.get("id") == idea_id:
-            return it
-    return None
+    return ideas_store.find("id", idea_id)
 
 
 _ALLOWED = {
@@ -70,25 +136,109 @@ _ALLOWED = {
     IdeaStatus.NEEDS_REVIEW: {IdeaStatus.READY_FOR_QA, IdeaStatus.CANCELLED},
     IdeaStatus.READY_FOR_QA: {IdeaStatus.APPROVED, IdeaStatus.CANCELLED},
     IdeaStatus.APPROVED: {IdeaStatus.SCHEDULED, IdeaStatus.CANCELLED},
-    IdeaStatus.SCHEDULED: set(),
+    IdeaStatus.SCHEDULED: {IdeaStatus.CANCELLED},  # cancelling also drops the pending schedule
     IdeaStatus.CANCELLED: set(),
 }
 
 
+IDEA_STATUS_STREAM = "idea_status_stream"
+MAX_TRANSITIONS = 1000
+
+
 def _transition(idea: dict, to_state: IdeaStatus) -> dict:
     cur = idea.get("status")
     if to_state not in _ALLOWED.get(cur, set()):
         raise HTTPException(status_code=400, detail=f"Illegal transition {cur} -> {to_state}")
     idea["status"] = to_state
+    ideas_store.touch(idea)
+    return idea
+
+
+async def _publish_changes(changes: List[dict]) -> str:
+    """One bus event for a whole batch of status changes."""
+    return await bus.publish(IDEA_STATUS_STREAM, {
+        "count": len(changes),
+        "changes": [{k: getattr(v, "value", v) for k, v in c.items()} for c in changes],
+        "at": datetime.now(timezone.utc).isoformat(),
+    })
+
+
+async def _move(idea: dict, to_state: IdeaStatus) -> dict:
+    cur = idea.get("status")
+    if cur == to_state == IdeaStatus.CANCELLED:
+        return idea  # cancelling again is a no-op, not an error (bulk treats it the same)
+    _transition(idea, to_state)
+    changes = [{"idea_id": idea["id"], "from": cur, "to": to_state}]
+    _auto_allocate(changes)
+    await _publish_changes(changes)
     return idea
 
 
+def _schedule(idea: dict, at: Optional[datetime] = None, delay_seconds: float = 0.0, misfire: Optional[str] = None) -> None:
+    fire_at = (at.timestamp() if at is not None else time.time()) + delay_seconds
+    idea["scheduled_for"] = datetime.fromtimestamp(fire_at, timezone.utc)
+    scheduler.schedule(idea, at=fire_at, misfire=misfire)
+
+
+class TransitionItem(BaseModel):
+    idea_id: str
+    to: IdeaStatus
+    # only used when `to` is SCHEDULED, as on POST /ideas/{id}/schedule
+    at: Optional[datetime] = None
+    delay_seconds: float = Field(default=0.0, ge=0)
+    misfire: Optional[str] = Field(default=None, description="fire | skip when dispatch runs late")
+
+
+class TransitionBatch(BaseModel):
+    transitions: List[TransitionItem] = Field(min_length=1, max_length=MAX_TRANSITIONS)
+    atomic: bool = Field(default=True, description="Reject the whole batch if any transition is invalid")
+
+
+@router.post("/transitions", summary="Apply many idea status transitions in one request")
+async def bulk_transitions(payload: TransitionBatch) -> dict:
+    # validate in order against the tentative states, so one idea may move several steps
+    state = {}
+    valid, errors = [], []
+    for item in payload.transitions:
+        idea = ideas_store.find("id", item.idea_id)
+        if idea is None:
+            errors.append({"idea_id": item.idea_id, "error": "Idea not found"})
+            continue
+        cur = state.get(item.idea_id, idea.get("status"))
+        if cur == item.to == IdeaStatus.CANCELLED:
+            continue  # already cancelled: nothing to apply
+        if item.to not in _ALLOWED.get(cur, set()):
+            errors.append({"idea_id": item.idea_id, "error": f"Illegal transition {cur} -> {item.to}"})
+            continue
+        if item.misfire is not None and item.misfire not in MISFIRE_POLICIES:
+            errors.append({"idea_id": item.idea_id, "error": f"misfire must be one of {MISFIRE_POLICIES}"})
+            continue
+        state[item.idea_id] = item.to
+        valid.append((idea, cur, item))
+    if errors and payload.atomic:
+        raise HTTPException(status_code=400, detail=errors)
+
+    changes = []
+    for idea, cur, item in valid:
+        to = item.to
+        idea["status"] = to
+        ideas_store.touch(idea)
+        if to == IdeaStatus.SCHEDULED:
+            _schedule(idea, item.at, item.delay_seconds, item.misfire)
+        elif to == IdeaStatus.CANCELLED:
+            scheduler.cancel_idea(idea["id"])
+        changes.append({"idea_id": idea["id"], "from": cur, "to": to})
+    _auto_allocate(changes)
+    event_id = await _publish_changes(changes) if changes else None
+    return {"applied": len(changes), "errors": errors, "event_id": event_id, "changes": changes}
+
+
 @router.post("/{idea_id}/review", summary="Mark idea as NEEDS_REVIEW", response_model=Idea)
 async def mark_review(idea_id: str) -> Idea:
     idea = _get_idea(idea_id)
     if not idea:
         raise HTTPException(status_code=404, detail="Idea not found")
-    return _transition(idea, IdeaStatus.NEEDS_REVIEW)
+    return await _move(idea, IdeaStatus.NEEDS_REVIEW)
 
 
 @router.post("/{idea_id}/qa-ready", summary="Mark idea as READY_FOR_QA", response_model=Idea)
@@ -96,7 +246,7 @@ async def mark_qa_ready(idea_id: str) -> Idea:
     idea = _get_idea(idea_id)
     if not idea:
         raise HTTPException(status_code=404, detail="Idea not found")
-    return _transition(idea, IdeaStatus.READY_FOR_QA)
+    return await _move(idea, IdeaStatus.READY_FOR_QA)
 
 
 @router.post("/{idea_id}/approve", summary="Approve idea", response_model=Idea)
@@ -104,15 +254,20 @@ async def approve(idea_id: str) -> Idea:
     idea = _get_idea(idea_id)
     if not idea:
         raise HTTPException(status_code=404, detail="Idea not found")
-    return _transition(idea, IdeaStatus.APPROVED)
+    return await _move(idea, IdeaStatus.APPROVED)
 
 
 @router.post("/{idea_id}/schedule", summary="Schedule idea", response_model=Idea)
-async def schedule(idea_id: str) -> Idea:
+async def schedule(idea_id: str, at: Optional[datetime] = None, delay_seconds: float = Query(default=0.0, ge=0),
+                   misfire: Optional[str] = Query(default=None, description="fire | skip when dispatch runs late")) -> Idea:
     idea = _get_idea(idea_id)
     if not idea:
         raise HTTPException(status_code=404, detail="Idea not found")
-    return _transition(idea, IdeaStatus.SCHEDULED)
+    if misfire is not None and misfire not in MISFIRE_POLICIES:
+        raise HTTPException(status_code=400, detail=f"misfire must be one of {MISFIRE_POLICIES}")
+    await _move(idea, IdeaStatus.SCHEDULED)
+    _schedule(idea, at, delay_seconds, misfire)
+    return idea
 
 
 @router.post("/{idea_id}/cancel", summary="Cancel idea", response_model=Idea)
@@ -120,5 +275,6 @@ async def cancel(idea_id: str) -> Idea:
     idea = _get_idea(idea_id)
     if not idea:
         raise HTTPException(status_code=404, detail="Idea not found")
-    idea["status"] = IdeaStatus.CANCELLED
+    await _move(idea, IdeaStatus.CANCELLED)  # same rule as bulk CANCELLED
+    scheduler.cancel_idea(idea_id)
     return idea
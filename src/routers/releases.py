@@ -1,8 +1,10 @@
 from typing import List
 from uuid import uuid4
-from fastapi import APIRouter
+from fastapi import APIRouter, Request
 from pydantic import BaseModel, Field
 
+from src.infra.etag import response_cache
+from src.serialization import dumps
 from src.store import releases_store
 
 
@@ -16,8 +18,9 @@ class ReleaseCreate(BaseModel):
 
 
 @router.get("", summary="List releases")
-async def list_releases() -> List[dict]:
-    return releases_store
+async def list_releases(request: Request) -> List[dict]:
+    return response_cache.respond(request, "releases", releases_store.version,
+                                  lambda: dumps(releases_store))
 
 
 @router.post("", summary="Create a release")
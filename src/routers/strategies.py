@@ -1,24 +1,36 @@
 from typing import List, Optional
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import JSONResponse
 
 from src.store import strategies_store
+from src.bus import bus
 from src.agents.analysis import generate_strategies_from_ideas
+from src.agents.runtime import supervisor, ANALYSIS_REQUESTS
+from src.infra import admission
+from src.infra.etag import response_cache
+from src.serialization import dumps
+from src.auth import rate_limited
 
 
 router = APIRouter(prefix="/strategies", tags=["strategies"])
 
 
 @router.get("", summary="List strategies")
-async def list_strategies() -> List[dict]:
-    return strategies_store
+async def list_strategies(request: Request) -> List[dict]:
+    return response_cache.respond(request, "strategies", strategies_store.version,
+                                  lambda: dumps(strategies_store))
 
 
 @router.post("/generate", summary="Trigger analysis agent to generate strategies from ideas")
-async def trigger_analysis(limit: int = 10, only_status: Optional[str] = None):
+async def trigger_analysis(limit: int = 10, only_status: Optional[str] = None, _=Depends(rate_limited("agents")),
+                           _slot=Depends(admission.admit("strategies"))):
     try:
         statuses = None
         if only_status:
             statuses = [s.strip().upper() for s in only_status.split(',') if s.strip()]
+        if supervisor.running:
+            sid = await bus.publish(ANALYSIS_REQUESTS, {"limit": limit, "only_status": statuses})
+            return JSONResponse(status_code=202, content={"count": 0, "strategies": [], "queued": True, "request_id": sid})
         created = await generate_strategies_from_ideas(limit=limit, only_status=statuses)
         return {"count": len(created), "strategies": created}
     except Exception as e:
@@ -4,11 +4,15 @@ from fastapi import APIRouter
 from src.store import trades_store
 from src.models import Trade
 from pydantic import BaseModel, Field
-from fastapi import HTTPException, Depends
+from fastapi import HTTPException, Depends, Header, Response
 
-from src.execution.adapter import ExecutionAdapter
+from src.execution.adapter import ExecutionAdapter, EXECUTION_MODE
+from src.execution.order_router import order_router
 from src.models import Trade as TradeModel
-from src.auth import require_api_key
+from src.auth import require_api_key, spend
+from src.infra import admission
+from src.infra.idempotency import IdempotencyAborted, IdempotencyCache, IdempotencyConflict
+from src.serialization import TRADES
 
 
 class ExecuteRequest(BaseModel):
@@ -16,11 +20,14 @@ class ExecuteRequest(BaseModel):
     address: str = Field(example="So1anaEXAMPLEaddre55...............1234")
     amount: float = Field(gt=0, example=0.5)
     asset: Optional[str] = Field(default="SOL")
-    price: Optional[float] = Field(default=None)
+    price: Optional[float] = Field(default=None, description="Limit/fill price; BUY/SELL default to the cached mark price")
+    strategy_id: Optional[str] = Field(default=None, description="Originating strategy; fills are allocated back to it when orders are netted")
     live: Optional[bool] = Field(default=False, description="If true and SOLANA_RPC_URL is configured, attempt real RPC calls (devnet/testnet). Mainnet only if ALLOW_MAINNET_TRANSACTIONS is set")
 
 
 router = APIRouter(prefix="/trades", tags=["trades"])
+# results of /execute per Idempotency-Key, so client retries never execute twice
+idempotency_cache = IdempotencyCache()
 
 
 @router.get("/recent", summary="Recent trades", response_model=List[Trade])
@@ -33,25 +40,55 @@ async def recent_trades(limit: int = 20, status: Optional[str] = None) -> List[T
         data = sorted(data, key=lambda x: x.get("executed_at"), reverse=True)
     except Exception:
         pass
-    return data[: max(1, min(limit, 200))]
+    # trusted store rows: rendered directly, without per-row re-validation
+    return Response(TRADES.dump(data[: max(1, min(limit, 200))]), media_type="application/json")
 
 
 @router.post("/execute", summary="Execute a trade or action", response_model=TradeModel)
-async def execute(payload: ExecuteRequest, _=Depends(require_api_key)):
+async def execute(payload: ExecuteRequest, response: Response, api_key=Depends(require_api_key),
+                  idempotency_key: Optional[str] = Header(default=None, alias="Idempotency-Key")):
+    if not idempotency_key:
+        return await _admitted(api_key, payload)
+    try:
+        # keys are per client: two clients may pick the same Idempotency-Key
+        scope = f"{api_key.name}:{idempotency_key}" if api_key else idempotency_key
+        # quota and admission are taken by the call that executes: replays and joined duplicates cost neither
+        trade, replayed = await idempotency_cache.run(scope, payload.model_dump_json(),
+                                                      lambda: _admitted(api_key, payload))
+    except IdempotencyConflict as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except IdempotencyAborted as e:
+        raise HTTPException(status_code=409, detail=str(e), headers={"Retry-After": "1"})
+    if replayed:
+        response.headers["Idempotent-Replayed"] = "true"
+    return trade
+
+
+async def _admitted(api_key, payload: ExecuteRequest):
+    """`_execute` after spending the caller's "trades" token, holding a "trades" admission slot."""
+    spend(api_key, "trades")
+    async with admission.gate("trades").slot():
+        return await _execute(payload)
+
+
+async def _execute(payload: ExecuteRequest):
     # only AIRDROP implemented for now
-    adapter = ExecutionAdapter(mode="dev")
+    adapter = ExecutionAdapter(mode=EXECUTION_MODE)
     act = payload.action.upper()
     try:
         if act == "AIRDROP":
             trade = await adapter.execute_airdrop(payload.address, payload.amount)
+        elif act in ("BUY", "SELL") and order_router.enabled:
+            # coalesced with other orders on the same wallet/asset; returns this order's allocation
+            trade = await order_router.submit(payload.address, payload.asset or "SOL", act, payload.amount,
+                                              payload.price, payload.strategy_id)
         elif act == "BUY":
-            if payload.price is None:
-                raise HTTPException(status_code=400, detail="price required for BUY")
-            trade = await adapter.execute_buy(payload.address, payload.asset or "SOL", payload.amount, payload.price)
+            # without a price the adapter fills at the cached mark price
+            trade = await adapter.execute_buy(payload.address, payload.asset or "SOL", payload.amount, payload.price,
+                                              payload.strategy_id)
         elif act == "SELL":
-            if payload.price is None:
-                raise HTTPException(status_code=400, detail="price required for SELL")
-            trade = await adapter.execute_sell(payload.address, payload.asset or "SOL", payload.amount, payload.price)
+            trade = await adapter.execute_sell(payload.address, payload.asset or "SOL", payload.amount, payload.price,
+                                               payload.strategy_id)
         else:
             raise HTTPException(status_code=400, detail=f"Unsupported action: {payload.action}")
     except ValueError as e:
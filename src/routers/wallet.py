@@ -1,7 +1,9 @@
 from fastapi import APIRouter, HTTPException
-from src.models import WalletBalance
+from src.models import WalletBalance, WalletPositions
 from datetime import datetime, timezone
 from src.store import wallet_store
+from src.execution.positions import position_book
+from src.execution.risk import risk_engine
 
 router = APIRouter(prefix="/wallet", tags=["wallet"])
 
@@ -18,6 +20,26 @@ async def get_wallet_balance(address: str):
     )
 
 
+@router.get("/positions", response_model=WalletPositions, summary="Open positions with realized/unrealized PnL")
+async def get_wallet_positions(address: str):
+    if address not in wallet_store:
+        raise HTTPException(status_code=404, detail="Wallet not found")
+    positions = position_book.positions(address)
+    return {
+        "address": address,
+        "positions": positions,
+        "realized_pnl": sum(p["realized_pnl"] for p in positions),
+        "unrealized_pnl": sum(p["unrealized_pnl"] or 0.0 for p in positions),
+    }
+
+
+@router.get("/risk", summary="Running exposure, daily PnL and drawdown used by pre-trade checks")
+async def get_wallet_risk(address: str):
+    if address not in wallet_store:
+        raise HTTPException(status_code=404, detail="Wallet not found")
+    return {"address": address, **risk_engine.snapshot(address)}
+
+
 @router.post("/update", summary="Dev: update wallet balance")
 async def update_wallet_balance(address: str, balance_sol: float):
     w = wallet_store.get(address)
@@ -0,0 +1,65 @@
+"""Fast JSON rendering of store rows for list endpoints.
+
+Declaring `response_model=List[Model]` makes FastAPI validate every returned
+dict into a model, dump it back to Python and render it with stdlib `json`.
+Store rows are written by our own code, so they are trusted: `RowSerializer`
+only projects each row onto the model's fields (dropping extra keys, filling
+defaults) and renders the list in one `orjson.dumps` call. Datetimes come out
+as RFC 3339 with `Z`, and enums as their values, like Pydantic's JSON mode.
+
+Set FAST_JSON=0, or run without orjson installed, to use the precompiled
+`TypeAdapter` of the model instead (validating, still without stdlib json).
+"""
+from __future__ import annotations
+
+import os
+from typing import Any, Dict, Iterable, List, Tuple, Type
+
+from pydantic import BaseModel, TypeAdapter
+from pydantic_core import PydanticUndefined
+
+from src.models import Idea, QAReport, Strategy, Trade
+
+try:
+    import orjson
+except ImportError:  # optional: pydantic-core still renders JSON without it
+    orjson = None
+
+FAST_JSON = os.getenv("FAST_JSON", "1").lower() not in ("0", "false", "no")
+_OPTIONS = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS if orjson is not None else 0
+_ANY = TypeAdapter(Any)
+
+
+def fast_enabled() -> bool:
+    return FAST_JSON and orjson is not None
+
+
+def dumps(rows: Any) -> bytes:
+    """Render trusted plain data (dicts, lists, datetimes, enums) as JSON."""
+    if fast_enabled():
+        return orjson.dumps(rows, option=_OPTIONS)
+    return _ANY.dump_json(rows)
+
+
+class RowSerializer:
+    def __init__(self, model: Type[BaseModel]) -> None:
+        self.model = model
+        self.adapter = TypeAdapter(List[model])
+        self.fields: Tuple[Tuple[str, Any], ...] = tuple(
+            (name, None if f.default is PydanticUndefined else f.default) for name, f in model.model_fields.items()
+        )
+
+    def project(self, row: Dict[str, Any]) -> Dict[str, Any]:
+        return {name: row.get(name, default) for name, default in self.fields}
+
+    def dump(self, rows: Iterable[Dict[str, Any]], trusted: bool = True) -> bytes:
+        """JSON list of `rows` as `List[model]`; `trusted=False` validates every row first."""
+        if trusted and fast_enabled():
+            return orjson.dumps([self.project(r) for r in rows], option=_OPTIONS)
+        return self.adapter.dump_json(self.adapter.validate_python(list(rows)))
+
+
+IDEAS = RowSerializer(Idea)
+STRATEGIES = RowSerializer(Strategy)
+TRADES = RowSerializer(Trade)
+QA_REPORTS = RowSerializer(QAReport)
@@ -1,22 +1,34 @@
 from __future__ import annotations
 
+import os
+from collections import deque
 from datetime import datetime, timezone, timedelta
-from typing import List, Dict
+from typing import Deque, Dict
 from uuid import uuid4
 
-# Simple in-memory stores for demo purposes
+from src.infra.indexed import IndexedList
+from src.infra.versioned import VersionedList
 
-ideas_store: List[Dict] = []
-strategies_store: List[Dict] = []
-trades_store: List[Dict] = []
+# Simple in-memory stores for demo purposes; list stores carry a `version` bumped on every change (ETags)
+
+# indexed for GET /ideas filters; call ideas_store.touch(idea) after changing an indexed field in place
+ideas_store: IndexedList = IndexedList(
+    hash_fields=("id", "asset", "source", "type", "status", "risk", "strategy_id"),
+    sorted_fields=("created_at", "budget"),
+)
+# idea_id index: one strategy per idea (see src.agents.analysis.generate_strategies_for)
+strategies_store: IndexedList = IndexedList(hash_fields=("id", "idea_id"))
+trades_store: VersionedList = VersionedList()
 wallet_store: Dict[str, Dict] = {}
-agents_store: List[Dict] = [
+agents_store: VersionedList = VersionedList([
     {"name": "Quality", "version": "1.2.3", "status": "OK"},
     {"name": "Forschung", "version": "1.2.3", "status": "OK"},
     {"name": "Analyse", "version": "1.2.3", "status": "OK"},
     {"name": "Execution", "version": "1.2.3", "status": "OK"},
-]
-releases_store: List[Dict] = []
+])
+releases_store: VersionedList = VersionedList()
+# newest first, oldest reports dropped beyond QA_REPORTS_MAX
+qa_reports_store: Deque[Dict] = deque(maxlen=int(os.getenv("QA_REPORTS_MAX", "10000")))
 
 
 def seed_demo_data():
@@ -0,0 +1,51 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.infra import admission
+from src.infra.admission import AdmissionGate, Overloaded
+from src.main import app
+
+
+@pytest.mark.asyncio
+async def test_gate_queues_then_sheds():
+    gate = AdmissionGate("test", concurrency=1, queue=1, deadline=0.05)
+    release = asyncio.Event()
+
+    async def hold():
+        async with gate.slot():
+            await release.wait()
+
+    holder = asyncio.create_task(hold())
+    await asyncio.sleep(0)
+    waiter = asyncio.create_task(hold())
+    await asyncio.sleep(0)
+    assert gate.active == 1 and gate.waiting == 1
+
+    with pytest.raises(Overloaded) as full:
+        async with gate.slot():
+            pass
+    assert full.value.status_code == 429 and int(full.value.headers["Retry-After"]) >= 1
+
+    with pytest.raises(Overloaded) as late:
+        await waiter
+    assert late.value.status_code == 503
+    release.set()
+    await holder
+    async with gate.slot():
+        assert gate.active == 1
+    assert gate.stats == {"admitted": 2, "queue_full": 1, "deadline": 1}
+
+
+def test_saturated_route_answers_429(monkeypatch):
+    gate = AdmissionGate("strategies", concurrency=1, queue=0, deadline=1.0)
+    asyncio.run(gate._sem.acquire())  # the only slot is busy
+    monkeypatch.setitem(admission._gates, "strategies", gate)
+    client = TestClient(app)
+    r = client.post("/api/v1/strategies/generate")
+    assert r.status_code == 429 and "Retry-After" in r.headers
+
+    monkeypatch.setitem(admission._gates, "strategies", AdmissionGate("strategies", 0, 0, 0))  # disabled
+    assert client.post("/api/v1/strategies/generate", params={"limit": 1}).status_code == 200
+    assert any(g["name"] == "strategies" for g in client.get("/api/v1/agents/admission").json())
@@ -0,0 +1,88 @@
+from datetime import datetime, timezone
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from src.agents.allocation import allocate, asset_moments, mean_variance, project_capped_simplex, risk_parity
+from src.main import app
+from src.market.timeseries import TimeSeriesStore
+from src.models import IdeaStatus
+from src.store import ideas_store
+
+client = TestClient(app)
+
+
+def test_risk_parity_equalizes_risk_contributions():
+    cov = np.array([[0.04, 0.01, 0.0], [0.01, 0.09, 0.02], [0.0, 0.02, 0.16]])
+    w = risk_parity(cov)
+    contrib = w * (cov @ w)
+    assert w.sum() == pytest.approx(1.0)
+    assert np.allclose(contrib / contrib.sum(), 1 / 3, atol=1e-6)
+
+
+def test_mean_variance_respects_cap_and_prefers_return():
+    mu = np.array([0.02, 0.0, 0.0])
+    cov = np.eye(3) * 0.01
+    w = mean_variance(mu, cov, risk_aversion=1.0, max_weight=0.5)
+    assert w.sum() == pytest.approx(1.0) and w.max() <= 0.5 + 1e-9
+    assert w[0] == pytest.approx(0.5, abs=1e-6)
+    assert np.allclose(project_capped_simplex(np.array([5.0, 0.0, 0.0, 0.0]), cap=0.4), [0.4, 0.2, 0.2, 0.2])
+
+
+def test_covariance_from_store_and_budget_rewrite(tmp_path):
+    store = TimeSeriesStore(str(tmp_path))
+    rng = np.random.default_rng(1)
+    ts = 1_699_999_200 + 3600 * np.arange(200)
+    base = rng.normal(0, 0.01, len(ts))
+    for asset, noise in (("SOL", 0.001), ("JUP", 0.02)):
+        close = np.exp(np.cumsum(base + rng.normal(0, noise, len(ts))))
+        store.append(asset, ts, close, close, close, close)
+    mu, cov = asset_moments(["JUP", "SOL", "XYZ"], store)
+    assert cov[0, 0] > cov[1, 1] and cov[0, 1] > 0 and cov[2, 0] == 0
+
+    ideas = [{"id": "a", "asset": "SOL"}, {"id": "b", "asset": "JUP"},
+             {"id": "c", "asset": "SOL", "risk_metrics": {"cvar": 1.0}}]
+    rows = allocate(ideas, 10.0, store=store)
+    assert sum(r["weight"] for r in rows) == pytest.approx(1.0)
+    assert ideas[0]["budget"] > ideas[1]["budget"]  # less volatile asset gets more capital
+    assert ideas[2]["budget"] <= 0.05  # tail-loss cap still applies
+    with pytest.raises(ValueError):
+        allocate(ideas, 10.0, method="kelly")
+
+
+def test_allocate_endpoint_only_touches_approved_ideas():
+    ideas_store.clear()
+    ideas_store.extend([
+        {"id": "x1", "asset": "SOL", "status": IdeaStatus.APPROVED, "budget": 0.1},
+        {"id": "x2", "asset": "JUP", "status": IdeaStatus.APPROVED, "budget": 0.1},
+        {"id": "x3", "asset": "JUP", "status": IdeaStatus.NEW, "budget": 0.1},
+    ])
+    r = client.post("/api/v1/ideas/allocate", params={"capital": 4.0, "max_weight": 0.8})
+    assert r.status_code == 200
+    body = r.json()
+    assert [row["id"] for row in body["ideas"]] == ["x1", "x2"]
+    assert body["allocated"] == pytest.approx(4.0, rel=1e-4)
+    assert ideas_store[2]["budget"] == 0.1
+    assert client.post("/api/v1/ideas/allocate").status_code == 400
+
+
+def test_approvals_reallocate_when_a_capital_source_is_set(monkeypatch):
+    now = datetime.now(timezone.utc)
+    base = {"source": "research", "asset": "SOL", "type": "swing", "risk": 3, "budget": 0.1, "created_at": now}
+    ideas_store.clear()
+    ideas_store.extend([dict(base, id="a1", status=IdeaStatus.APPROVED), dict(base, id="a2", status=IdeaStatus.READY_FOR_QA)])
+    assert client.post("/api/v1/ideas/a2/approve").status_code == 200
+    assert ideas_store.find("id", "a2")["budget"] == 0.1  # no capital source: opt-in only
+
+    monkeypatch.setenv("ALLOC_CAPITAL", "2.0")
+    a2 = ideas_store.find("id", "a2")
+    a2["status"] = IdeaStatus.READY_FOR_QA
+    ideas_store.touch(a2)
+    assert client.post("/api/v1/ideas/a2/approve").status_code == 200
+    assert {i["id"]: i["budget"] for i in ideas_store} == pytest.approx({"a1": 1.0, "a2": 1.0}, rel=1e-4)
+
+    # a cancelled idea frees its share for the rest
+    r = client.post("/api/v1/ideas/transitions", json={"transitions": [{"idea_id": "a2", "to": "CANCELLED"}]})
+    assert r.status_code == 200 and ideas_store.find("id", "a1")["budget"] == pytest.approx(2.0, rel=1e-4)
+    ideas_store.clear()
@@ -0,0 +1,52 @@
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src import auth
+from src.main import app
+from src.store import trades_store, wallet_store
+
+client = TestClient(app)
+ADDR = "So1anaAUTHTEST"
+
+
+@pytest.fixture
+def keys(monkeypatch, tmp_path):
+    path = tmp_path / "keys.json"
+    path.write_text(json.dumps([{"name": "bot", "sha256": auth.hash_key("bot-secret"), "rate": 0.001, "burst": 2}]))
+    monkeypatch.setenv("API_KEYS", "dash:dash-secret")
+    monkeypatch.setenv("API_KEYS_FILE", str(path))
+    assert auth.load_keys() == 2
+    wallet_store.clear()
+    wallet_store[ADDR] = {"address": ADDR, "balance_sol": 1.0}
+    trades_store.clear()
+    yield
+    monkeypatch.delenv("API_KEYS")
+    monkeypatch.delenv("API_KEYS_FILE")
+    auth.load_keys()
+
+
+def _airdrop(key=None):
+    headers = {"X-API-Key": key} if key else {}
+    return client.post("/api/v1/trades/execute", json={"action": "AIRDROP", "address": ADDR, "amount": 0.1}, headers=headers)
+
+
+def test_table_holds_only_digests(keys):
+    assert auth.lookup("dash-secret").name == "dash"
+    assert auth.lookup("nope") is None and auth.lookup(None) is None
+    assert all("secret" not in digest for digest in auth._keys)
+
+
+def test_per_key_buckets_isolate_noisy_clients(keys):
+    assert _airdrop().status_code == 401
+    assert _airdrop("wrong").status_code == 401
+    assert [_airdrop("bot-secret").status_code for _ in range(3)] == [200, 200, 429]
+    limited = _airdrop("bot-secret")
+    assert limited.status_code == 429 and int(limited.headers["Retry-After"]) >= 1
+    # the other client still has its own quota
+    assert _airdrop("dash-secret").status_code == 200
+
+    usage = {u["name"]: u for u in client.get("/api/v1/agents/quotas", headers={"X-API-Key": "dash-secret"}).json()}
+    assert usage["bot"]["groups"]["trades"] == {"allowed": 2, "rejected": 2, "tokens": pytest.approx(0, abs=0.01)}
+    assert usage["dash"]["groups"]["trades"]["allowed"] == 1
@@ -0,0 +1,47 @@
+import numpy as np
+
+from src.agents.backtest import backtest, backtest_strategies
+
+
+def _bars(close):
+    close = np.asarray(close, dtype=float)
+    opn = np.concatenate(([close[0]], close[:-1]))
+    return {"open": opn, "high": np.maximum(opn, close), "low": np.minimum(opn, close), "close": close}
+
+
+def test_rising_market_hits_take_profit_falling_market_hits_stop():
+    up = _bars(np.linspace(100, 120, 200))
+    down = _bars(np.linspace(100, 80, 200))
+    sl, tp, dd = np.array([0.02, 0.5]), np.array([0.05, 0.5]), np.array([0.5, 0.5])
+
+    r_up = backtest(up, sl, tp, dd, window=100)
+    assert r_up.trades == 2
+    assert np.allclose(r_up.pnl[0], 0.10)  # +5 % in both windows
+    assert r_up.hit_rate[0] == 1.0 and r_up.max_drawdown[0] == 0.0
+
+    r_down = backtest(down, sl, tp, dd, window=100)
+    assert np.allclose(r_down.pnl[0], -0.04)  # stopped out at -2 % twice
+    assert r_down.hit_rate[0] == 0.0
+    # wide limits never trigger: position closed at the window end
+    assert r_down.pnl[1] < -0.04 and r_down.max_drawdown[1] > 0.1
+
+
+def test_drawdown_exit_and_batch_of_strategy_dicts():
+    # up 10 %, then give back 6 % from the peak
+    close = np.concatenate((np.linspace(100, 110, 50), np.linspace(110, 103.4, 50)))
+    strategies = [
+        {"id": "tight-dd", "stop_loss": 0.5, "take_profit": 0.5, "max_dd": 0.03},
+        {"id": "loose-dd", "stop_loss": 0.5, "take_profit": 0.5, "max_dd": 0.5},
+    ]
+    rec = {r["strategy_id"]: r for r in backtest_strategies(_bars(close), strategies, window=100)}
+    assert rec["tight-dd"]["pnl"] > rec["loose-dd"]["pnl"]
+    assert 0.06 < rec["tight-dd"]["pnl"] < 0.07
+
+
+def test_many_variants_random_walk():
+    rng = np.random.default_rng(7)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.001, 20_000)))
+    n = 1_000
+    r = backtest(_bars(close), rng.uniform(0.005, 0.05, n), rng.uniform(0.005, 0.1, n), rng.uniform(0.01, 0.1, n), window=500)
+    assert r.pnl.shape == r.hit_rate.shape == r.max_drawdown.shape == (n,)
+    assert np.all((r.hit_rate >= 0) & (r.hit_rate <= 1))
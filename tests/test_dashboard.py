@@ -0,0 +1,72 @@
+from datetime import datetime, timezone
+
+from fastapi.testclient import TestClient
+
+from src import auth
+from src.dashboard import dashboard_snapshot
+from src.main import app
+from src.store import ideas_store, releases_store, wallet_store
+
+client = TestClient(app)
+
+
+def test_snapshot_has_every_panel_and_skips_unchanged_ones():
+    full = client.get("/api/v1/dashboard/snapshot")
+    assert full.status_code == 200
+    body = full.json()
+    assert set(body["panels"]) == {"wallets", "ideas", "trades", "agents", "strategies", "releases"}
+    assert body["unchanged"] == []
+    assert body["panels"]["agents"]["data"][0]["name"] == "Quality"
+    held = body["version"]
+
+    # nothing changed: a conditional poll is 304 and a delta poll carries no panels
+    assert client.get("/api/v1/dashboard/snapshot", headers={"If-None-Match": full.headers["ETag"]}).status_code == 304
+    delta = client.get("/api/v1/dashboard/snapshot", params={"since": held}).json()
+    assert delta["panels"] == {} and len(delta["unchanged"]) == 6
+
+    releases_store.insert(0, {"id": "r1", "targets": ["Analyse"], "version": "2.0", "notes": "", "status": "DRAFT"})
+    ideas_store.insert(0, {"id": "d1", "source": "research", "asset": "SOL", "type": "swing", "risk": 3, "budget": 0.5,
+                           "status": "NEW", "created_at": datetime.now(timezone.utc), "ttl": 3600})
+    delta = client.get("/api/v1/dashboard/snapshot", params={"since": held}).json()
+    assert set(delta["panels"]) == {"releases", "ideas"} and delta["version"] == held + 1
+    assert delta["panels"]["releases"]["version"] == held + 1
+    assert delta["panels"]["ideas"]["data"][0]["id"] == "d1"
+    releases_store.clear()
+    ideas_store.remove(ideas_store.find("id", "d1"))
+
+
+def test_refresh_renders_only_changed_panels():
+    dashboard_snapshot.refresh()
+    rendered = dashboard_snapshot.stats["rendered"]
+    assert dashboard_snapshot.refresh() == []
+    addr = next(iter(wallet_store))
+    wallet_store[addr]["balance_sol"] = wallet_store[addr].get("balance_sol", 0.0) + 1.0
+    assert dashboard_snapshot.refresh() == ["wallets"]
+    assert dashboard_snapshot.stats["rendered"] == rendered + 1
+    only = client.get("/api/v1/dashboard/snapshot", params={"panels": "wallets"}).json()
+    assert list(only["panels"]) == ["wallets"]
+    assert client.get("/api/v1/dashboard/snapshot", params={"panels": "nope"}).status_code == 400
+
+
+def test_since_from_another_boot_gets_the_full_snapshot():
+    current = client.get("/api/v1/dashboard/snapshot").json()
+    for params in ({"since": current["version"] + 5}, {"since": current["version"], "boot": "0ldb00t0"}):
+        body = client.get("/api/v1/dashboard/snapshot", params=params).json()
+        assert body["unchanged"] == [] and len(body["panels"]) == 6 and body["boot"] == current["boot"]
+    same = client.get("/api/v1/dashboard/snapshot", params={"since": current["version"], "boot": current["boot"]}).json()
+    assert same["panels"] == {}
+
+
+def test_wallets_panel_needs_an_api_key(monkeypatch):
+    monkeypatch.setenv("API_KEYS", "dash:dash-secret")
+    auth.load_keys()
+    try:
+        assert client.get("/api/v1/dashboard/snapshot").status_code == 401
+        assert client.get("/api/v1/dashboard/snapshot", params={"panels": "wallets"}).status_code == 401
+        public = client.get("/api/v1/dashboard/snapshot", params={"panels": "ideas,trades"})
+        assert public.status_code == 200 and set(public.json()["panels"]) == {"ideas", "trades"}
+        full = client.get("/api/v1/dashboard/snapshot", headers={"X-API-Key": "dash-secret"})
+        assert full.status_code == 200 and "wallets" in full.json()["panels"]
+    finally:
+        monkeypatch.delenv("API_KEYS")
+        auth.load_keys()
@@ -0,0 +1,60 @@
+from datetime import datetime, timezone
+
+from fastapi.testclient import TestClient
+
+from src.infra.etag import response_cache
+from src.infra.versioned import VersionedList
+from src.main import app
+from src.store import ideas_store, releases_store
+
+client = TestClient(app)
+
+
+def test_versioned_list_bumps_on_mutation():
+    store = VersionedList([1, 2])
+    v = store.version
+    store.insert(0, 0)
+    store[1:2] = []
+    store.pop()
+    store += [5, 6]
+    del store[0]
+    assert store == [5, 6] and store.version == v + 5
+
+
+def test_unchanged_poll_is_304_until_the_store_changes():
+    releases_store.clear()
+    first = client.get("/api/v1/releases")
+    etag = first.headers["ETag"]
+    assert first.status_code == 200 and first.json() == [] and etag.startswith('W/"')
+
+    rendered = response_cache.stats["rendered"]
+    again = client.get("/api/v1/releases", headers={"If-None-Match": etag})
+    assert again.status_code == 304 and again.content == b""
+    assert response_cache.stats["rendered"] == rendered
+
+    client.post("/api/v1/releases", json={"targets": ["Analyse"], "version": "1.2.4", "notes": "x"})
+    changed = client.get("/api/v1/releases", headers={"If-None-Match": etag})
+    assert changed.status_code == 200 and changed.headers["ETag"] != etag
+    assert changed.json()[0]["version"] == "1.2.4"
+    releases_store.clear()
+
+
+def test_ideas_bodies_are_cached_and_gzipped_per_version():
+    ideas_store.clear()
+    now = datetime.now(timezone.utc)
+    ideas_store.extend({"id": f"e{k}", "source": "research", "asset": "SOL", "type": "swing", "risk": 3,
+                        "budget": 0.5, "status": "NEW", "created_at": now, "ttl": 3600} for k in range(30))
+    r = client.get("/api/v1/ideas", params={"asset": "SOL"}, headers={"Accept-Encoding": "gzip"})
+    assert r.status_code == 200 and r.headers["Content-Encoding"] == "gzip" and len(r.json()) == 30
+
+    hits = response_cache.stats["hits"]
+    again = client.get("/api/v1/ideas", params={"asset": "SOL"})
+    assert again.json() == r.json() and response_cache.stats["hits"] == hits + 1
+
+    # an in-place change reported through touch() invalidates
+    ideas_store[0]["status"] = "CANCELLED"
+    ideas_store.touch(ideas_store[0])
+    fresh = client.get("/api/v1/ideas", params={"asset": "SOL"}, headers={"If-None-Match": r.headers["ETag"]})
+    assert fresh.status_code == 200
+    assert {i["id"]: i["status"] for i in fresh.json()}[ideas_store[0]["id"]] == "CANCELLED"
+    ideas_store.clear()
@@ -0,0 +1,124 @@
+import asyncio
+
+import httpx
+import pytest
+
+from src.agents import research
+from src.infra.http import CachedHttpClient, FetchAborted
+
+
+def _upstream(calls, body=None):
+    body = body or [{"symbol": "jto"}, {"symbol": "wif"}]
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        await asyncio.sleep(0.01)
+        if request.headers.get("if-none-match") == '"v1"':
+            return httpx.Response(304)
+        return httpx.Response(200, json=body, headers={"ETag": '"v1"'})
+
+    return httpx.MockTransport(handler)
+
+
+@pytest.mark.asyncio
+async def test_cache_coalesces_and_revalidates():
+    calls = []
+    client = CachedHttpClient(transport=_upstream(calls))
+    try:
+        results = await asyncio.gather(*[client.get_json("http://upstream/markets", {"page": 1}, ttl=60) for _ in range(5)])
+        assert all(r == results[0] for r in results)
+        assert len(calls) == 1 and client.stats["coalesced"] == 4
+
+        await client.get_json("http://upstream/markets", {"page": 1}, ttl=60)
+        assert len(calls) == 1  # fresh cache hit
+
+        # stale entry: conditional GET, 304 keeps the cached body
+        first = await client.get_json("http://upstream/markets", {"page": 2}, ttl=0)
+        data = await client.get_json("http://upstream/markets", {"page": 2}, ttl=0)
+        assert data == first and len(calls) == 3
+        assert calls[-1].headers["if-none-match"] == '"v1"'
+        assert client.stats["revalidated"] >= 1
+    finally:
+        await client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_stale_entry_served_on_429_and_5xx():
+    statuses = [200, 429, 503]
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(statuses.pop(0), json=[{"symbol": "bonk"}])
+
+    client = CachedHttpClient(transport=httpx.MockTransport(handler), stale_backoff=0)  # ask again every time
+    try:
+        first = await client.get_json("http://upstream/markets", ttl=0)
+        assert await client.get_json("http://upstream/markets", ttl=0) == first
+        assert await client.get_json("http://upstream/markets", ttl=0) == first
+        assert client.stats["stale"] == 2
+        statuses.append(429)
+        with pytest.raises(httpx.HTTPStatusError):
+            await client.get_json("http://upstream/other", ttl=0)  # nothing cached to fall back on
+    finally:
+        await client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_stale_entry_backs_off_the_failing_upstream():
+    calls, responses = [], [httpx.Response(200, json=[1]), httpx.Response(503), httpx.Response(429, headers={"Retry-After": "0"}),
+                            httpx.Response(200, json=[2])]
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        return responses.pop(0)
+
+    client = CachedHttpClient(transport=httpx.MockTransport(handler), stale_backoff=30)
+    try:
+        assert await client.get_json("http://upstream/markets", ttl=0) == [1]
+        assert await client.get_json("http://upstream/markets", ttl=0) == [1]  # 503: stale, then 30 s of quiet
+        assert await client.get_json("http://upstream/markets", ttl=0) == [1]
+        assert len(calls) == 2 and client.stats["hits"] == 1
+        client._cache[("http://upstream/markets", ())].expires = 0
+        assert await client.get_json("http://upstream/markets", ttl=0) == [1]  # 429 with Retry-After: 0
+        assert await client.get_json("http://upstream/markets", ttl=0) == [2]
+        assert len(calls) == 4
+    finally:
+        await client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_waiters_of_a_cancelled_fetch_get_a_fetch_error():
+    started = asyncio.Event()
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        started.set()
+        await asyncio.sleep(10)
+
+    client = CachedHttpClient(transport=httpx.MockTransport(handler))
+    try:
+        first = asyncio.create_task(client.get_json("http://upstream/markets"))
+        await started.wait()
+        waiter = asyncio.create_task(client.get_json("http://upstream/markets"))
+        await asyncio.sleep(0)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        with pytest.raises(FetchAborted):
+            await waiter
+        assert isinstance(waiter.exception(), httpx.HTTPError)
+    finally:
+        await client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_research_fetch_uses_shared_client(monkeypatch):
+    calls = []
+    client = CachedHttpClient(transport=_upstream(calls))
+    monkeypatch.setattr(research, "http_client", client)
+    monkeypatch.setenv("ENABLE_INTERNET_RESEARCH", "1")
+    try:
+        ideas = await research.generate_research_ideas(risk_pref=2)
+        again = await research.fetch_coingecko_solana_tokens(limit=10)
+    finally:
+        await client.aclose()
+    assert [i["asset"] for i in ideas] == ["JTO", "WIF"]
+    assert again and len(calls) == 1
@@ -0,0 +1,112 @@
+import random
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.infra.indexed import IndexedList
+from src.main import app
+from src.models import IdeaStatus
+from src.store import ideas_store
+
+client = TestClient(app)
+NOW = datetime.now(timezone.utc)
+ASSETS = ["SOL", "JUP", "BONK", "RAY"]
+
+
+def _idea(rng, k):
+    return {"id": f"q{k}", "source": rng.choice(["research", "analysis"]), "asset": rng.choice(ASSETS),
+            "type": rng.choice(["yield", "swing", "other"]), "risk": rng.randint(1, 5),
+            "budget": round(rng.uniform(0.01, 5.0), 2), "status": rng.choice(list(IdeaStatus)),
+            "created_at": NOW - timedelta(seconds=rng.randint(0, 7200)), "ttl": 5400}
+
+
+def _brute(items, where, ranges):
+    out = []
+    for r in items:
+        if any(v is not None and r.get(f) not in (v if isinstance(v, (set, list)) else [v]) for f, v in where.items()):
+            continue
+        if any(r.get(f) is None or (lo is not None and r[f] < lo) or (hi is not None and r[f] > hi)
+               for f, (lo, hi) in ranges.items()):
+            continue
+        out.append(r)
+    return out
+
+
+def test_indexed_queries_match_a_full_scan_through_mutations():
+    rng = random.Random(3)
+    items = IndexedList([_idea(rng, k) for k in range(3000)],
+                        hash_fields=("id", "asset", "source", "type", "status", "risk"),
+                        sorted_fields=("created_at", "budget"))
+    for k in range(3000, 3200):
+        items.insert(0, _idea(rng, k))
+    del items[10:60]
+    items.pop(0)
+    items.remove(items[5])
+    items[7] = _idea(rng, 9999)
+    for r in rng.sample(list(items), 300):  # in-place edits announced via touch
+        r["status"] = IdeaStatus.APPROVED
+        r["budget"] = round(rng.uniform(0.01, 5.0), 2)
+        items.touch(r)
+
+    for _ in range(300):
+        where = {"asset": rng.choice([None, rng.choice(ASSETS), ["SOL", "JUP"]]),
+                 "status": rng.choice([None, IdeaStatus.NEW, IdeaStatus.APPROVED]),
+                 "source": rng.choice([None, "research"])}
+        ranges = {"risk": rng.choice([(None, None), (4, None), (2, 3)]),
+                  "budget": rng.choice([(None, None), (4.5, None), (None, 0.5), (1.0, 2.0)]),
+                  "created_at": rng.choice([(None, None), (NOW - timedelta(minutes=30), None)])}
+        limit = rng.choice([None, 5, 50])
+        got = items.query(where=where, ranges=ranges, order_by="created_at", limit=limit)
+        want = sorted(_brute(items, where, ranges), key=lambda r: r["created_at"], reverse=True)
+        assert [r["created_at"] for r in got] == [r["created_at"] for r in want][:limit]
+        assert all(r in want for r in got)
+    assert items.find("id", "q9999") is items[7]
+    with pytest.raises(ValueError):
+        items.query(ranges={"ttl": (0, 1)})
+
+
+def test_get_ideas_filters():
+    rng = random.Random(5)
+    ideas_store.clear()
+    ideas_store.extend(_idea(rng, k) for k in range(500))
+    r = client.get("/api/v1/ideas", params={"asset": "SOL", "risk_min": 4, "since_minutes": 30, "limit": 200})
+    assert r.status_code == 200
+    rows = r.json()
+    assert rows and all(i["asset"] == "SOL" and i["risk"] >= 4 for i in rows)
+    cutoff = NOW - timedelta(minutes=30)
+    expected = [i for i in ideas_store if i["asset"] == "SOL" and i["risk"] >= 4 and i["created_at"] >= cutoff]
+    assert len(rows) == len(expected)
+
+    r = client.get("/api/v1/ideas", params={"source": "research", "budget_min": 4.0, "status": "NEW"})
+    assert all(i["source"] == "research" and i["budget"] >= 4.0 and i["status"] == "NEW" for i in r.json())
+    assert len(client.get("/api/v1/ideas", params={"limit": 7}).json()) == 7
+
+
+def test_incremental_inserts_and_deletes_keep_order_across_index_blocks(monkeypatch):
+    from src.infra import indexed
+
+    monkeypatch.setattr(indexed, "_LOAD", 4)  # many small blocks, so inserts split them
+    rng = random.Random(5)
+    items = IndexedList(hash_fields=("id", "asset", "status"), sorted_fields=("created_at", "budget"))
+
+    def check():
+        for where in ({"asset": ["SOL", "RAY"]}, {"status": IdeaStatus.NEW, "asset": "SOL"}, {}):
+            for lo, hi in ((None, None), (1.0, 2.0), (4.5, None), (None, 0.3)):
+                for limit in (None, 1, 7):
+                    got = items.query(where=where, ranges={"budget": (lo, hi)}, order_by="budget", descending=False,
+                                      limit=limit)
+                    want = sorted(_brute(items, where, {"budget": (lo, hi)}), key=lambda r: r["budget"])
+                    assert [r["budget"] for r in got] == [r["budget"] for r in want][:limit]
+
+    for k in range(400):
+        items.insert(rng.randint(0, len(items)), _idea(rng, k))
+    check()  # builds per-bucket order indexes, which the edits below must keep current
+    for _ in range(150):
+        del items[rng.randrange(len(items))]
+    items.extend(_idea(rng, k) for k in range(400, 500))
+    for r in rng.sample(list(items), 50):
+        r["budget"] = round(rng.uniform(0.01, 5.0), 2)
+        r["status"] = rng.choice(list(IdeaStatus))
+        items.touch(r)
+    check()
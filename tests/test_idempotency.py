@@ -0,0 +1,112 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.infra.idempotency import IdempotencyAborted, IdempotencyCache, IdempotencyConflict
+from src.main import app
+from src.store import trades_store, wallet_store
+
+client = TestClient(app)
+
+
+@pytest.mark.asyncio
+async def test_duplicates_join_the_inflight_call():
+    cache = IdempotencyCache(max_entries=2)
+    calls = []
+
+    async def work():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {"n": len(calls)}
+
+    results = await asyncio.gather(*(cache.run("k", "body", work) for _ in range(5)))
+    assert len(calls) == 1
+    assert [r for r, _ in results] == [{"n": 1}] * 5
+    assert sorted(replayed for _, replayed in results) == [False] + [True] * 4
+    assert await cache.run("k", "body", work) == ({"n": 1}, True)
+    with pytest.raises(IdempotencyConflict):
+        await cache.run("k", "other body", work)
+
+    # failures are not remembered; completed keys are evicted LRU-first
+    async def boom():
+        raise RuntimeError("rpc down")
+
+    with pytest.raises(RuntimeError):
+        await cache.run("f", "body", boom)
+    await cache.run("f", "body", work)
+    await cache.run("g", "body", work)
+    assert len(cache) == 2 and (await cache.run("k", "body", work))[1] is False
+
+
+@pytest.mark.asyncio
+async def test_joiners_of_a_cancelled_call_get_a_retryable_error():
+    cache = IdempotencyCache()
+    started = asyncio.Event()
+
+    async def slow():
+        started.set()
+        await asyncio.sleep(10)
+
+    async def fast():
+        return "ok"
+
+    first = asyncio.create_task(cache.run("c", "body", slow))
+    await started.wait()
+    joiner = asyncio.create_task(cache.run("c", "body", slow))
+    await asyncio.sleep(0)
+    first.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await first
+    with pytest.raises(IdempotencyAborted):
+        await joiner
+    assert await cache.run("c", "body", fast) == ("ok", False)  # the retry runs again
+
+
+def test_retried_execute_debits_once():
+    addr = "So1anaIDEMPOTENT"
+    wallet_store.clear()
+    wallet_store[addr] = {"address": addr, "balance_sol": 1.0}
+    trades_store.clear()
+    payload = {"action": "AIRDROP", "address": addr, "amount": 0.5}
+    headers = {"Idempotency-Key": "retry-1"}
+
+    first = client.post("/api/v1/trades/execute", json=payload, headers=headers)
+    again = client.post("/api/v1/trades/execute", json=payload, headers=headers)
+    assert first.status_code == again.status_code == 200
+    assert again.headers.get("Idempotent-Replayed") == "true"
+    assert first.json()["id"] == again.json()["id"]
+    assert wallet_store[addr]["balance_sol"] == 1.5 and len(trades_store) == 1
+
+    changed = client.post("/api/v1/trades/execute", json=dict(payload, amount=0.7), headers=headers)
+    assert changed.status_code == 422
+    assert client.post("/api/v1/trades/execute", json=payload).status_code == 200  # no key: executes again
+    assert wallet_store[addr]["balance_sol"] == 2.0
+
+
+def test_replays_cost_no_quota_or_admission_slot(monkeypatch):
+    from src import auth
+    from src.infra import admission
+
+    monkeypatch.setenv("API_KEYS", "bot:bot-secret")
+    monkeypatch.setenv("API_KEY_BURST", "1")
+    monkeypatch.setenv("API_KEY_RATE_PER_SEC", "0.001")
+    auth.load_keys()
+    gate = admission.AdmissionGate("trades", concurrency=1, queue=0, deadline=1.0)
+    monkeypatch.setitem(admission._gates, "trades", gate)
+    addr = "So1anaREPLAYQUOTA"
+    wallet_store[addr] = {"address": addr, "balance_sol": 1.0}
+    payload = {"action": "AIRDROP", "address": addr, "amount": 0.5}
+    headers = {"X-API-Key": "bot-secret", "Idempotency-Key": "quota-1"}
+    try:
+        assert client.post("/api/v1/trades/execute", json=payload, headers=headers).status_code == 200
+        # the only token is spent: replays still answer, and never reach the gate
+        for _ in range(3):
+            again = client.post("/api/v1/trades/execute", json=payload, headers=headers)
+            assert again.status_code == 200 and again.headers.get("Idempotent-Replayed") == "true"
+        assert gate.stats["admitted"] == 1
+        fresh = client.post("/api/v1/trades/execute", json=payload, headers={"X-API-Key": "bot-secret", "Idempotency-Key": "quota-2"})
+        assert fresh.status_code == 429
+    finally:
+        monkeypatch.delenv("API_KEYS")
+        auth.load_keys()
@@ -14,3 +14,17 @@ async def test_eventbus_memory_publish_read():
     recent = await bus.read_recent("idea_stream", count=10)
     assert isinstance(recent, list)
     assert recent and recent[0]["foo"] == "bar"
+
+
+@pytest.mark.asyncio
+async def test_memory_streams_keep_a_bounded_tail():
+    bus = EventBus(url=None, maxlen=100)
+    cursor = await bus.last_id("price_stream")
+    for k in range(105):
+        await bus.publish("price_stream", {"k": k})
+    assert len(bus._mem["price_stream"]) == 105  # within the 10% slack
+    await bus.publish_many("price_stream", [{"k": k} for k in range(105, 300)])
+    assert len(bus._mem["price_stream"]) == 100
+    # a cursor older than the tail resumes at the oldest kept entry
+    entries = await bus.read("price_stream", cursor, count=1000, block_ms=0)
+    assert [e["k"] for _sid, e in entries] == list(range(200, 300))
@@ -0,0 +1,49 @@
+import pytest
+
+from src.execution.adapter import ExecutionAdapter
+from src.execution.matching import BUY, SELL, LiquidityConfig, MatchingEngine, OrderBook
+from src.market.prices import price_cache
+from src.store import wallet_store, trades_store
+
+
+def test_price_time_priority_and_partial_fill():
+    book = OrderBook("SOL")
+    book.add("late", SELL, 1.01, 5)
+    book.add("first", SELL, 1.00, 2)
+    book.add("second", SELL, 1.00, 2)
+
+    r = book.submit(BUY, 3)
+    assert [(f[0], f[2]) for f in r.fills] == [("first", 2), ("second", 1)]
+    assert r.status == "FILLED" and r.avg_price == 1.0
+
+    r = book.submit(BUY, 10, limit=1.005)  # IOC: only the 1.00 level is inside the limit
+    assert r.filled == 1 and r.status == "PARTIAL"
+    assert book.best(SELL) == 1.01
+
+    assert book.cancel("late") and book.best(SELL) is None
+
+
+def test_synthetic_liquidity_slippage_grows_with_size():
+    engine = MatchingEngine(LiquidityConfig(levels=10, spacing=0.001, level_notional=10))
+    small = engine.execute("JUP", BUY, 5, mid=1.0)
+    engine2 = MatchingEngine(LiquidityConfig(levels=10, spacing=0.001, level_notional=10))
+    large = engine2.execute("JUP", BUY, 60, mid=1.0)
+    assert small.status == large.status == "FILLED"
+    assert large.slippage > small.slippage >= 0
+    assert large.avg_price > 1.0  # paid the spread plus depth
+
+
+@pytest.mark.asyncio
+async def test_adapter_sim_mode_records_book_fill():
+    addr = "So1anaEXAMPLEaddre55...............1234"
+    wallet_store.clear()
+    wallet_store[addr] = {"address": addr, "balance_sol": 100.0}
+    trades_store.clear()
+    price_cache.update("ORCA", 0.02)
+
+    engine = MatchingEngine(LiquidityConfig(levels=5, spacing=0.01, level_notional=1))
+    adapter = ExecutionAdapter(mode="sim", engine=engine)
+    trade = await adapter.execute_buy(addr, "ORCA", 1000, price=0.0205)  # limit below the 2nd level
+    assert trade["fill_status"] == "PARTIAL"
+    assert trade["quantity"] < trade["requested_quantity"]
+    assert abs(wallet_store[addr]["balance_sol"] - (100.0 - trade["quantity"] * trade["price"])) < 1e-9
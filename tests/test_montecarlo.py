@@ -0,0 +1,41 @@
+import numpy as np
+
+from src.agents.montecarlo import cap_budgets, simulate_log_paths, strategy_returns, var_cvar
+
+
+def test_tight_stop_bounds_the_loss():
+    rng = np.random.default_rng(1)
+    paths = simulate_log_paths(5_000, 60, 60 / (365 * 24 * 3600), sigma=1.5, rng=rng)
+    rets = strategy_returns(paths, np.array([0.01, 0.5]), np.array([0.5, 0.5]), np.array([60, 60]))
+    var, cvar = var_cvar(rets, 0.95)
+    # a stop is filled at its level, so the tail loss cannot exceed it
+    assert cvar[0] <= 0.01 + 1e-12
+    assert cvar[1] > cvar[0] and var[1] <= cvar[1]
+
+
+def test_cap_budgets_batched_and_only_lowers():
+    ideas = [
+        {"id": "a", "asset": "BONK", "budget": 5.0, "ttl": 3600},
+        {"id": "b", "asset": "BONK", "budget": 0.01, "ttl": 3600},
+        {"id": "c", "asset": "SOL", "budget": 5.0, "ttl": 7200},
+    ]
+    params = {k: {"stop_loss": 0.05, "take_profit": 0.1} for k in "abc"}
+    cap_budgets(ideas, params, max_loss=0.05, seed=0, n_paths=4_000)
+
+    a, b, c = ideas
+    assert a["budget"] < 5.0
+    assert abs(a["budget"] * a["risk_metrics"]["cvar"] - 0.05) < 1e-4
+    assert b["budget"] == 0.01  # already small enough
+    assert a["risk_metrics"]["budget_requested"] == 5.0 and "var" in c["risk_metrics"]
+
+    # re-sizing starts from the requested budget, not the capped one
+    capped = a["budget"]
+    cap_budgets([a], params, max_loss=0.1, seed=0, n_paths=4_000)
+    assert a["risk_metrics"]["budget_requested"] == 5.0 and a["budget"] > capped
+
+
+def test_bootstrap_from_stored_returns():
+    returns = np.array([-0.02, 0.01, 0.01])
+    ideas = [{"id": "x", "asset": "NEW", "budget": 1.0, "ttl": 600}]
+    cap_budgets(ideas, {"x": {"stop_loss": 0.5, "take_profit": 0.5}}, returns_by_asset={"NEW": returns}, seed=0, n_paths=2_000)
+    assert ideas[0]["risk_metrics"]["cvar"] > 0
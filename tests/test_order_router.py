@@ -0,0 +1,85 @@
+import asyncio
+
+import pytest
+
+from src.execution.adapter import ExecutionAdapter
+from src.execution.order_router import OrderRouter
+from src.market.prices import price_cache
+from src.store import trades_store, wallet_store
+
+
+ADDR = "So1anaROUTERaddre55..............5678"
+
+
+def _setup(balance=100.0):
+    wallet_store[ADDR] = {"address": ADDR, "balance_sol": balance}
+    trades_store.clear()
+    price_cache.clear()
+    price_cache.update("JUP", 2.0)
+
+
+@pytest.mark.asyncio
+async def test_opposing_orders_net_to_one_residual_trade():
+    _setup()
+    router = OrderRouter(ExecutionAdapter(), window_ms=5)
+    allocs = await asyncio.gather(
+        router.submit(ADDR, "JUP", "BUY", 3.0, strategy_id="s1"),
+        router.submit(ADDR, "JUP", "BUY", 1.0, strategy_id="s2"),
+        router.submit(ADDR, "JUP", "SELL", 2.0, strategy_id="s3"),
+    )
+    # one execution for the residual BUY 2.0
+    assert len(trades_store) == 1
+    trade = trades_store[0]
+    assert trade["action"] == "BUY" and trade["quantity"] == pytest.approx(2.0)
+    assert trade["strategy_id"] == "netted"
+    assert len(trade["allocations"]) == 3
+    assert wallet_store[ADDR]["balance_sol"] == pytest.approx(100.0 - 4.0)
+    s1, s2, s3 = allocs
+    assert s1["quantity"] == pytest.approx(3.0) and s1["netted_quantity"] == pytest.approx(1.5)
+    assert s2["quantity"] == pytest.approx(1.0) and s2["netted_quantity"] == pytest.approx(0.5)
+    assert s3["quantity"] == pytest.approx(2.0) and s3["parent_trade_id"] == trade["id"]
+    assert router.stats == {"orders": 3, "executions": 1, "netted_quantity": 2.0}
+
+
+@pytest.mark.asyncio
+async def test_fully_netted_batch_executes_nothing_but_records_the_fills():
+    _setup(balance=0.0)
+    router = OrderRouter(ExecutionAdapter(), window_ms=5)
+    buy, sell = await asyncio.gather(
+        router.submit(ADDR, "JUP", "BUY", 1.0, strategy_id="a"),
+        router.submit(ADDR, "JUP", "SELL", 1.0, strategy_id="b"),
+    )
+    assert router.stats["executions"] == 0
+    assert [(t["strategy_id"], t["price_source"]) for t in trades_store] == [("a", "crossed"), ("b", "crossed")]
+    assert buy["price"] == sell["price"] == 2.0
+    assert buy["parent_trade_id"] is None
+    assert wallet_store[ADDR]["balance_sol"] == 0.0
+
+
+@pytest.mark.asyncio
+async def test_only_orders_with_the_same_limit_cross():
+    _setup()
+    router = OrderRouter(ExecutionAdapter(), window_ms=5)
+    low, high, market_buy, market_sell = await asyncio.gather(
+        router.submit(ADDR, "JUP", "BUY", 1.0, price=2.5, strategy_id="lo"),
+        router.submit(ADDR, "JUP", "SELL", 1.0, price=3.0, strategy_id="hi"),
+        router.submit(ADDR, "JUP", "BUY", 1.0, strategy_id="mb"),
+        router.submit(ADDR, "JUP", "SELL", 1.0, strategy_id="ms"),
+    )
+    # the two limits do not cross each other; the market orders net at the mark
+    assert low["netted_quantity"] == high["netted_quantity"] == 0.0
+    assert low["parent_trade_id"] and high["parent_trade_id"] and low["parent_trade_id"] != high["parent_trade_id"]
+    assert market_buy["netted_quantity"] == 1.0 and market_buy["price"] == market_sell["price"] == 2.0
+    assert router.stats["executions"] == 2
+
+
+@pytest.mark.asyncio
+async def test_residual_failure_reaches_every_order():
+    _setup(balance=0.1)
+    router = OrderRouter(ExecutionAdapter(), window_ms=1)
+    results = await asyncio.gather(
+        router.submit(ADDR, "JUP", "BUY", 2.0),
+        router.submit(ADDR, "JUP", "SELL", 0.5),
+        return_exceptions=True,
+    )
+    assert all(isinstance(r, ValueError) for r in results)
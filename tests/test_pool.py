@@ -0,0 +1,51 @@
+import numpy as np
+import pytest
+
+from src.bus import bus
+from src.agents.pool import AgentPool
+from src.agents.analysis import _params_chunk, _risk_to_params
+
+
+def _rows(ids, arrays):
+    return [{"id": i, "score": float(x) * 2} for i, x in zip(ids, arrays["x"])]
+
+
+@pytest.mark.asyncio
+async def test_map_chunks_matches_inline_mapping():
+    pool = AgentPool(workers=2, chunk_size=7)
+    ids = [f"idea-{n}" for n in range(50)]
+    risk = np.arange(50, dtype=np.int64) % 5 + 1
+    table = np.array([[[p["stop_loss"], p["take_profit"], p["max_dd"]] for p in map(_risk_to_params, range(1, 6))]])
+    arrays = {"risk": risk, "asset": np.zeros(50, dtype=np.int64)}
+    try:
+        got = {}
+        async for chunk_ids, rows in pool.map_chunks(_params_chunk, ids, arrays, shared={"table": table}):
+            assert len(chunk_ids) <= 7
+            got.update(zip(chunk_ids, rows.tolist()))
+    finally:
+        pool.shutdown()
+
+    assert len(got) == 50
+    expected = _risk_to_params(4)
+    assert got["idea-3"] == [expected["stop_loss"], expected["take_profit"], expected["max_dd"]]
+
+
+@pytest.mark.asyncio
+async def test_stream_to_bus_publishes_every_row():
+    pool = AgentPool(workers=2, chunk_size=4)
+    ids = [str(n) for n in range(10)]
+    try:
+        n = await pool.stream_to_bus("test_pool_stream", _rows, ids, {"x": np.arange(10.0)})
+    finally:
+        pool.shutdown()
+    assert n == 10
+    recent = await bus.read_recent("test_pool_stream", count=10)
+    assert sorted(r["score"] for r in recent) == [float(x) * 2 for x in range(10)]
+
+
+def test_workers_are_not_forked_from_the_server():
+    pool = AgentPool(workers=1)
+    try:
+        assert pool._ensure()._mp_context.get_start_method() in ("forkserver", "spawn")
+    finally:
+        pool.shutdown()
@@ -0,0 +1,63 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from src.execution.positions import LotQueue, PositionBook, position_book
+from src.main import app
+from src.market.prices import PriceCache, price_cache
+from src.store import trades_store, wallet_store
+
+client = TestClient(app)
+
+
+def test_fifo_lots_realize_pnl_oldest_first():
+    lots = LotQueue(capacity=2)
+    lots.fill(1.0, 10.0)
+    lots.fill(2.0, 12.0)
+    lots.fill(1.0, 14.0)  # grows past the initial capacity
+    assert len(lots) == 3 and lots.quantity == 4.0
+
+    # sell 2: closes the 10.0 lot and half of the 12.0 lot
+    assert lots.fill(-2.0, 15.0) == pytest.approx(5.0 + 3.0)
+    assert lots.lots() == [(1.0, 12.0), (1.0, 14.0)]
+    assert lots.cost == pytest.approx(26.0)
+
+    # oversell flips the position short at the fill price
+    assert lots.fill(-3.0, 11.0) == pytest.approx(-1.0 - 3.0)
+    assert lots.lots() == [(-1.0, 11.0)]
+    assert lots.fill(1.0, 9.0) == pytest.approx(2.0)
+    assert len(lots) == 0 and lots.quantity == 0.0
+    assert lots.realized == pytest.approx(8.0 - 4.0 + 2.0)
+
+
+def test_unrealized_pnl_uses_mark_price():
+    prices = PriceCache()
+    book = PositionBook(prices)
+    book.apply("w", "jup", "BUY", 10.0, 2.0)
+    assert book.position("w", "JUP")["unrealized_pnl"] is None
+    prices.update("JUP", 2.5)
+    pos = book.position("w", "JUP")
+    assert pos["avg_price"] == 2.0 and pos["unrealized_pnl"] == pytest.approx(5.0)
+
+
+def test_trades_fill_pnl_and_positions_endpoint():
+    addr = "So1anaPOSITIONSaddre55...........9012"
+    wallet_store[addr] = {"address": addr, "balance_sol": 10.0}
+    trades_store.clear()
+    position_book.clear()
+    price_cache.clear()
+    price_cache.update("ORCA", 2.0)
+
+    r = client.post("/api/v1/trades/execute", json={"action": "BUY", "address": addr, "amount": 2.0, "asset": "ORCA", "price": 1.0})
+    assert r.status_code == 200 and r.json()["pnl"] == 0.0
+    r = client.post("/api/v1/trades/execute", json={"action": "SELL", "address": addr, "amount": 0.5, "asset": "ORCA"})
+    assert r.status_code == 200 and r.json()["pnl"] == pytest.approx(0.5)
+
+    r = client.get("/api/v1/wallet/positions", params={"address": addr})
+    assert r.status_code == 200
+    body = r.json()
+    (pos,) = body["positions"]
+    assert pos["asset"] == "ORCA" and pos["quantity"] == pytest.approx(1.5)
+    assert body["realized_pnl"] == pytest.approx(0.5)
+    assert body["unrealized_pnl"] == pytest.approx(1.5)
+
+    assert client.get("/api/v1/wallet/positions", params={"address": "nope"}).status_code == 404
@@ -0,0 +1,48 @@
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.bus import bus
+from src.main import app
+from src.market.prices import PriceCache, SimulatedFeed, StalePriceError, price_cache
+from src.store import wallet_store, trades_store
+
+client = TestClient(app)
+
+
+@pytest.mark.asyncio
+async def test_cache_staleness_and_publish():
+    cache = PriceCache(max_age=5)
+    assert await cache.publish("jup", 0.006) is True
+    assert await cache.publish("JUP", 0.006) is False  # unchanged: not republished
+    assert cache.mark("JUP") == 0.006
+    assert (await bus.read_recent("price_stream", count=1))[0]["asset"] == "JUP"
+
+    cache.update("ORCA", 0.02, ts=time.time() - 60)
+    with pytest.raises(StalePriceError):
+        cache.mark("ORCA")
+    with pytest.raises(StalePriceError):
+        cache.mark("UNKNOWN")
+
+    feed = SimulatedFeed(cache, seed=1)
+    await feed.tick()
+    assert cache.mark("SOL") == 1.0 and cache.mark("BONK") > 0
+
+
+def test_execute_buy_fills_at_mark_price():
+    addr = "So1anaEXAMPLEaddre55...............1234"
+    wallet_store.clear()
+    wallet_store[addr] = {"address": addr, "balance_sol": 10.0}
+    trades_store.clear()
+    price_cache.clear()
+
+    payload = {"action": "BUY", "address": addr, "asset": "JUP", "amount": 100}
+    r = client.post("/api/v1/trades/execute", json=payload)
+    assert r.status_code == 400 and "mark price" in r.json()["detail"]
+
+    price_cache.update("JUP", 0.01)
+    r = client.post("/api/v1/trades/execute", json=payload)
+    assert r.status_code == 200
+    assert r.json()["price"] == 0.01
+    assert abs(wallet_store[addr]["balance_sol"] - 9.0) < 1e-9
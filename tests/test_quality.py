@@ -0,0 +1,77 @@
+import time
+
+import pytest
+
+from src.agents import quality, research
+from src.agents.quality import compile_policy, evaluate
+from src.bus import bus
+from src.store import qa_reports_store
+
+
+def test_policy_flags_each_failing_rule():
+    ideas = [
+        {"id": "ok", "asset": "SOL", "budget": 0.5, "risk": 3, "ttl": 5400},
+        {"id": "big", "asset": "SOL", "budget": 50.0, "risk": 3, "ttl": 5400},
+        {"id": "bad", "asset": "", "budget": 0.5, "risk": 9, "ttl": None},
+    ]
+    reports = {r["target_id"]: r for r in evaluate("idea", ideas)}
+    assert reports["ok"]["approved"] and reports["ok"]["issues"] == []
+    assert [i.split(":")[0] for i in reports["big"]["issues"]] == ["budget_cap"]
+    assert {i.split(":")[0] for i in reports["bad"]["issues"]} == {"asset_required", "risk_range", "ttl_sane"}
+
+    strategies = [
+        {"id": "s1", "exit_conditions": "exit", "stop_loss": 0.05, "take_profit": 0.1, "max_dd": 0.1},
+        {"id": "s2", "exit_conditions": "exit", "stop_loss": 0.1, "take_profit": 0.05, "max_dd": 0.1},
+    ]
+    s1, s2 = evaluate("strategy", strategies)
+    assert s1["approved"] and s2["issues"] == ["take_profit_above_stop: take_profit > stop_loss"]
+
+
+def test_custom_rules_compile_in_and_ref_ops():
+    policy = compile_policy([
+        {"name": "asset_listed", "target": "idea", "field": "asset", "op": "in", "value": ["SOL", "JUP"]},
+        {"name": "budget_le_cap", "target": "idea", "field": "budget", "op": "<=", "ref": "cap", "message": "over cap"},
+    ])
+    ok, bad = evaluate("idea", [{"id": 1, "asset": "JUP", "budget": 1, "cap": 2},
+                                {"id": 2, "asset": "XYZ", "budget": 3}], policy)
+    assert ok["approved"]
+    assert bad["issues"] == ["asset_listed: asset in ['SOL', 'JUP']", "budget_le_cap: over cap"]
+    with pytest.raises(ValueError):
+        compile_policy([{"name": "x", "field": "a", "op": "~"}])
+
+
+@pytest.mark.asyncio
+async def test_review_publishes_reports_in_one_batch():
+    qa_reports_store.clear()
+    cursor = await bus.last_id(quality.QA_STREAM)
+    msgs = [{"idea_id": f"i{k}", "asset": "SOL", "budget": float(k % 10), "risk": 3, "ttl": 600} for k in range(20000)]
+    started = time.perf_counter()
+    await quality.review_idea_messages(msgs)
+    assert time.perf_counter() - started < 2.0
+    assert len(qa_reports_store) == min(20000, qa_reports_store.maxlen)  # bounded, oldest dropped
+    assert qa_reports_store[0]["target_id"] == "i19999"
+    published = await bus.read(quality.QA_STREAM, cursor, count=30000, block_ms=0)
+    assert len(published) == 20000
+    rejected = sum(1 for _sid, r in published if not r["approved"])
+    assert rejected == 2000 + 8000  # budget 0 fails budget_positive, 6..9 fail the 5.0 cap
+
+
+@pytest.mark.asyncio
+async def test_research_ideas_pass_review_from_the_store():
+    from src.agents.dedup import idea_deduper
+    from src.store import ideas_store
+
+    ideas_store.clear()
+    idea_deduper.clear()
+    cursor = await bus.last_id("idea_stream")
+    await research.generate_research_ideas(persist=True)
+    msgs = [m for _sid, m in await bus.read("idea_stream", cursor, count=100, block_ms=0)]
+    assert msgs and all(m["ttl"] == 3600 for m in msgs)
+    # partial messages: the stored idea is what gets reviewed
+    reports = evaluate("idea", [ideas_store.find("id", m["idea_id"]) for m in msgs])
+    assert all(r["approved"] for r in reports)
+    qa_reports_store.clear()
+    await quality.review_idea_messages([{"idea_id": m["idea_id"]} for m in msgs])
+    assert all(r["approved"] for r in qa_reports_store)
+    ideas_store.clear()
+    idea_deduper.clear()
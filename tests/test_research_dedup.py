@@ -0,0 +1,45 @@
+import pytest
+
+from src.agents import research
+from src.agents.dedup import IdeaDeduper, idea_deduper
+from src.infra.indexed import IndexedList
+from src.store import ideas_store
+
+
+def _idea(asset, type_="swing", risk=3, status="NEW"):
+    return {"id": f"{asset}-{risk}", "asset": asset, "type": type_, "risk": risk, "status": status}
+
+
+def test_window_buckets_and_open_ideas():
+    store = IndexedList(hash_fields=("id", "asset", "type", "status", "risk"))
+    dedup = IdeaDeduper(window=60, risk_bucket=2, store=store)
+    kept = dedup.filter([_idea("SOL", risk=1), _idea("sol", risk=2), _idea("SOL", risk=3), _idea("BONK")], now=0)
+    assert [(i["asset"], i["risk"]) for i in kept] == [("SOL", 1), ("SOL", 3), ("BONK", 3)]
+    assert dedup.filter([_idea("BONK", risk=4)], now=30) == []  # same bucket, inside the window
+    assert len(dedup.filter([_idea("BONK")], now=61)) == 1  # window expired
+
+    # an open idea in the store blocks its bucket; a cancelled one does not
+    store.append(_idea("JUP", status="APPROVED"))
+    store.append(_idea("RAY", status="CANCELLED"))
+    assert [i["asset"] for i in dedup.filter([_idea("JUP"), _idea("RAY")], now=100)] == ["RAY"]
+    assert dedup.stats == {"kept": 5, "dropped": 3}
+
+
+@pytest.mark.asyncio
+async def test_repeated_research_runs_emit_only_new_ideas(monkeypatch):
+    monkeypatch.delenv("ENABLE_INTERNET_RESEARCH", raising=False)
+    ideas_store.clear()
+    idea_deduper.clear()
+    first = await research.generate_research_ideas(risk_pref=3, persist=True)
+    again = await research.generate_research_ideas(risk_pref=3, persist=True)
+    assert len(first) == 6 and again == []
+    assert len(ideas_store) == 6
+
+    # once the held ideas are closed and the window has passed, the seeds come back
+    for idea in ideas_store:
+        idea["status"] = "CANCELLED"
+    ideas_store.touch(*ideas_store)
+    idea_deduper.clear()
+    assert len(await research.generate_research_ideas(risk_pref=3)) == 6
+    ideas_store.clear()
+    idea_deduper.clear()
@@ -0,0 +1,66 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from src.execution.risk import RiskEngine, RiskLimitError, RiskLimits, risk_engine
+from src.main import app
+from src.market.prices import price_cache
+from src.store import wallet_store
+
+client = TestClient(app)
+
+
+def _limits(**kw):
+    base = dict(max_order_notional=0, max_asset_exposure=0, max_wallet_exposure=0,
+                max_daily_loss=0, max_drawdown=0, max_slippage=0)
+    base.update(kw)
+    return RiskLimits(**base)
+
+
+def test_exposure_limits_use_running_aggregates():
+    engine = RiskEngine(_limits(max_asset_exposure=10.0, max_wallet_exposure=15.0))
+    engine.check("w", "JUP", "BUY", 4.0, 2.0)
+    engine.record("w", "JUP", "BUY", 4.0, 2.0)
+    with pytest.raises(RiskLimitError) as e:
+        engine.check("w", "JUP", "BUY", 2.0, 2.0)  # 12 > 10
+    assert e.value.rule == "asset_exposure"
+    engine.check("w", "JUP", "SELL", 3.0, 2.0)  # reducing is always allowed
+
+    engine.record("w", "RAY", "BUY", 4.0, 1.5)  # gross 8 + 6 = 14
+    with pytest.raises(RiskLimitError) as e:
+        engine.check("w", "ORCA", "BUY", 1.0, 2.0)
+    assert e.value.rule == "wallet_exposure"
+    assert engine.snapshot("w")["gross_exposure"] == pytest.approx(14.0)
+    assert engine.snapshot("nobody")["gross_exposure"] == 0.0 and "nobody" not in engine._wallets
+
+
+def test_loss_drawdown_and_slippage_rules():
+    engine = RiskEngine(_limits(max_daily_loss=1.0, max_drawdown=1.5, max_slippage=0.01))
+    with pytest.raises(RiskLimitError) as e:
+        engine.check("w", "JUP", "BUY", 1.0, 1.02, mark=1.0)
+    assert e.value.rule == "slippage"
+    engine.check("w", "JUP", "SELL", 1.0, 1.02, mark=1.0)  # selling above mark is not slippage
+
+    engine.record("w", "JUP", "SELL", 1.0, 1.0, pnl=2.0)
+    engine.record("w", "JUP", "SELL", 1.0, 1.0, pnl=-1.6)  # day: +0.4, drawdown 1.6
+    with pytest.raises(RiskLimitError) as e:
+        engine.check("w", "JUP", "BUY", 1.0, 1.0)
+    assert e.value.rule == "drawdown"
+    engine.record("w", "JUP", "BUY", 1.0, 1.0, pnl=-1.5)
+    assert engine.snapshot("w")["daily_pnl"] == pytest.approx(-1.1)
+    assert engine.stats == {"checked": 3, "rejected": 2}
+
+
+def test_execute_rejects_order_over_budget_cap(monkeypatch):
+    addr = "So1anaRISKaddre55................3456"
+    wallet_store[addr] = {"address": addr, "balance_sol": 100.0}
+    price_cache.update("RAY", 0.5)
+    monkeypatch.setattr(risk_engine, "limits", _limits(max_order_notional=5.0))
+
+    r = client.post("/api/v1/trades/execute", json={"action": "BUY", "address": addr, "amount": 20.0, "asset": "RAY"})
+    assert r.status_code == 400 and "order_notional" in r.json()["detail"]
+    assert wallet_store[addr]["balance_sol"] == 100.0
+
+    r = client.post("/api/v1/trades/execute", json={"action": "BUY", "address": addr, "amount": 8.0, "asset": "RAY"})
+    assert r.status_code == 200
+    r = client.get("/api/v1/wallet/risk", params={"address": addr})
+    assert r.json()["exposure"] == {"RAY": pytest.approx(4.0)}
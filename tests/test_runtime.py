@@ -0,0 +1,103 @@
+import asyncio
+
+import pytest
+
+from src.bus import bus
+from src.agents import runtime
+from src.agents.runtime import Supervisor, WorkerSpec
+
+
+@pytest.mark.asyncio
+async def test_worker_consumes_stream_and_stops_gracefully():
+    seen = []
+
+    async def handler(msg):
+        await asyncio.sleep(0.01)
+        seen.append(msg["n"])
+
+    sup = Supervisor([WorkerSpec("test", handler, stream="test_runtime_stream", concurrency=4)])
+    await bus.publish("test_runtime_stream", {"n": -1})  # backlog is skipped
+    await sup.start()
+    await asyncio.sleep(0.05)
+    for n in range(10):
+        await bus.publish("test_runtime_stream", {"n": n})
+    await asyncio.sleep(0.2)
+    await sup.stop()
+
+    assert sorted(seen) == list(range(10))
+    assert sup.status()[0]["status"] == "STOPPED"
+    assert sup.status()[0]["processed"] == 10
+
+
+@pytest.mark.asyncio
+async def test_worker_restarts_after_crash(monkeypatch):
+    calls = {"n": 0}
+    real_read = runtime.bus.read
+
+    async def flaky_read(*args, **kwargs):
+        calls["n"] += 1
+        if calls["n"] == 1:
+            raise ConnectionError("bus down")
+        return await real_read(*args, **kwargs)
+
+    monkeypatch.setattr(runtime.bus, "read", flaky_read)
+
+    async def handler(msg):
+        pass
+
+    sup = Supervisor([WorkerSpec("flaky", handler, stream="test_runtime_crash")], backoff=0.01)
+    await sup.start()
+    await asyncio.sleep(0.1)
+    await sup.stop()
+
+    st = sup.status()[0]
+    assert st["restarts"] == 1
+    assert "bus down" in st["last_error"]
+
+
+@pytest.mark.asyncio
+async def test_restart_resumes_from_the_cursor(monkeypatch):
+    calls = {"n": 0}
+    real_read = runtime.bus.read
+    seen = []
+
+    async def flaky_read(*args, **kwargs):
+        calls["n"] += 1
+        if calls["n"] == 1:
+            await bus.publish("test_runtime_resume", {"n": 1})  # lands while the worker is down
+            raise ConnectionError("bus down")
+        return await real_read(*args, **kwargs)
+
+    monkeypatch.setattr(runtime.bus, "read", flaky_read)
+
+    async def handler(msg):
+        seen.append(msg["n"])
+
+    sup = Supervisor([WorkerSpec("resume", handler, stream="test_runtime_resume")], backoff=0.01)
+    await sup.start()
+    await asyncio.sleep(0.1)
+    await sup.stop()
+    assert seen == [1]
+
+
+@pytest.mark.asyncio
+async def test_analysis_drops_unknown_ideas_and_makes_one_strategy_per_idea(monkeypatch):
+    from datetime import datetime, timezone
+
+    from src.agents.analysis import generate_strategies_from_ideas
+    from src.store import ideas_store, strategies_store
+
+    monkeypatch.setenv("MC_SIZING", "0")
+    ideas_store.clear()
+    strategies_store.clear()
+    await runtime._analysis_handler([{"idea_id": "missing", "asset": "SOL"}])
+    assert len(strategies_store) == 0
+
+    ideas_store.append({"id": "rt1", "asset": "SOL", "type": "swing", "risk": 3, "ttl": 3600, "budget": 1.0,
+                        "status": "NEW", "created_at": datetime.now(timezone.utc)})
+    await asyncio.gather(runtime._analysis_handler([{"idea_id": "rt1"}, {"idea_id": "missing"}]),
+                         generate_strategies_from_ideas(limit=10))
+    assert [s["idea_id"] for s in strategies_store] == ["rt1"]
+    assert ideas_store.query(where={"strategy_id": strategies_store[0]["id"]}) == [ideas_store.find("id", "rt1")]
+    ideas_store.clear()
+    strategies_store.clear()
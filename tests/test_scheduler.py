@@ -0,0 +1,73 @@
+import asyncio
+import random
+import time
+from datetime import datetime, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.bus import bus
+from src.execution.scheduler import EXECUTION_STREAM, ScheduleEntry, Scheduler, TimingWheel, scheduler
+from src.main import app
+from src.models import IdeaStatus
+from src.store import ideas_store
+
+client = TestClient(app)
+
+
+def test_wheel_fires_every_entry_on_its_tick_and_cancels_in_place():
+    t0 = 1_700_000_000.0
+    wheel = TimingWheel(tick=0.05, slots=16, levels=6, now=t0)  # small buckets: many cascades
+    rng = random.Random(7)
+    entries = [ScheduleEntry(str(k), t0 + rng.uniform(0.01, 3 * 24 * 3600)) for k in range(20000)]
+    for e in entries:
+        assert wheel.add(e)
+    cancelled = {e.id for e in entries[::10]}
+    for entry_id in cancelled:
+        assert wheel.cancel(entry_id) is not None
+    assert len(wheel) == 18000
+
+    fired = {}
+    now = t0
+    while len(wheel):
+        now += rng.uniform(0.5, 120.0)
+        for e in wheel.advance(now):
+            fired[e.id] = (e, now)
+    assert len(fired) == 18000 and not cancelled & set(fired)
+    for e, at in fired.values():
+        # due within the advance step that crossed its tick, never before it
+        assert e.tick * wheel.tick <= at + 1e-6
+        assert e.fire_at <= at + wheel.tick
+
+
+@pytest.mark.asyncio
+async def test_scheduler_publishes_on_time_and_honours_misfire_policy():
+    sched = Scheduler(tick=0.01, misfire_grace=0.5)
+    cursor = await bus.last_id(EXECUTION_STREAM)
+    now = time.time()
+    sched.schedule({"id": "soon", "asset": "SOL", "budget": 0.2}, at=now + 0.1)
+    sched.schedule({"id": "gone", "asset": "SOL"}, at=now + 0.1)
+    assert sched.cancel_idea("gone") and sched.pending() == 1
+    sched.schedule({"id": "late", "asset": "JUP"}, at=now - 10, misfire="skip")
+
+    while sched.pending():
+        await sched.tick()
+        await asyncio.sleep(0.005)
+    await sched.drain()
+    (sid, msg), = await bus.read(EXECUTION_STREAM, cursor, block_ms=0)
+    assert msg["idea_id"] == "soon" and msg["budget"] == 0.2
+    assert msg["fired_at"] >= msg["planned_at"] and msg["lateness"] < 0.1
+    assert sched.stats["fired"] == 1 and sched.stats["skipped"] == 1 and sched.stats["cancelled"] == 1
+
+
+def test_schedule_and_cancel_endpoints_drive_the_scheduler():
+    ideas_store.clear()
+    ideas_store.append({"id": "sch-1", "source": "research", "asset": "SOL", "type": "swing", "risk": 2,
+                        "budget": 0.1, "status": IdeaStatus.APPROVED, "created_at": datetime.now(timezone.utc)})
+    r = client.post("/api/v1/ideas/sch-1/schedule", params={"delay_seconds": 3600})
+    assert r.status_code == 200 and r.json()["status"] == "SCHEDULED"
+    assert ideas_store[0]["scheduled_for"].timestamp() == pytest.approx(time.time() + 3600, abs=5)
+    pending = scheduler.pending()
+    assert pending >= 1
+    assert client.post("/api/v1/ideas/sch-1/cancel").status_code == 200
+    assert scheduler.pending() == pending - 1
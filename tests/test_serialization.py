@@ -0,0 +1,41 @@
+import json
+from datetime import datetime, timedelta, timezone
+
+from fastapi.testclient import TestClient
+
+from src import serialization
+from src.main import app
+from src.models import IdeaStatus, TradeAction, TradeStatus
+from src.serialization import IDEAS, TRADES
+from src.store import trades_store
+
+client = TestClient(app)
+NOW = datetime(2025, 1, 2, 3, 4, 5, 678901, tzinfo=timezone.utc)
+
+
+def _trade(k):
+    return {"id": f"t{k}", "strategy_id": "s", "action": TradeAction.BUY, "asset": "SOL", "quantity": 0.5,
+            "price": 150.25, "pnl": None, "status": TradeStatus.CLOSED, "executed_at": NOW - timedelta(seconds=k),
+            "fee_lamports": 5000}
+
+
+def test_fast_path_matches_validated_output():
+    ideas = [{"id": "i1", "source": "research", "asset": "SOL", "type": "swing", "risk": 2, "budget": 0.5,
+              "status": IdeaStatus.APPROVED, "created_at": NOW, "risk_metrics": {"cvar": 0.1}}]
+    trades = [_trade(k) for k in range(3)]
+    for ser, rows in ((IDEAS, ideas), (TRADES, trades)):
+        assert ser.dump(rows) == ser.dump(rows, trusted=False)
+    idea = json.loads(IDEAS.dump(ideas))[0]
+    assert idea["created_at"] == "2025-01-02T03:04:05.678901Z" and idea["status"] == "APPROVED"
+    assert idea["ttl"] == 5400 and "risk_metrics" not in idea  # model default filled, extra key dropped
+
+
+def test_recent_trades_uses_fast_rendering(monkeypatch):
+    trades_store.clear()
+    trades_store.extend(_trade(k) for k in range(250))
+    fast = client.get("/api/v1/trades/recent", params={"limit": 200}).json()
+    monkeypatch.setattr(serialization, "FAST_JSON", False)
+    slow = client.get("/api/v1/trades/recent", params={"limit": 200}).json()
+    assert fast == slow and len(fast) == 200 and fast[0]["id"] == "t0"
+    assert "fee_lamports" not in fast[0]
+    trades_store.clear()
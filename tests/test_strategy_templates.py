@@ -0,0 +1,59 @@
+import pytest
+
+from src.agents import analysis
+from src.agents.templates import TemplateCache, template_cache, template_key
+from src.store import ideas_store, strategies_store
+
+
+def test_key_is_content_addressed():
+    a = {"id": "1", "asset": "sol", "type": "Momentum", "risk": 2, "ttl": 3600, "budget": 1.0}
+    b = dict(a, id="2", asset="SOL", budget=4.0)
+    assert template_key(a, 7) == template_key(b, 7)
+    assert template_key(a, 7) != template_key(dict(a, risk=3), 7)
+    assert template_key(a, 7) != template_key(a, 8)
+
+
+def test_stamp_ttl_and_lru(monkeypatch):
+    cache = TemplateCache(max_entries=2, ttl=60)
+    cache.put("a", {"n": 1}, stamp=100)
+    assert cache.get("a", 100) == {"n": 1}
+    assert cache.get("a", 160) is None  # newer market data
+    assert len(cache) == 0
+
+    cache.put("a", {"n": 1}, stamp=100)
+    cache.put("b", {"n": 2}, stamp=100)
+    cache.get("a", 100)
+    cache.put("c", {"n": 3}, stamp=100)  # evicts b, the least recently used
+    assert cache.get("b", 100) is None and cache.get("a", 100) is not None
+
+    clock = [1000.0]
+    monkeypatch.setattr("src.agents.templates.time.monotonic", lambda: clock[0])
+    cache.put("d", {"n": 4}, stamp=None)
+    clock[0] += 61
+    assert cache.get("d") is None
+    assert cache.stats["stale"] == 2
+
+
+@pytest.mark.asyncio
+async def test_repeated_ideas_share_a_template(monkeypatch):
+    monkeypatch.setenv("MC_SIZING", "0")
+    ideas_store.clear()
+    strategies_store.clear()
+    template_cache.clear()
+    base = {"asset": "JUP", "type": "Momentum", "risk": 4, "ttl": 3600, "budget": 1.0, "status": "NEW"}
+    ideas_store.extend([dict(base, id="i1"), dict(base, id="i2"), dict(base, id="i3", risk=1)])
+    before = dict(template_cache.stats)
+
+    created = await analysis.generate_strategies_from_ideas(limit=10)
+    assert len(created) == 3
+    by_idea = {s["idea_id"]: s for s in created}
+    assert by_idea["i1"]["template_id"] == by_idea["i2"]["template_id"] != by_idea["i3"]["template_id"]
+    assert len(template_cache) == 2
+    assert template_cache.stats["misses"] - before["misses"] == 2
+
+    # a later cycle skips ideas that have a strategy; new ideas with the same content hit the cache
+    ideas_store.extend([dict(base, id="i4"), dict(base, id="i5", risk=1)])
+    assert sorted(s["idea_id"] for s in await analysis.generate_strategies_from_ideas(limit=10)) == ["i4", "i5"]
+    assert template_cache.stats["hits"] - before["hits"] == 2
+    ideas_store.clear()
+    strategies_store.clear()
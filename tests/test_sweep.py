@@ -0,0 +1,42 @@
+import numpy as np
+import pytest
+
+from src.agents import analysis
+from src.agents.pool import AgentPool
+from src.agents.sweep import candidate_grid, load_latest_artifact, run_sweep
+
+
+def _bars(n=6_000, seed=3):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0.00005, 0.001, n)))
+    opn = np.concatenate(([close[0]], close[:-1]))
+    return {"open": opn, "high": np.maximum(opn, close), "low": np.minimum(opn, close), "close": close}
+
+
+@pytest.mark.asyncio
+async def test_sweep_writes_versioned_artifact_loaded_by_analysis(tmp_path):
+    pool = AgentPool(workers=2, chunk_size=64)
+    events = []
+    try:
+        path1 = await run_sweep({"SOL": _bars()}, directory=str(tmp_path), pool=pool, window=500, risks=(1, 3), progress=events.append)
+        path2 = await run_sweep({"SOL": _bars(seed=4)}, directory=str(tmp_path), pool=pool, window=500, risks=(1, 3), mode="random", samples=40, seed=1)
+    finally:
+        pool.shutdown()
+
+    assert path1.name == "risk_params_v1.json" and path2.name == "risk_params_v2.json"
+    # successive halving: later rounds score fewer candidates
+    totals = {e["round"]: e["total"] for e in events}
+    assert totals[1] == 2 * len(candidate_grid(1)) and totals[3] < totals[2] < totals[1]
+
+    doc = load_latest_artifact(str(tmp_path))
+    assert doc["version"] == 2 and set(doc["table"]["SOL"]) == {"1", "3"}
+
+    try:
+        assert analysis.load_risk_table(str(tmp_path)) == 2
+        swept = doc["table"]["SOL"]["3"]
+        assert analysis._risk_to_params(3, "sol")["stop_loss"] == swept["stop_loss"]
+        # other assets / risk levels keep the built-in defaults
+        assert analysis._risk_to_params(3, "BONK") == analysis._DEFAULT_PARAMS[3]
+        assert analysis._risk_to_params(5, "SOL") == analysis._DEFAULT_PARAMS[5]
+    finally:
+        analysis.load_risk_table(str(tmp_path / "missing"))
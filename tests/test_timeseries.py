@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+
+from src.market.timeseries import TimeSeriesStore
+
+
+def _minutes(start, n, price=100.0):
+    ts = start + 60 * np.arange(n)
+    close = price + np.arange(n, dtype=float)
+    return ts, close - 0.5, close + 1, close - 1, close, np.ones(n)
+
+
+def test_append_slice_and_resample(tmp_path):
+    store = TimeSeriesStore(str(tmp_path))
+    t0 = 1_699_999_200  # aligned to the hour
+    assert store.append("sol", *_minutes(t0, 90)) == 90
+    assert store.append("SOL", *_minutes(t0 + 90 * 60, 30, price=190.0)) == 30
+    assert store.assets() == ["SOL"] and store.rows("SOL") == 120
+
+    with pytest.raises(ValueError):
+        store.append("SOL", *_minutes(t0, 1))  # not after the last bar
+
+    window = store.range("SOL", t0 + 60 * 10, t0 + 60 * 20)
+    assert len(window["close"]) == 10 and window["ts"][0] == t0 + 600
+    assert isinstance(window["close"].base, np.memmap) or isinstance(window["close"], np.memmap)
+
+    hourly = store.resample("SOL", 3600)
+    assert list(hourly["ts"]) == [t0, t0 + 3600]
+    assert hourly["open"][0] == 99.5 and hourly["close"][0] == 159.0
+    assert hourly["high"][1] == store.range("SOL")["high"].max()
+    assert hourly["volume"].tolist() == [60.0, 60.0]
+
+    five = store.resample("SOL", 300)
+    assert len(five["ts"]) == 24 and np.all(np.diff(five["ts"]) == 300)
+
+
+def test_shared_history_visible_to_a_second_reader(tmp_path):
+    writer = TimeSeriesStore(str(tmp_path))
+    reader = TimeSeriesStore(str(tmp_path))
+    writer.append("BONK", *_minutes(0, 10))
+    assert reader.rows("BONK") == 10
+    writer.append("BONK", *_minutes(600, 5))
+    assert len(reader.range("BONK")["ts"]) == 15
+    assert reader.log_returns("BONK").shape == (14,)
+
+
+def test_empty_columns_read_as_no_history(tmp_path):
+    from src.agents.allocation import asset_moments
+
+    store = TimeSeriesStore(str(tmp_path))
+    (tmp_path / "EMPTY").mkdir()
+    (tmp_path / "EMPTY" / "ts.i8").write_bytes(b"")
+    (tmp_path / "EMPTY" / "close.f8").write_bytes(np.ones(3).tobytes())  # torn first append
+    assert store.assets() == [] and store.last_ts("EMPTY") is None
+    assert len(store.range("EMPTY")["ts"]) == 0 and len(store.log_returns("EMPTY", 60)) == 0
+    mu, cov = asset_moments(["EMPTY"], store)
+    assert mu.tolist() == [0.0] and cov[0, 0] > 0
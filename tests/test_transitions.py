@@ -0,0 +1,92 @@
+from datetime import datetime, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.bus import bus
+from src.main import app
+from src.models import IdeaStatus
+from src.routers.ideas import IDEA_STATUS_STREAM
+from src.store import ideas_store
+
+client = TestClient(app)
+
+
+def _seed(n):
+    ideas_store.clear()
+    now = datetime.now(timezone.utc)
+    ideas_store.extend({"id": f"t{k}", "source": "research", "asset": "SOL", "type": "swing", "risk": 2,
+                        "budget": 0.1, "status": IdeaStatus.NEW, "created_at": now} for k in range(n))
+
+
+@pytest.mark.asyncio
+async def test_bulk_transitions_apply_multi_step_moves_with_one_event():
+    _seed(300)
+    cursor = await bus.last_id(IDEA_STATUS_STREAM)
+    steps = ["NEEDS_REVIEW", "READY_FOR_QA", "APPROVED"]
+    body = {"transitions": [{"idea_id": f"t{k}", "to": s} for k in range(300) for s in steps]}
+    r = client.post("/api/v1/ideas/transitions", json=body)
+    assert r.status_code == 200
+    assert r.json()["applied"] == 900 and r.json()["errors"] == []
+    assert all(i["status"] == IdeaStatus.APPROVED for i in ideas_store)
+
+    events = await bus.read(IDEA_STATUS_STREAM, cursor, count=10, block_ms=0)
+    assert len(events) == 1
+    _sid, event = events[0]
+    assert event["count"] == 900
+    assert event["changes"][0] == {"idea_id": "t0", "from": "NEW", "to": "NEEDS_REVIEW"}
+
+
+def test_atomic_batch_rejects_everything_on_one_bad_transition():
+    _seed(3)
+    body = {"transitions": [{"idea_id": "t0", "to": "NEEDS_REVIEW"},
+                            {"idea_id": "t1", "to": "APPROVED"},
+                            {"idea_id": "missing", "to": "CANCELLED"}]}
+    r = client.post("/api/v1/ideas/transitions", json=body)
+    assert r.status_code == 400
+    assert [e["idea_id"] for e in r.json()["detail"]] == ["t1", "missing"]
+    assert ideas_store[0]["status"] == IdeaStatus.NEW
+
+    r = client.post("/api/v1/ideas/transitions", json=dict(body, atomic=False))
+    assert r.status_code == 200 and r.json()["applied"] == 1
+    assert ideas_store[0]["status"] == IdeaStatus.NEEDS_REVIEW
+    assert client.post("/api/v1/ideas/transitions", json={"transitions": []}).status_code == 422
+
+
+def test_bulk_schedule_per_item_and_one_cancel_rule():
+    import time
+
+    from src.execution.scheduler import scheduler
+
+    _seed(3)
+    for idea in ideas_store:
+        idea["status"] = IdeaStatus.APPROVED
+    ideas_store.touch(*ideas_store)
+    at = datetime.fromtimestamp(time.time() + 7200, timezone.utc)
+    r = client.post("/api/v1/ideas/transitions", json={"transitions": [
+        {"idea_id": "t0", "to": "SCHEDULED", "delay_seconds": 600, "misfire": "skip"},
+        {"idea_id": "t1", "to": "SCHEDULED", "at": at.isoformat()},
+        {"idea_id": "t2", "to": "SCHEDULED", "misfire": "later"},
+    ]})
+    assert r.status_code == 400 and r.json()["detail"][0]["idea_id"] == "t2"
+    r = client.post("/api/v1/ideas/transitions", json={"atomic": False, "transitions": [
+        {"idea_id": "t0", "to": "SCHEDULED", "delay_seconds": 600, "misfire": "skip"},
+        {"idea_id": "t1", "to": "SCHEDULED", "at": at.isoformat()},
+    ]})
+    assert r.json()["applied"] == 2
+    by_id = {i["id"]: i for i in ideas_store}
+    assert by_id["t0"]["scheduled_for"].timestamp() == pytest.approx(time.time() + 600, abs=5)
+    assert by_id["t1"]["scheduled_for"].timestamp() == pytest.approx(at.timestamp(), abs=1)
+
+    # single and bulk cancel follow the same table: scheduled ideas can be cancelled; cancelling again is a no-op
+    pending = scheduler.pending()
+    assert client.post("/api/v1/ideas/t0/cancel").status_code == 200 and scheduler.pending() == pending - 1
+    version = ideas_store.version
+    again = client.post("/api/v1/ideas/t0/cancel")
+    assert again.status_code == 200 and again.json()["status"] == "CANCELLED" and ideas_store.version == version
+    r = client.post("/api/v1/ideas/transitions", json={"transitions": [{"idea_id": "t0", "to": "CANCELLED"}]})
+    assert r.status_code == 200 and r.json()["applied"] == 0 and r.json()["errors"] == []
+    assert client.post("/api/v1/ideas/t0/review").status_code == 400  # still final
+    r = client.post("/api/v1/ideas/transitions", json={"transitions": [{"idea_id": "t1", "to": "CANCELLED"}]})
+    assert r.status_code == 200 and scheduler.pending() == pending - 2
+    ideas_store.clear()